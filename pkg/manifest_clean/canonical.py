@@ -0,0 +1,116 @@
+"""
+Check that a document's raw YAML text is already laid out exactly as the emitter would
+write it (--verbatim), so it can be copied instead of re-serialized.
+"""
+
+from __future__ import annotations
+
+import re
+
+# "key:" or "key: value" (plain keys as Kubernetes uses them, or simple quoted keys).
+_ENTRY = re.compile(
+    r"(?P<key>[A-Za-z0-9_][A-Za-z0-9_./-]*|\"[^\"\\]*\"|'[^']*'):(?: (?P<value>.+))?"
+)
+_PLAIN = re.compile(r"(?:[A-Za-z0-9_./]|--?[A-Za-z])[^\s#]*(?: [^\s#]+)*")
+# Plain values that load as something other than a string, or as a string the emitter
+# would quote; only the canonical spellings of int and bool are accepted.
+_NOT_STR = re.compile(
+    r"(?i:true|false|yes|no|on|off|y|n|null|~)|[-+]?(\d[\d_]*)?(\.\d*)?([eE][-+]?\d+)?"
+    r"|0[xob][0-9a-fA-F_]+|[-+]?\.(inf|nan)|\d{4}-\d\d?-\d\d?([Tt ].*)?|.*:\s?"
+)
+_CANONICAL_INT_OR_BOOL = re.compile(r"-?(0|[1-9][0-9]*)|true|false")
+_QUOTED = re.compile(r"\"[^\"\\]*\"|'[^']*'")
+
+# The emitter wraps lines at 4096 columns; longer lines are never taken as canonical.
+MAX_LINE = 4000
+
+
+def _value_is_canonical(value: str) -> bool:
+    if value in ("{}", "[]") or _QUOTED.fullmatch(value):
+        return True
+    if _CANONICAL_INT_OR_BOOL.fullmatch(value):
+        return True
+    return bool(_PLAIN.fullmatch(value)) and not _NOT_STR.fullmatch(value)
+
+
+def _block_end(lines: list[str], start: int, indent: int) -> int:
+    """
+    Return the index after a literal block scalar whose content starts at line start,
+    or -1 if the block is not in canonical form (content indented by exactly indent,
+    no trailing spaces, no blank lines at its end).
+    """
+    first = lines[start] if start < len(lines) else ""
+    if len(first) - len(first.lstrip(" ")) != indent or first.isspace() or not first:
+        return -1
+    pos = start
+    while pos < len(lines):
+        line = lines[pos]
+        if line and not line.startswith(" " * indent):
+            break
+        if line.endswith(" ") or (line and line.isspace()):
+            return -1
+        pos += 1
+    if not lines[pos - 1]:
+        return -1
+    return pos
+
+
+def is_canonical_layout(text: str, indent: int) -> bool:
+    """
+    Return True if text (one document) is block-style YAML in the emitter's exact layout
+    for indent: nested mappings indented by indent, sequences with "-" at their key's
+    column, no comments, flow collections, anchors, tags, blank lines or trailing
+    spaces, and only scalars the emitter writes back unchanged. False means "maybe
+    not", never "not equal"; the caller then serializes the document.
+    """
+    if not text.endswith("\n") or "\t" in text or "\r" in text:
+        return False
+    lines = text[:-1].split("\n")
+    dash = "-" + " " * (indent - 1)
+    # Open blocks as (kind, column); kind is "map" or "seq".
+    stack: list[tuple[str, int]] = [("map", 0)]
+    # Content column of a "key:" with no value: its child block may start next.
+    child_of: int | None = None
+    pos = 0
+    while pos < len(lines):
+        line = lines[pos]
+        if not line or line.endswith(" ") or len(line) > MAX_LINE:
+            return False
+        col = len(line) - len(line.lstrip(" "))
+        body = line[col:]
+        dashes = 0
+        while body.startswith(dash) and len(body) > indent:
+            body = body[indent:]
+            dashes += 1
+        if body.startswith(" ") or body == "-":
+            return False
+        lead = ("seq", col) if dashes else ("map", col)
+        if child_of is not None:
+            if lead == ("map", child_of + indent) or lead == ("seq", child_of):
+                stack.append(lead)
+            child_of = None  # Otherwise the key's value was null.
+        while stack and stack[-1] != lead:
+            stack.pop()
+        if not stack:
+            return False
+        stack.extend(("seq", col + indent * k) for k in range(1, dashes))
+        content = col + indent * dashes
+        entry = _ENTRY.fullmatch(body)
+        pos += 1
+        if entry is None:
+            # An empty "{}"/"[]" item loses its dash padding inside nested sequences.
+            if not dashes or body in ("{}", "[]") or not _value_is_canonical(body):
+                return False
+            continue
+        if dashes:
+            stack.append(("map", content))
+        value = entry["value"]
+        if value is None:
+            child_of = content
+        elif value in ("|", "|-"):
+            pos = _block_end(lines, pos, content + indent)
+            if pos < 0:
+                return False
+        elif not _value_is_canonical(value):
+            return False
+    return True
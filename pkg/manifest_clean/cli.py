@@ -3,21 +3,54 @@
 from __future__ import annotations
 
 import argparse
+import contextlib
+import functools
 import json
 import sys
+from collections.abc import Callable, Iterator, Sequence
 from pathlib import Path
 from typing import Any
 
 from ruamel.yaml import YAML
 
 from . import __version__
+from .canonical import is_canonical_layout
+from .compare import compare_trees, format_identity
+from .compress import (
+    compression_from_name,
+    detect_compression,
+    open_output,
+    resolve_compression,
+    wrap_stdin,
+    write_text,
+)
+from .defaults import load_defaults_index
 from .diff import text_to_lines, unified_diff
+from .fingerprint import format_fingerprint
+from .index import ManifestIndex
 from .io import (
+    INPUT_ERRORS,
+    SourceDocument,
+    is_archive,
     iter_paths,
+    load_documents_from_archive,
     load_documents_from_path,
     load_documents_from_stdin,
+    new_yaml_loader,
+    parse_document,
+    read_path_list,
 )
-from .normalize import normalize_document
+from .journal import Journal, file_sha256, options_fingerprint
+from .limits import Limits, parse_size
+from .marker import MARKER_SUFFIXES, add_marker, has_valid_marker
+from .normalize import normalize_document, same_tree
+from .parallel import parallel_normalized_stream
+from .prune import PrunePath, prune_paths
+from .selector import ResourceFilter, parse_select, select_documents
+from .sinks import EmitSinks
+from .sort import DEFAULT_SORT_BUFFER_BYTES, document_sort_key, external_sort
+from .split import SplitWriter, expand_list_items
+from .watch import InotifyWatcher, open_watcher
 
 
 def _dump_yaml(doc: dict[str, Any], indent: int = 2) -> str:
@@ -35,17 +68,279 @@ def _dump_json(doc: dict[str, Any], indent: int = 2) -> str:
     return json.dumps(doc, sort_keys=True, indent=indent) + "\n"
 
 
+def _dump_ndjson(doc: dict[str, Any]) -> str:
+    return json.dumps(doc, sort_keys=True, separators=(",", ":")) + "\n"
+
+
 def serialize(doc: dict[str, Any], fmt: str, indent: int) -> str:
     if fmt == "json":
         return _dump_json(doc, indent)
+    if fmt == "ndjson":
+        return _dump_ndjson(doc)
     return _dump_yaml(doc, indent)
 
 
+def join_documents(texts: list[str], fmt: str) -> str:
+    """Join serialized documents into one file body (NDJSON lines need no separator)."""
+    if fmt == "ndjson":
+        return "".join(texts)
+    return "\n---\n".join(texts)
+
+
+def verbatim_text(
+    source: SourceDocument, norm: dict[str, Any], fmt: str, indent: int
+) -> str | None:
+    """
+    Return the document's source text if it can be emitted as-is: YAML output,
+    normalization changed nothing, and the text is already in the emitter's layout for
+    indent (so it equals what serializing would produce). Returns None when the
+    document must be re-serialized.
+    """
+    if fmt != "yaml" or source.pruned or not same_tree(source.doc, norm):
+        return None
+    text = source.text if source.text.endswith("\n") else source.text + "\n"
+    return text if is_canonical_layout(text, indent) else None
+
+
+def _selected_items(
+    doc: dict[str, Any], doc_filter: ResourceFilter | None
+) -> list[dict[str, Any]]:
+    """
+    Return the resources of doc (List items expanded) that match doc_filter. Matching
+    per item lets --kind etc. pick resources out of kubectl get -o yaml output.
+    """
+    items = expand_list_items(doc)
+    if doc_filter is None:
+        return items
+    return [item for item in items if doc_filter.matches_document(item)]
+
+
+def _iter_sources(
+    path: Path | None,
+    input_format: str = "auto",
+    *,
+    doc_filter: ResourceFilter | None = None,
+    index: ManifestIndex | None = None,
+    skip_paths: tuple[PrunePath, ...] = (),
+    limits: Limits | None = None,
+) -> Iterator[tuple[str, Iterator[SourceDocument]]]:
+    """
+    Yield (key, doc_iter) for stdin (path None), a file, or each member of an archive.
+    With doc_filter, only matching documents are yielded and documents whose header
+    rules them out are not parsed; with an index as well, plain files are not read
+    beyond the matching documents' byte spans. Subtrees at skip_paths are not parsed.
+    limits are enforced while inputs are read (not on indexed byte spans).
+    """
+    if doc_filter is None:
+        yield from _iter_all_sources(
+            path, input_format, skip_paths=skip_paths, limits=limits
+        )
+        return
+    if (
+        index is not None
+        and path is not None
+        and not is_archive(path)
+        and detect_compression(path) is None
+    ):
+        entries = index.lookup(path, doc_filter)
+        # A file missing from the index (it failed to scan) is read in full below, so
+        # its error is reported like without --index.
+        if entries is not None:
+            if entries:
+                # Labels are not indexed; check them on the loaded documents.
+                yield (
+                    str(path),
+                    select_documents(index.load_documents(path, entries), doc_filter),
+                )
+            return
+    for key, doc_iter in _iter_all_sources(
+        path,
+        input_format,
+        accept=doc_filter.accepts_text,
+        skip_paths=skip_paths,
+        limits=limits,
+    ):
+        yield key, select_documents(doc_iter, doc_filter)
+
+
+def _iter_all_sources(
+    path: Path | None,
+    input_format: str,
+    accept: Callable[[str], bool] | None = None,
+    skip_paths: tuple[PrunePath, ...] = (),
+    limits: Limits | None = None,
+) -> Iterator[tuple[str, Iterator[SourceDocument]]]:
+    kw = {
+        "with_source": True,
+        "accept": accept,
+        "skip_paths": skip_paths,
+        "limits": limits,
+    }
+    if path is None:
+        yield "<stdin>", load_documents_from_stdin(input_format, **kw)
+    elif is_archive(path):
+        yield from load_documents_from_archive(path, input_format, **kw)
+    else:
+        yield str(path), load_documents_from_path(path, input_format, **kw)
+
+
+def _run_split(
+    sources: list[Path | None],
+    out_dir: str,
+    *,
+    normalize_kw: dict[str, Any],
+    fmt: str,
+    indent: int,
+    input_format: str,
+    doc_filter: ResourceFilter | None,
+    prune: bool,
+    jobs: int | None,
+    summary: bool,
+    limits: Limits | None = None,
+) -> tuple[int, int, int]:
+    """Normalize every resource and write it to its own file under out_dir."""
+    ext = "yaml" if fmt == "yaml" else "json"
+    writer = SplitWriter(Path(out_dir), ext, jobs=jobs)
+    errors: list[str] = []
+    for source in sources:
+        try:
+            for _key, doc_iter in _iter_all_sources(
+                source,
+                input_format,
+                accept=doc_filter.accepts_text if doc_filter is not None else None,
+                skip_paths=prune_paths(normalize_kw),
+                limits=limits,
+            ):
+                for source_doc in doc_iter:
+                    for item in _selected_items(source_doc.doc, doc_filter):
+                        norm = normalize_document(item, **normalize_kw)
+                        writer.add(norm, serialize(norm, fmt, indent))
+        except INPUT_ERRORS as e:
+            errors.append(str(e))
+    # Never prune after a failed input: its resources would look deleted.
+    written, unchanged, pruned = writer.close(prune=prune and not errors)
+    errors.extend(writer.errors)
+    for err in errors:
+        sys.stderr.write(f"error: {err}\n")
+    if summary:
+        sys.stderr.write(
+            f"Resources written: {written}, unchanged: {unchanged}, pruned: {pruned}\n"
+        )
+    return (2 if errors else 0, written + pruned, written)
+
+
+def _run_fingerprint(
+    sources: list[Path | None],
+    *,
+    normalize_kw: dict[str, Any],
+    input_format: str,
+    doc_filter: ResourceFilter | None,
+    fmt: str,
+    summary: bool,
+    limits: Limits | None = None,
+) -> tuple[int, int, int]:
+    """Write one fingerprint line (identity, canonical digest, source) per resource."""
+    line_fmt = "ndjson" if fmt in ("json", "ndjson") else "tsv"
+    errors: list[str] = []
+    count = 0
+    for source in sources:
+        try:
+            for key, doc_iter in _iter_all_sources(
+                source,
+                input_format,
+                accept=doc_filter.accepts_text if doc_filter is not None else None,
+                skip_paths=prune_paths(normalize_kw),
+                limits=limits,
+            ):
+                for source_doc in doc_iter:
+                    for item in _selected_items(source_doc.doc, doc_filter):
+                        norm = normalize_document(item, **normalize_kw)
+                        sys.stdout.write(format_fingerprint(norm, key, line_fmt))
+                        count += 1
+        except INPUT_ERRORS as e:
+            errors.append(str(e))
+    for err in errors:
+        sys.stderr.write(f"error: {err}\n")
+    if summary:
+        sys.stderr.write(f"Resources fingerprinted: {count}\n")
+    return (2 if errors else 0, 0, 0)
+
+
+def _run_compare(
+    side_a: str,
+    side_b: str,
+    *,
+    normalize_kw: dict[str, Any],
+    fmt: str,
+    indent: int,
+    input_format: str,
+    doc_filter: ResourceFilter | None,
+    jobs: int | None,
+    check: bool,
+    summary: bool,
+    limits: Limits | None = None,
+) -> tuple[int, int, int]:
+    """
+    Compare two trees resource by resource: print a unified diff for each resource that
+    differs and a line for each resource found on one side only. Exit code 1 on drift.
+    """
+    try:
+        a_paths = [p for p in iter_paths(side_a) if p.is_file()]
+        b_paths = [p for p in iter_paths(side_b) if p.is_file()]
+    except FileNotFoundError as e:
+        sys.stderr.write(f"error: {e}\n")
+        return (2, 0, 0)
+    result = compare_trees(
+        a_paths,
+        b_paths,
+        input_format=input_format,
+        normalize_kw=normalize_kw,
+        doc_filter=doc_filter,
+        jobs=jobs,
+        limits=limits,
+    )
+    for dup in result.duplicates:
+        sys.stderr.write(f"warning: duplicate resource {dup}\n")
+    for err in result.errors:
+        sys.stderr.write(f"error: {err}\n")
+    if result.errors:
+        return (2, 0, 0)
+
+    drift = len(result.only_a) + len(result.only_b) + len(result.different)
+    if not check:
+        for identity, record in result.only_a:
+            sys.stdout.write(
+                f"Only in {side_a}: {format_identity(identity)} ({record.origin})\n"
+            )
+        for identity, record in result.only_b:
+            sys.stdout.write(
+                f"Only in {side_b}: {format_identity(identity)} ({record.origin})\n"
+            )
+        for identity, a_record, b_record in result.different:
+            label = format_identity(identity)
+            sys.stdout.writelines(
+                unified_diff(
+                    text_to_lines(serialize(a_record.doc, fmt, indent)),
+                    text_to_lines(serialize(b_record.doc, fmt, indent)),
+                    fromfile=f"{a_record.origin} ({label})",
+                    tofile=f"{b_record.origin} ({label})",
+                )
+            )
+    if summary:
+        sys.stderr.write(
+            f"Resources identical: {result.identical}, different: "
+            f"{len(result.different)}, only in {side_a}: {len(result.only_a)}, "
+            f"only in {side_b}: {len(result.only_b)}\n"
+        )
+    return (1 if drift else 0, 0, drift)
+
+
 def run(
-    path_arg: str | None,
+    path_arg: str | Sequence[str] | None,
     *,
     fmt: str = "yaml",
     indent: int = 2,
+    input_format: str = "auto",
     drop_status: bool = True,
     drop_managed_fields: bool = True,
     drop_last_applied: bool = True,
@@ -69,9 +364,66 @@ def run(
     check: bool = False,
     diff: bool = False,
     summary: bool = False,
+    verbatim: bool = False,
+    sort_documents: bool = False,
+    sort_buffer_bytes: int = DEFAULT_SORT_BUFFER_BYTES,
+    select: str | None = None,
+    kinds: Sequence[str] | None = None,
+    namespaces: Sequence[str] | None = None,
+    label_selector: str | None = None,
+    index_file: str | None = None,
+    split_output: str | None = None,
+    prune: bool = False,
+    jobs: int | None = None,
+    compare: Sequence[str] | None = None,
+    fingerprint: bool = False,
+    journal_file: str | None = None,
+    resume: bool = False,
+    drop_defaults: bool = False,
+    openapi: str | None = None,
+    emit: Sequence[str] | None = None,
+    marker: bool = False,
+    max_document_bytes: int | None = None,
+    max_depth: int | None = None,
+    max_alias_nodes: int | None = None,
+    max_input_bytes: int | None = None,
 ) -> tuple[int, int, int]:
     """
     Run normalization. Returns (exit_code, files_changed_count, docs_changed_count).
+    path_arg is a path, a list of files/directories/archives processed together, or "-".
+    With split_output, each resource is written to its own file under that directory.
+    With verbatim, documents that normalization leaves unchanged are copied from the
+    input text instead of being re-serialized (YAML output only).
+    With sort_documents, documents are ordered by (apiVersion, kind, namespace, name)
+    within each file; stdin is sorted as a whole, spilling to temp files beyond
+    sort_buffer_bytes.
+    With select ("kind=Deployment,namespace=prod,..."), kinds, namespaces or
+    label_selector ("app=web,tier!=db"), only matching documents are processed;
+    documents whose header rules them out are skipped before being parsed. index_file
+    names a persistent resource index that is refreshed for the given paths; with a
+    filter it limits parsing to the matching documents, without one the run only
+    refreshes the index.
+    With compare (A, B), path_arg must be empty: the two trees are matched by resource
+    identity and differing or one-sided resources are reported (exit code 1).
+    With fingerprint, one line per resource is written with its identity and a
+    canonical digest of the normalized content instead of the content: TSV, or NDJSON
+    when fmt is json or ndjson.
+    With journal_file (write or check only), each completed path is recorded with its
+    content hash as soon as it is done, and with write the file is rewritten right
+    away; with resume, paths already recorded and unchanged since are skipped.
+    With jobs > 1 and stdin, documents are normalized in that many worker processes
+    while the stream is read, and written in input order.
+    With drop_defaults, fields equal to their server-applied default are dropped, using
+    the builtin defaults index extended with the kinds in the openapi file if given.
+    With emit ("KIND:TARGET" specs), every normalized file is also fed to each sink
+    (yaml/json/ndjson file or directory, diff, summary) in the same pass, and nothing
+    is written to stdout unless --check/--diff ask for it or a target is "-".
+    With marker (YAML output with write, check or diff), written YAML files end with
+    a comment holding their digest and the options fingerprint; files whose marker
+    matches their bytes and the current options are taken as clean without parsing.
+    max_document_bytes, max_depth, max_alias_nodes and max_input_bytes cap what is
+    read and parsed (None: unlimited); an input over a limit fails with an error
+    naming it while the other files are still processed.
     """
     normalize_kw = dict(
         drop_status=drop_status,
@@ -94,13 +446,40 @@ def run(
         sort_labels=sort_labels,
         sort_annotations=sort_annotations,
     )
+    # Subtrees that are dropped whole are not even parsed (see prune.py).
+    skip_paths = prune_paths(normalize_kw)
+    limit_values = {
+        "max_document_bytes": max_document_bytes,
+        "max_depth": max_depth,
+        "max_alias_nodes": max_alias_nodes,
+        "max_input_bytes": max_input_bytes,
+    }
+    for name, value in limit_values.items():
+        if value is not None and value < 1:
+            flag = name.replace("_", "-")
+            sys.stderr.write(f"error: --{flag} must be at least 1\n")
+            return (2, 0, 0)
+    limits = (
+        Limits(**limit_values)
+        if any(v is not None for v in limit_values.values())
+        else None
+    )
+    if drop_defaults or openapi is not None:
+        try:
+            normalize_kw["defaults_index"] = load_defaults_index(
+                Path(openapi) if openapi is not None else None
+            )
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"error: --openapi: {e}\n")
+            return (2, 0, 0)
 
     files_changed = 0
     docs_changed = 0
     parse_errors: list[str] = []
+    sinks: EmitSinks | None = None
 
     def process_docs(
-        path: Path | None,
+        key: str,
         doc_iter,
         original_by_path: dict[str, str],
         normalized_by_path: dict[str, str],
@@ -108,64 +487,433 @@ def run(
         nonlocal files_changed, docs_changed
         docs_orig: list[str] = []
         docs_norm: list[str] = []
-        for doc_idx, doc in doc_iter:
+        norms: list[dict[str, Any]] = []
+        sort_keys: list[tuple[str, ...]] = []
+        changed: list[bool] = []
+        for source in doc_iter:
             try:
+                doc = source.doc
                 norm = normalize_document(doc, **normalize_kw)
-                orig_text = serialize(doc, fmt, indent)
-                norm_text = serialize(norm, fmt, indent)
+                passthrough = (
+                    verbatim_text(source, norm, fmt, indent) if verbatim else None
+                )
+                if passthrough is not None:
+                    orig_text = norm_text = passthrough
+                elif source.pruned:
+                    # Cut subtrees always change the document. Diffs need the full
+                    # original, parsed again from its source span; otherwise the raw
+                    # text stands in for it.
+                    if diff or sinks is not None:
+                        full = parse_document(
+                            new_yaml_loader(limits), source.text, key, source.index
+                        )
+                        orig_text = serialize(full, fmt, indent)
+                    else:
+                        orig_text = source.text
+                    norm_text = serialize(norm, fmt, indent)
+                else:
+                    orig_text = serialize(doc, fmt, indent)
+                    norm_text = serialize(norm, fmt, indent)
                 docs_orig.append(orig_text)
                 docs_norm.append(norm_text)
-                if orig_text.strip() != norm_text.strip():
-                    docs_changed += 1
+                norms.append(norm)
+                sort_keys.append(document_sort_key(norm))
+                changed.append(source.pruned or orig_text.strip() != norm_text.strip())
             except Exception as e:
                 parse_errors.append(str(e))
                 raise
-        key = str(path) if path else "<stdin>"
-        original_by_path[key] = "\n---\n".join(docs_orig)
-        normalized_by_path[key] = "\n---\n".join(docs_norm)
+        if sort_documents:
+            # sorted() is stable, so documents with equal identity keep input order.
+            order = sorted(range(len(docs_norm)), key=sort_keys.__getitem__)
+            docs_norm = [docs_norm[i] for i in order]
+            norms = [norms[i] for i in order]
+            # A moved document counts as changed even if its content is not.
+            for pos, i in enumerate(order):
+                changed[i] = changed[i] or pos != i
+        if doc_filter is not None and not docs_norm:
+            return
+        docs_changed += sum(changed)
+        original_by_path[key] = join_documents(docs_orig, fmt)
+        normalized_by_path[key] = join_documents(docs_norm, fmt)
         if original_by_path[key] != normalized_by_path[key]:
             files_changed += 1
+        if sinks is not None:
+            sinks.add(
+                key,
+                norms,
+                original_by_path[key],
+                normalized_by_path[key],
+                sum(changed),
+            )
 
     original_by_path: dict[str, str] = {}
     normalized_by_path: dict[str, str] = {}
 
+    doc_filter = None
+    if select is not None or kinds or namespaces or label_selector is not None:
+        try:
+            doc_filter = ResourceFilter(
+                select=parse_select(select) if select is not None else None,
+                kinds=kinds,
+                namespaces=namespaces,
+                label_selector=label_selector,
+            )
+        except ValueError as e:
+            sys.stderr.write(f"error: {e}\n")
+            return (2, 0, 0)
+        if write or prune:
+            # Excluded resources would be dropped (--write) or deleted (--prune).
+            sys.stderr.write(
+                "error: --select, --kind, --namespace and --selector cannot be "
+                "combined with --write or --prune\n"
+            )
+            return (2, 0, 0)
+
+    if split_output is not None and (write or check or diff):
+        sys.stderr.write(
+            "error: --split-output cannot be combined with --write, --check or --diff\n"
+        )
+        return (2, 0, 0)
+    if jobs is not None and jobs < 1:
+        sys.stderr.write("error: --jobs must be at least 1\n")
+        return (2, 0, 0)
+    if fingerprint and (
+        write or check or diff or split_output is not None or compare is not None
+    ):
+        sys.stderr.write(
+            "error: --fingerprint cannot be combined with --write, --check, --diff, "
+            "--split-output or --compare\n"
+        )
+        return (2, 0, 0)
+    if resume and journal_file is None:
+        sys.stderr.write("error: --resume requires --journal\n")
+        return (2, 0, 0)
+    if journal_file is not None and not (write or check):
+        sys.stderr.write("error: --journal requires --write or --check\n")
+        return (2, 0, 0)
+    if prune and split_output is None:
+        sys.stderr.write("error: --prune requires --split-output\n")
+        return (2, 0, 0)
+    if marker and (fmt != "yaml" or not (write or check or diff) or emit):
+        sys.stderr.write(
+            "error: --marker requires YAML output and --write, --check or --diff, "
+            "and cannot be combined with --emit\n"
+        )
+        return (2, 0, 0)
+    if emit and (
+        fingerprint
+        or split_output is not None
+        or compare is not None
+        or journal_file is not None
+    ):
+        sys.stderr.write(
+            "error: --emit cannot be combined with --fingerprint, --split-output, "
+            "--compare or --journal\n"
+        )
+        return (2, 0, 0)
+
     # Stdin: explicit "-" or no path with piped stdin
-    use_stdin = path_arg == "-" or (path_arg is None and not sys.stdin.isatty())
+    path_args = [path_arg] if isinstance(path_arg, str) else list(path_arg or [])
+    if compare is not None:
+        if path_args or write or diff or split_output is not None or index_file:
+            sys.stderr.write(
+                "error: --compare cannot be combined with paths, --write, --diff, "
+                "--split-output or --index\n"
+            )
+            return (2, 0, 0)
+        side_a, side_b = compare
+        return _run_compare(
+            side_a,
+            side_b,
+            normalize_kw=normalize_kw,
+            fmt=fmt,
+            indent=indent,
+            input_format=input_format,
+            doc_filter=doc_filter,
+            jobs=jobs,
+            check=check,
+            summary=summary,
+            limits=limits,
+        )
+    if "-" in path_args and len(path_args) > 1:
+        sys.stderr.write("error: - (stdin) cannot be combined with other paths\n")
+        return (2, 0, 0)
+    use_stdin = path_args == ["-"] or (not path_args and not sys.stdin.isatty())
     if use_stdin:
         if write:
             sys.stderr.write("error: --write is not allowed with stdin\n")
             return (2, 0, 0)
-        try:
-            doc_list = list(load_documents_from_stdin())
-            if not doc_list:
+        if index_file is not None:
+            sys.stderr.write("error: --index is not allowed with stdin\n")
+            return (2, 0, 0)
+        if journal_file is not None:
+            sys.stderr.write("error: --journal is not allowed with stdin\n")
+            return (2, 0, 0)
+        if marker:
+            sys.stderr.write("error: --marker is not allowed with stdin\n")
+            return (2, 0, 0)
+        if fingerprint:
+            return _run_fingerprint(
+                [None],
+                normalize_kw=normalize_kw,
+                input_format=input_format,
+                doc_filter=doc_filter,
+                fmt=fmt,
+                summary=summary,
+                limits=limits,
+            )
+        if split_output is not None:
+            return _run_split(
+                [None],
+                split_output,
+                normalize_kw=normalize_kw,
+                fmt=fmt,
+                indent=indent,
+                input_format=input_format,
+                doc_filter=doc_filter,
+                prune=prune,
+                jobs=jobs,
+                summary=summary,
+                limits=limits,
+            )
+        if not emit:
+            try:
+                # Stream: each document is written as soon as it is normalized
+                # (with sort_documents, once the whole input has been read).
+                def normalized_stream() -> Iterator[tuple[tuple[str, ...], str]]:
+                    sources = load_documents_from_stdin(
+                        input_format,
+                        with_source=True,
+                        accept=doc_filter.accepts_text if doc_filter else None,
+                        skip_paths=skip_paths,
+                        limits=limits,
+                    )
+                    if doc_filter is not None:
+                        sources = select_documents(sources, doc_filter)
+                    for source in sources:
+                        norm = normalize_document(source.doc, **normalize_kw)
+                        text = (
+                            verbatim_text(source, norm, fmt, indent)
+                            if verbatim
+                            else None
+                        )
+                        if text is None:
+                            text = serialize(norm, fmt, indent)
+                        yield document_sort_key(norm), text
+
+                if jobs is not None and jobs > 1:
+                    # Documents are split off as they arrive and normalized in
+                    # worker processes; output keeps input order.
+                    items = parallel_normalized_stream(
+                        wrap_stdin(sys.stdin),
+                        jobs=jobs,
+                        ndjson=input_format == "ndjson",
+                        normalize_kw=normalize_kw,
+                        render=functools.partial(serialize, fmt=fmt, indent=indent),
+                        passthrough=(
+                            functools.partial(verbatim_text, fmt=fmt, indent=indent)
+                            if verbatim
+                            else None
+                        ),
+                        doc_filter=doc_filter,
+                        skip_paths=skip_paths,
+                        limits=limits,
+                    )
+                else:
+                    items = normalized_stream()
+                if sort_documents:
+                    items = external_sort(items, buffer_bytes=sort_buffer_bytes)
+                first = True
+                for _key, text in items:
+                    if not first and fmt != "ndjson":
+                        sys.stdout.write("---\n")
+                    sys.stdout.write(text)
+                    first = False
                 return (0, 0, 0)
-            for _idx, doc in doc_list:
-                norm = normalize_document(doc, **normalize_kw)
-                sys.stdout.write(serialize(norm, fmt, indent))
-                if _idx < len(doc_list) - 1:
-                    sys.stdout.write("---\n")
-            return (0, 0, 0)
-        except Exception as e:
+            except Exception as e:
+                sys.stderr.write(f"error: {e}\n")
+                return (2, 0, 0)
+
+    if use_stdin:
+        # Only reached with --emit: stdin is processed like one file.
+        paths: list[Path | None] = [None]
+    else:
+        try:
+            # Dedupe: a file may be named directly and also be under a named directory.
+            paths = list(dict.fromkeys(p for arg in path_args for p in iter_paths(arg)))
+        except FileNotFoundError as e:
             sys.stderr.write(f"error: {e}\n")
             return (2, 0, 0)
+        if not paths:
+            sys.stderr.write("error: no YAML/JSON files found\n")
+            return (2, 0, 0)
+        if write and any(is_archive(path) for path in paths):
+            sys.stderr.write("error: --write is not allowed with archives\n")
+            return (2, 0, 0)
+    if fingerprint:
+        return _run_fingerprint(
+            [path for path in paths if path.is_file()],
+            normalize_kw=normalize_kw,
+            input_format=input_format,
+            doc_filter=doc_filter,
+            fmt=fmt,
+            summary=summary,
+            limits=limits,
+        )
+    if split_output is not None:
+        return _run_split(
+            [path for path in paths if path.is_file()],
+            split_output,
+            normalize_kw=normalize_kw,
+            fmt=fmt,
+            indent=indent,
+            input_format=input_format,
+            doc_filter=doc_filter,
+            prune=prune,
+            jobs=jobs,
+            summary=summary,
+            limits=limits,
+        )
 
-    try:
-        paths = list(iter_paths(path_arg))
-    except FileNotFoundError as e:
-        sys.stderr.write(f"error: {e}\n")
-        return (2, 0, 0)
-    if not paths:
-        sys.stderr.write("error: no YAML/JSON files found\n")
-        return (2, 0, 0)
+    index = None
+    if index_file is not None:
+        index = ManifestIndex.load(Path(index_file))
+        # The index itself is JSON; never treat it as a manifest.
+        index_path = index.path.resolve()
+        paths = [p for p in paths if p.resolve() != index_path]
+        # Byte offsets are meaningless in compressed files; those are always parsed.
+        rescanned = index.refresh(
+            (
+                p
+                for p in paths
+                if p.is_file() and not is_archive(p) and detect_compression(p) is None
+            ),
+            input_format,
+        )
+        try:
+            index.save()
+        except OSError as e:
+            sys.stderr.write(f"error: {e}\n")
+            return (2, 0, 0)
+        if doc_filter is None:
+            for err in index.errors:
+                sys.stderr.write(f"error: {err}\n")
+            sys.stderr.write(
+                f"Indexed {len(index.files)} files ({rescanned} rescanned), "
+                f"{index.resource_count()} resources\n"
+            )
+            return (2 if index.errors else 0, 0, 0)
+
+    # Everything that affects the output; journals and markers are only trusted if
+    # they were written with the same options.
+    output_options = {
+        "normalize": {
+            k: v.digest if k == "defaults_index" else v for k, v in normalize_kw.items()
+        },
+        "fmt": fmt,
+        "indent": indent,
+        "input_format": input_format,
+        "verbatim": verbatim,
+        "sort_documents": sort_documents,
+    }
+    marker_options = options_fingerprint(output_options) if marker else None
+    verified = 0
+
+    def write_output(path: Path, text: str) -> None:
+        compression = detect_compression(path)
+        if (
+            marker_options is not None
+            and compression is None
+            and path.name.lower().endswith(MARKER_SUFFIXES)
+        ):
+            text = add_marker(text, marker_options)
+        # Compressed inputs are rewritten with the same compression.
+        write_text(path, text, compression)
+
+    journal = None
+    resumed = 0
+    # --check and --diff report instead of writing, even with -w; the journal must
+    # not write files that a run without it would leave alone.
+    writes = write and not (check or diff)
+    if journal_file is not None:
+        journal_path = Path(journal_file)
+        # The journal is JSON lines; never treat it as a manifest.
+        paths = [p for p in paths if p.resolve() != journal_path.resolve()]
+        options = options_fingerprint(
+            dict(output_options, mode="write" if writes else "check")
+        )
+        try:
+            journal = Journal.open(journal_path, options, resume=resume)
+        except OSError as e:
+            sys.stderr.write(f"error: {e}\n")
+            return (2, 0, 0)
 
-    for path in paths:
-        if not path.is_file():
-            continue
+    if emit:
+        try:
+            sinks = EmitSinks(emit, lambda doc, f: serialize(doc, f, indent))
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"error: {e}\n")
+            return (2, 0, 0)
+
+    try:
+        for path in paths:
+            if path is not None and not path.is_file():
+                continue
+            if journal is not None:
+                entry = journal.completed(str(path), file_sha256(path))
+                if entry is not None:
+                    files_changed += entry.files_changed
+                    docs_changed += entry.docs_changed
+                    resumed += 1
+                    continue
+            if marker_options is not None and has_valid_marker(path, marker_options):
+                # Written by an earlier --marker run and untouched since: clean.
+                verified += 1
+                if journal is not None:
+                    journal.record(str(path), file_sha256(path), 0, 0)
+                continue
+            files_before, docs_before = files_changed, docs_changed
+            errors_before = len(parse_errors)
+            try:
+                for key, doc_iter in _iter_sources(
+                    path,
+                    input_format,
+                    doc_filter=doc_filter,
+                    index=index,
+                    skip_paths=skip_paths,
+                    limits=limits,
+                ):
+                    process_docs(key, doc_iter, original_by_path, normalized_by_path)
+            except Exception as e:
+                parse_errors.append(str(e))
+                if limits is not None and limits.exhausted:
+                    break  # Every remaining file would fail the same way.
+            if journal is None or len(parse_errors) > errors_before:
+                continue
+            key = str(path)
+            if writes and key in normalized_by_path:
+                # Write as soon as the file is done so an interruption loses only
+                # the file in progress; results are not kept in memory.
+                original_by_path.pop(key)
+                write_output(path, normalized_by_path.pop(key))
+            journal.record(
+                key,
+                file_sha256(path),
+                files_changed - files_before,
+                docs_changed - docs_before,
+            )
+    finally:
+        if journal is not None:
+            journal.close()
+    if summary and resumed:
+        sys.stderr.write(f"Resumed: {resumed} files already done\n")
+    if summary and verified:
+        sys.stderr.write(f"Verified by marker: {verified} files\n")
+    if sinks is not None:
         try:
-            doc_iter = load_documents_from_path(path)
-            process_docs(path, doc_iter, original_by_path, normalized_by_path)
-        except Exception as e:
-            parse_errors.append(str(e))
+            sinks.close(parse_errors)
+        except OSError as e:
+            parse_errors.append(f"--emit: {e}")
 
     if parse_errors:
         for err in parse_errors:
@@ -199,20 +947,94 @@ def run(
                 continue
             key = str(path)
             if key in normalized_by_path:
-                path.write_text(normalized_by_path[key], encoding="utf-8")
+                write_output(path, normalized_by_path[key])
         return (0, files_changed, docs_changed)
 
-    for path in paths:
-        if not path.is_file():
-            continue
-        key = str(path)
-        if key in normalized_by_path:
-            sys.stdout.write(normalized_by_path[key])
-            if not normalized_by_path[key].endswith("\n"):
-                sys.stdout.write("\n")
+    if sinks is not None:
+        return (0, files_changed, docs_changed)
+    # Insertion order follows paths (and archive member order within archives).
+    for text in normalized_by_path.values():
+        sys.stdout.write(text)
+        if not text.endswith("\n"):
+            sys.stdout.write("\n")
     return (0, files_changed, docs_changed)
 
 
+def _display_path(path: Path) -> str:
+    try:
+        return str(path.relative_to(Path.cwd()))
+    except ValueError:
+        return str(path)
+
+
+def _run_watch(path_args: list[str], run_kw: dict[str, Any]) -> int:
+    """
+    Process every path once, then wait for changes and re-run only the changed files,
+    reporting each straight away. Runs until interrupted (Ctrl-C).
+    """
+    check = bool(run_kw.get("check"))
+    dirty: set[str] = set()
+
+    def process(paths: list[Path]) -> None:
+        for path in paths:
+            key = _display_path(path)
+            if not path.is_file():
+                dirty.discard(key)
+                sys.stdout.write(f"removed: {key}\n")
+                continue
+            code, _, docs = run(key, **run_kw)
+            if check and code == 1:
+                dirty.add(key)
+                sys.stdout.write(f"would change: {key} ({docs} documents)\n")
+            elif check and code == 0 and key in dirty:
+                dirty.discard(key)
+                sys.stdout.write(f"clean: {key}\n")
+        if check:
+            sys.stderr.write(f"Files that would change: {len(dirty)}\n")
+        sys.stdout.flush()
+
+    try:
+        paths = [
+            p.absolute() for arg in path_args for p in iter_paths(arg) if p.is_file()
+        ]
+    except FileNotFoundError as e:
+        sys.stderr.write(f"error: {e}\n")
+        return 2
+    watcher = open_watcher(path_args)
+    mode = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    try:
+        process(list(dict.fromkeys(paths)))
+        sys.stderr.write(
+            f"Watching {len(path_args)} path(s) ({mode}); Ctrl-C to stop\n"
+        )
+        while True:
+            process(sorted(watcher.wait()))
+    except KeyboardInterrupt:
+        return 1 if dirty else 0
+    finally:
+        watcher.close()
+
+
+def _size_arg(text: str) -> int:
+    try:
+        return parse_size(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+def _open_output_stream(output: str | None, compression: str | None):
+    """Context manager for the output stream: stdout, or FILE, optionally compressed."""
+    if output is None and compression is None:
+        return contextlib.nullcontext(sys.stdout)
+    if output is None:
+        # Leave stdout itself open; only the compressor is closed (and flushed).
+        return contextlib.closing(open_output(sys.stdout.buffer, compression))
+    with contextlib.ExitStack() as stack:
+        stream = open_output(stack.enter_context(open(output, "wb")), compression)
+        stack.pop_all()  # The stream now owns the file.
+    return stream
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         prog="kubectl-manifest-clean",
@@ -220,16 +1042,34 @@ def main() -> None:
     )
     parser.add_argument(
         "path",
-        nargs="?",
+        nargs="*",
+        default=[],
+        help="Files, directories, archives (tar, tar.gz, zip), or - for stdin",
+    )
+    parser.add_argument(
+        "--files-from",
+        metavar="FILE",
         default=None,
-        help="File, directory, or - for stdin",
+        help="Read additional paths from FILE, one per line (- for stdin)",
+    )
+    parser.add_argument(
+        "-0",
+        "--null",
+        action="store_true",
+        help="With --files-from, paths are NUL-separated (e.g. find -print0)",
     )
     parser.add_argument(
         "--format",
-        choices=("yaml", "json"),
+        choices=("yaml", "json", "ndjson"),
         default="yaml",
         help="Output format (default: yaml)",
     )
+    parser.add_argument(
+        "--input-format",
+        choices=("auto", "yaml", "ndjson"),
+        default="auto",
+        help="Input format (default: auto; *.ndjson/*.jsonl are NDJSON, else YAML)",
+    )
     parser.add_argument(
         "--indent",
         type=int,
@@ -370,7 +1210,21 @@ def main() -> None:
         "-w",
         "--write",
         action="store_true",
-        help="Overwrite files in place (file/dir only)",
+        help="Overwrite files in place (file/dir only), keeping their compression",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        metavar="FILE",
+        default=None,
+        help="Write output to FILE instead of stdout; *.gz and *.zst are compressed",
+    )
+    parser.add_argument(
+        "--compress",
+        choices=("auto", "gzip", "zstd"),
+        default=None,
+        help="Compress output (auto: zstd if the zstandard package is installed, "
+        "else gzip)",
     )
     parser.add_argument(
         "--check",
@@ -387,6 +1241,178 @@ def main() -> None:
         action="store_true",
         help="Show changed files and doc count",
     )
+    parser.add_argument(
+        "--verbatim",
+        action="store_true",
+        help="Copy documents that need no changes from the input as-is (YAML output)",
+    )
+    parser.add_argument(
+        "--sort-documents",
+        action="store_true",
+        help="Order documents by apiVersion, kind, namespace, name",
+    )
+    parser.add_argument(
+        "--sort-buffer-mb",
+        type=int,
+        default=DEFAULT_SORT_BUFFER_BYTES // (1024 * 1024),
+        metavar="N",
+        help="Memory for --sort-documents on stdin before spilling to temp files "
+        "(default: 64)",
+    )
+    parser.add_argument(
+        "--select",
+        metavar="FIELD=VALUE,...",
+        default=None,
+        help="Only process resources matching apiVersion/kind/namespace/name, "
+        "e.g. kind=Deployment,namespace=prod,name=payments",
+    )
+    parser.add_argument(
+        "--kind",
+        dest="kinds",
+        action="append",
+        metavar="KIND[,KIND...]",
+        default=None,
+        help="Only process resources of these kinds (case-insensitive; repeatable)",
+    )
+    parser.add_argument(
+        "-n",
+        "--namespace",
+        dest="namespaces",
+        action="append",
+        metavar="NS[,NS...]",
+        default=None,
+        help="Only process resources in these namespaces (repeatable)",
+    )
+    parser.add_argument(
+        "-l",
+        "--selector",
+        dest="label_selector",
+        metavar="SELECTOR",
+        default=None,
+        help="Only process resources matching a label selector, "
+        "e.g. app=web,tier!=db,env in (prod,staging)",
+    )
+    parser.add_argument(
+        "--index",
+        dest="index_file",
+        metavar="FILE",
+        default=None,
+        help="Persistent resource index; refreshed by mtime/size. Alone, only updates "
+        "the index; with a filter, parses only matching documents",
+    )
+    parser.add_argument(
+        "--split-output",
+        metavar="DIR",
+        default=None,
+        help="Write each resource to DIR/<namespace>/<kind>/<name>.<ext>",
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="With --split-output, delete files for resources not in the input",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Parallel workers: threads writing --split-output files (default: "
+        "based on CPU count), worker processes for --compare and stdin (default: "
+        "none, everything runs in one process)",
+    )
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("A", "B"),
+        default=None,
+        help="Compare two files/directories/archives by resource identity; "
+        "exit code 1 if they differ",
+    )
+    parser.add_argument(
+        "--fingerprint",
+        action="store_true",
+        help="Write one line per resource with its identity and a sha256 digest of "
+        "the normalized content: TSV, or NDJSON with --format json/ndjson",
+    )
+    parser.add_argument(
+        "--journal",
+        dest="journal_file",
+        metavar="FILE",
+        default=None,
+        help="Record each finished file in FILE (JSON lines) as the run progresses; "
+        "with --write, files are written as they finish",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="With --journal, skip files the journal records as done and unchanged "
+        "since",
+    )
+    parser.add_argument(
+        "--drop-defaults",
+        action="store_true",
+        help="Drop fields whose value equals the API server's default "
+        "(e.g. protocol: TCP, restartPolicy: Always, default Deployment strategy)",
+    )
+    parser.add_argument(
+        "--openapi",
+        metavar="FILE",
+        default=None,
+        help="OpenAPI document (v2/v3 JSON or YAML) or CRD with more defaults; "
+        "implies --drop-defaults. Compiled once and cached",
+    )
+    parser.add_argument(
+        "--marker",
+        action="store_true",
+        help="With -w, end each YAML file with a comment holding its digest and the "
+        "options; later --check/--diff/-w runs skip files whose marker still matches",
+    )
+    parser.add_argument(
+        "--emit",
+        action="append",
+        metavar="KIND:TARGET",
+        help="Also write KIND (yaml, json, ndjson, diff, summary) to TARGET, from the "
+        "same pass; repeatable. A TARGET ending in / is a directory with one file per "
+        "resource, - is stdout",
+    )
+    parser.add_argument(
+        "--max-document-bytes",
+        type=_size_arg,
+        default=None,
+        metavar="SIZE",
+        help="Fail an input whose document (or line) is larger than SIZE bytes; "
+        "K/M/G suffixes allowed (default: unlimited)",
+    )
+    parser.add_argument(
+        "--max-depth",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Fail a document nested deeper than N mappings/sequences "
+        "(default: unlimited)",
+    )
+    parser.add_argument(
+        "--max-alias-nodes",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Fail a YAML document whose aliases expand to more than N nodes "
+        "(default: unlimited)",
+    )
+    parser.add_argument(
+        "--max-input-bytes",
+        type=_size_arg,
+        default=None,
+        metavar="SIZE",
+        help="Stop once the run has read more than SIZE bytes of input; K/M/G "
+        "suffixes allowed (default: unlimited)",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and re-process files as they change (inotify, else "
+        "polling); combine with --check or --diff",
+    )
     parser.add_argument(
         "--version",
         action="version",
@@ -395,38 +1421,105 @@ def main() -> None:
 
     args = parser.parse_args()
 
-    path_arg = args.path
-    if path_arg is None and not sys.stdin.isatty():
-        path_arg = "-"
-
-    code, _, _ = run(
-        path_arg,
-        fmt=args.format,
-        indent=args.indent,
-        drop_status=args.drop_status,
-        drop_managed_fields=args.drop_managed_fields,
-        drop_last_applied=args.drop_last_applied,
-        drop_creation_timestamp=args.drop_creation_timestamp,
-        drop_resource_version=args.drop_resource_version,
-        drop_uid=args.drop_uid,
-        drop_generation=args.drop_generation,
-        drop_owner_references=args.drop_owner_references,
-        drop_generate_name=args.drop_generate_name,
-        drop_node_name=args.drop_node_name,
-        drop_ephemeral_containers=args.drop_ephemeral_containers,
-        drop_dns_policy=args.drop_dns_policy,
-        drop_termination_grace_period_seconds=args.drop_termination_grace_period_seconds,
-        drop_revision_history_limit=args.drop_revision_history_limit,
-        drop_progress_deadline_seconds=args.drop_progress_deadline_seconds,
-        drop_termination_message=args.drop_termination_message,
-        drop_empty=args.drop_empty,
-        sort_labels=args.sort_labels,
-        sort_annotations=args.sort_annotations,
-        write=args.write,
-        check=args.check,
-        diff=args.diff,
-        summary=args.summary,
-    )
+    path_arg = list(args.path)
+    if args.files_from is not None:
+        if args.files_from == "-":
+            path_arg.extend(read_path_list(sys.stdin, args.null))
+        else:
+            with open(args.files_from, encoding="utf-8") as f:
+                path_arg.extend(read_path_list(f, args.null))
+        if not path_arg:
+            # An empty list (e.g. no staged manifests) is not a request for stdin.
+            sys.exit(0)
+    elif not path_arg and args.compare is None and not sys.stdin.isatty():
+        path_arg = ["-"]
+
+    if args.output is not None and (args.write or args.split_output is not None):
+        parser.error("--output cannot be combined with --write or --split-output")
+    compression = resolve_compression(args.compress)
+    if compression is None and args.output is not None:
+        compression = compression_from_name(args.output)
+    run_kw: dict[str, Any] = {
+        "fmt": args.format,
+        "indent": args.indent,
+        "input_format": args.input_format,
+        "drop_status": args.drop_status,
+        "drop_managed_fields": args.drop_managed_fields,
+        "drop_last_applied": args.drop_last_applied,
+        "drop_creation_timestamp": args.drop_creation_timestamp,
+        "drop_resource_version": args.drop_resource_version,
+        "drop_uid": args.drop_uid,
+        "drop_generation": args.drop_generation,
+        "drop_owner_references": args.drop_owner_references,
+        "drop_generate_name": args.drop_generate_name,
+        "drop_node_name": args.drop_node_name,
+        "drop_ephemeral_containers": args.drop_ephemeral_containers,
+        "drop_dns_policy": args.drop_dns_policy,
+        "drop_termination_grace_period_seconds": (
+            args.drop_termination_grace_period_seconds
+        ),
+        "drop_revision_history_limit": args.drop_revision_history_limit,
+        "drop_progress_deadline_seconds": args.drop_progress_deadline_seconds,
+        "drop_termination_message": args.drop_termination_message,
+        "drop_empty": args.drop_empty,
+        "sort_labels": args.sort_labels,
+        "sort_annotations": args.sort_annotations,
+        "write": args.write,
+        "check": args.check,
+        "diff": args.diff,
+        "summary": args.summary,
+        "verbatim": args.verbatim,
+        "sort_documents": args.sort_documents,
+        "sort_buffer_bytes": args.sort_buffer_mb * 1024 * 1024,
+        "select": args.select,
+        "kinds": args.kinds,
+        "namespaces": args.namespaces,
+        "label_selector": args.label_selector,
+        "index_file": args.index_file,
+        "split_output": args.split_output,
+        "prune": args.prune,
+        "jobs": args.jobs,
+        "compare": args.compare,
+        "fingerprint": args.fingerprint,
+        "journal_file": args.journal_file,
+        "resume": args.resume,
+        "drop_defaults": args.drop_defaults,
+        "openapi": args.openapi,
+        "emit": args.emit,
+        "marker": args.marker,
+        "max_document_bytes": args.max_document_bytes,
+        "max_depth": args.max_depth,
+        "max_alias_nodes": args.max_alias_nodes,
+        "max_input_bytes": args.max_input_bytes,
+    }
+    if args.watch:
+        if not path_arg or "-" in path_arg:
+            parser.error("--watch needs files or directories, not stdin")
+        if args.output is not None or any(
+            run_kw[k]
+            for k in (
+                "write",
+                "split_output",
+                "compare",
+                "fingerprint",
+                "journal_file",
+                "emit",
+            )
+        ):
+            parser.error(
+                "--watch cannot be combined with --output, --write, --split-output, "
+                "--compare, --fingerprint, --journal or --emit"
+            )
+        sys.exit(_run_watch(path_arg, run_kw))
+
+    try:
+        output = _open_output_stream(args.output, compression)
+    except (OSError, RuntimeError) as e:
+        sys.stderr.write(f"error: {e}\n")
+        sys.exit(2)
+
+    with output as out, contextlib.redirect_stdout(out):
+        code, _, _ = run(path_arg, **run_kw)
     sys.exit(code)
 
 
@@ -0,0 +1,170 @@
+"""Identity-matched comparison of two manifest trees (--compare A B)."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from .fingerprint import canonical_digest
+from .io import (
+    INPUT_ERRORS,
+    is_archive,
+    load_documents_from_archive,
+    load_documents_from_path,
+)
+from .limits import Limits
+from .normalize import normalize_document, resource_identity
+from .prune import prune_paths
+from .selector import ResourceFilter
+from .split import expand_list_items
+
+Identity = tuple[str, str, str, str]
+
+
+class ResourceRecord(NamedTuple):
+    """
+    One normalized resource: where it came from, its canonical digest and the
+    normalized document. Only resources that differ are ever serialized.
+    """
+
+    origin: str
+    digest: str
+    doc: dict[str, Any]
+
+
+class CompareResult(NamedTuple):
+    only_a: list[tuple[Identity, ResourceRecord]]
+    only_b: list[tuple[Identity, ResourceRecord]]
+    different: list[tuple[Identity, ResourceRecord, ResourceRecord]]
+    identical: int
+    duplicates: list[str]
+    errors: list[str]
+
+
+def format_identity(identity: Identity) -> str:
+    """Render an identity as "apiVersion kind namespace/name" (cluster-scoped: name)."""
+    api_version, kind, namespace, name = identity
+    ref = f"{namespace}/{name}" if namespace else name
+    return f"{api_version} {kind} {ref}".strip()
+
+
+def scan_path(
+    path: str,
+    *,
+    input_format: str,
+    normalize_kw: dict[str, Any],
+    doc_filter: ResourceFilter | None = None,
+    limits: Limits | None = None,
+) -> list[tuple[Identity, ResourceRecord]]:
+    """
+    Normalize every resource in a file or archive (List items expanded) and return
+    (identity, record) pairs. Module-level so it can run in a worker process.
+    """
+    p = Path(path)
+    load_kw = {
+        "accept": doc_filter.accepts_text if doc_filter is not None else None,
+        "skip_paths": prune_paths(normalize_kw),
+        "limits": limits,
+    }
+    if is_archive(p):
+        sources = load_documents_from_archive(p, input_format, **load_kw)
+    else:
+        sources = [(path, load_documents_from_path(p, input_format, **load_kw))]
+    records: list[tuple[Identity, ResourceRecord]] = []
+    for origin, doc_iter in sources:
+        for _idx, doc in doc_iter:
+            for item in expand_list_items(doc):
+                if doc_filter is not None and not doc_filter.matches_document(item):
+                    continue
+                norm = normalize_document(item, **normalize_kw)
+                record = ResourceRecord(origin, canonical_digest(norm), norm)
+                records.append((resource_identity(norm), record))
+    return records
+
+
+def _index_side(
+    scanned: list[list[tuple[Identity, ResourceRecord]] | Exception],
+) -> tuple[dict[Identity, ResourceRecord], list[str], list[str]]:
+    resources: dict[Identity, ResourceRecord] = {}
+    duplicates: list[str] = []
+    errors: list[str] = []
+    for result in scanned:
+        if isinstance(result, Exception):
+            errors.append(str(result))
+            continue
+        for identity, record in result:
+            first = resources.setdefault(identity, record)
+            if first is not record:
+                duplicates.append(
+                    f"{format_identity(identity)} in {record.origin} "
+                    f"(already defined in {first.origin})"
+                )
+    return resources, duplicates, errors
+
+
+def compare_trees(
+    a_paths: Sequence[Path],
+    b_paths: Sequence[Path],
+    *,
+    input_format: str = "auto",
+    normalize_kw: dict[str, Any],
+    doc_filter: ResourceFilter | None = None,
+    jobs: int | None = None,
+    limits: Limits | None = None,
+) -> CompareResult:
+    """
+    Normalize both sides, join resources on (apiVersion, kind, namespace, name) and
+    classify them. Pairs with equal digests are identical and never serialized or
+    diffed. With jobs > 1, files are normalized in that many worker processes, and each
+    worker counts limits.max_input_bytes for the files it reads.
+    """
+    scan_kw = {
+        "input_format": input_format,
+        "normalize_kw": normalize_kw,
+        "doc_filter": doc_filter,
+        "limits": limits,
+    }
+    all_paths = [str(p) for p in (*a_paths, *b_paths)]
+    # Results stay in path order so duplicate detection is deterministic.
+    scanned: list[list[tuple[Identity, ResourceRecord]] | Exception] = []
+    if jobs is not None and jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(scan_path, p, **scan_kw) for p in all_paths]
+            for future in futures:
+                try:
+                    scanned.append(future.result())
+                except INPUT_ERRORS as e:
+                    scanned.append(e)
+    else:
+        for path in all_paths:
+            try:
+                scanned.append(scan_path(path, **scan_kw))
+            except INPUT_ERRORS as e:
+                scanned.append(e)
+
+    a_side, a_dups, a_errors = _index_side(scanned[: len(a_paths)])
+    b_side, b_dups, b_errors = _index_side(scanned[len(a_paths) :])
+
+    only_a: list[tuple[Identity, ResourceRecord]] = []
+    different: list[tuple[Identity, ResourceRecord, ResourceRecord]] = []
+    identical = 0
+    for identity in sorted(a_side):
+        a_record = a_side[identity]
+        b_record = b_side.get(identity)
+        if b_record is None:
+            only_a.append((identity, a_record))
+        elif a_record.digest == b_record.digest:
+            identical += 1
+        else:
+            different.append((identity, a_record, b_record))
+    only_b = [(i, b_side[i]) for i in sorted(b_side) if i not in a_side]
+    return CompareResult(
+        only_a,
+        only_b,
+        different,
+        identical,
+        a_dups + b_dups,
+        a_errors + b_errors,
+    )
@@ -0,0 +1,140 @@
+"""
+Transparent gzip/zstd compression for manifest inputs and outputs (zstd is optional).
+"""
+
+from __future__ import annotations
+
+import contextlib
+import gzip
+import io
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+try:
+    import zstandard
+except ImportError:  # optional: pip install kubectl-manifest-clean[zstd]
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+_MAGIC = ((b"\x1f\x8b", "gzip"), (b"\x28\xb5\x2f\xfd", "zstd"))
+_MAGIC_LEN = max(len(magic) for magic, _ in _MAGIC)
+
+# Raised while reading truncated or corrupt compressed input (gzip's BadGzipFile is an
+# OSError), or zstd input without the zstandard package (RuntimeError).
+DECOMPRESSION_ERRORS: tuple[type[Exception], ...] = (EOFError, RuntimeError) + (
+    (zstandard.ZstdError,) if zstandard is not None else ()
+)
+
+
+def strip_compression_suffix(name: str) -> str:
+    """Return name without a trailing .gz/.zst, e.g. "app.yaml.gz" -> "app.yaml"."""
+    for suffix in COMPRESSION_SUFFIXES:
+        if name.lower().endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def compression_from_name(name: str) -> str | None:
+    """Return "gzip" or "zstd" if name ends with .gz or .zst, else None."""
+    for suffix, compression in COMPRESSION_SUFFIXES.items():
+        if name.lower().endswith(suffix):
+            return compression
+    return None
+
+
+def compression_from_magic(head: bytes) -> str | None:
+    """
+    Return "gzip" or "zstd" if head starts with that format's magic bytes, else None.
+    """
+    for magic, compression in _MAGIC:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def detect_compression(path: Path) -> str | None:
+    """Detect a file's compression by suffix, falling back to its magic bytes."""
+    compression = compression_from_name(path.name)
+    if compression is not None:
+        return compression
+    with open(path, "rb") as f:
+        return compression_from_magic(f.read(_MAGIC_LEN))
+
+
+def resolve_compression(compression: str | None) -> str | None:
+    """Map "auto" to zstd when zstandard is installed, otherwise gzip."""
+    if compression == "auto":
+        return "zstd" if zstandard is not None else "gzip"
+    return compression
+
+
+def _require_zstandard() -> None:
+    if zstandard is None:
+        raise RuntimeError(
+            "zstd support requires the zstandard package (pip install zstandard)"
+        )
+
+
+def decompressing_reader(raw: BinaryIO, compression: str | None) -> BinaryIO:
+    """Wrap a binary stream so reads return decompressed bytes (streaming)."""
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if compression == "zstd":
+        _require_zstandard()
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+    return raw
+
+
+def compressing_writer(raw: BinaryIO, compression: str | None) -> BinaryIO:
+    """Wrap a binary stream so writes are compressed; close the wrapper to flush."""
+    if compression == "gzip":
+        # No name or mtime in the header keeps output byte-identical across runs.
+        return gzip.GzipFile(filename="", fileobj=raw, mode="wb", mtime=0)
+    if compression == "zstd":
+        _require_zstandard()
+        return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+    return raw
+
+
+def open_text(path: Path) -> TextIO:
+    """
+    Open a manifest file for reading as text, decompressing gzip/zstd transparently.
+    """
+    compression = detect_compression(path)
+    if compression == "gzip":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if compression == "zstd":
+        _require_zstandard()
+        with contextlib.ExitStack() as stack:
+            raw = stack.enter_context(open(path, "rb"))
+            reader = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+            stack.pop_all()  # The reader now owns the file.
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def wrap_stdin(stream: TextIO) -> TextIO:
+    """Return stream, or a decompressing text reader if stdin carries gzip/zstd data."""
+    buffer = getattr(stream, "buffer", None)
+    if buffer is None or not hasattr(buffer, "peek"):
+        return stream
+    compression = compression_from_magic(buffer.peek(_MAGIC_LEN)[:_MAGIC_LEN])
+    if compression is None:
+        return stream
+    return io.TextIOWrapper(decompressing_reader(buffer, compression), encoding="utf-8")
+
+
+def write_text(path: Path, text: str, compression: str | None) -> None:
+    """Write text to path, compressed with compression (None writes plain UTF-8)."""
+    if compression is None:
+        path.write_text(text, encoding="utf-8")
+        return
+    with open(path, "wb") as raw, compressing_writer(raw, compression) as out:
+        out.write(text.encode("utf-8"))
+
+
+def open_output(raw: BinaryIO, compression: str | None) -> TextIO:
+    """
+    Text writer over raw, compressed with compression; closing it flushes the stream.
+    """
+    return io.TextIOWrapper(compressing_writer(raw, compression), encoding="utf-8")
@@ -0,0 +1,359 @@
+"""
+Server-applied defaults (--drop-defaults): a compact per-kind index of schema defaults,
+bundled or compiled from an OpenAPI document (--openapi) and cached on disk.
+
+The index is a trie per "apiVersion/kind": each node maps a field name to a child node;
+a child's "=" key holds the field's default and its "[]" key the node for list items.
+Stripping walks the document alongside the trie, so fields without defaults cost
+nothing and there is no per-field schema lookup.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any
+
+DEFAULTS_INDEX_VERSION = 1
+DEFAULT_KEY = "="
+ITEMS_KEY = "[]"
+
+Node = dict[str, Any]
+
+
+def _leaf(value: Any) -> Node:
+    return {DEFAULT_KEY: value}
+
+
+def _probe() -> Node:
+    return {
+        "timeoutSeconds": _leaf(1),
+        "periodSeconds": _leaf(10),
+        "successThreshold": _leaf(1),
+        "failureThreshold": _leaf(3),
+        "httpGet": {"scheme": _leaf("HTTP")},
+    }
+
+
+def _container() -> Node:
+    return {
+        "terminationMessagePath": _leaf("/dev/termination-log"),
+        "terminationMessagePolicy": _leaf("File"),
+        "ports": {ITEMS_KEY: {"protocol": _leaf("TCP")}},
+        "env": {ITEMS_KEY: {"valueFrom": {"fieldRef": {"apiVersion": _leaf("v1")}}}},
+        "livenessProbe": _probe(),
+        "readinessProbe": _probe(),
+        "startupProbe": _probe(),
+    }
+
+
+def _pod_spec() -> Node:
+    container = _container()
+    return {
+        "restartPolicy": _leaf("Always"),
+        "schedulerName": _leaf("default-scheduler"),
+        "dnsPolicy": _leaf("ClusterFirst"),
+        "terminationGracePeriodSeconds": _leaf(30),
+        "enableServiceLinks": _leaf(True),
+        "containers": {ITEMS_KEY: container},
+        "initContainers": {ITEMS_KEY: container},
+    }
+
+
+def _template(spec: Node) -> Node:
+    return {"template": {"spec": spec}}
+
+
+def _job_spec() -> Node:
+    return {
+        "backoffLimit": _leaf(6),
+        "completionMode": _leaf("NonIndexed"),
+        "suspend": _leaf(False),
+        **_template(_pod_spec()),
+    }
+
+
+def _builtin_index() -> dict[str, Node]:
+    """
+    Static defaults the API server applies to built-in kinds. Defaults that depend on
+    other fields (imagePullPolicy on the image tag, targetPort on port, ipFamilyPolicy)
+    are not schema defaults and are left alone.
+    """
+    workload = {"revisionHistoryLimit": _leaf(10)}
+    index: dict[str, Node] = {
+        "v1/Pod": {"spec": _pod_spec()},
+        "v1/ReplicationController": {
+            "spec": {"replicas": _leaf(1), **_template(_pod_spec())}
+        },
+        "v1/Service": {
+            "spec": {
+                "type": _leaf("ClusterIP"),
+                "sessionAffinity": _leaf("None"),
+                "internalTrafficPolicy": _leaf("Cluster"),
+                "ports": {ITEMS_KEY: {"protocol": _leaf("TCP")}},
+            }
+        },
+        "apps/v1/Deployment": {
+            "spec": {
+                "replicas": _leaf(1),
+                "progressDeadlineSeconds": _leaf(600),
+                "strategy": {
+                    "type": _leaf("RollingUpdate"),
+                    "rollingUpdate": {
+                        "maxSurge": _leaf("25%"),
+                        "maxUnavailable": _leaf("25%"),
+                    },
+                },
+                **workload,
+                **_template(_pod_spec()),
+            }
+        },
+        "apps/v1/ReplicaSet": {
+            "spec": {"replicas": _leaf(1), **_template(_pod_spec())}
+        },
+        "apps/v1/StatefulSet": {
+            "spec": {
+                "replicas": _leaf(1),
+                "podManagementPolicy": _leaf("OrderedReady"),
+                "updateStrategy": {
+                    "type": _leaf("RollingUpdate"),
+                    "rollingUpdate": {"partition": _leaf(0)},
+                },
+                "persistentVolumeClaimRetentionPolicy": {
+                    "whenDeleted": _leaf("Retain"),
+                    "whenScaled": _leaf("Retain"),
+                },
+                **workload,
+                **_template(_pod_spec()),
+            }
+        },
+        "apps/v1/DaemonSet": {
+            "spec": {
+                "updateStrategy": {
+                    "type": _leaf("RollingUpdate"),
+                    "rollingUpdate": {
+                        "maxUnavailable": _leaf(1),
+                        "maxSurge": _leaf(0),
+                    },
+                },
+                **workload,
+                **_template(_pod_spec()),
+            }
+        },
+        "batch/v1/Job": {"spec": _job_spec()},
+        "batch/v1/CronJob": {
+            "spec": {
+                "concurrencyPolicy": _leaf("Allow"),
+                "suspend": _leaf(False),
+                "successfulJobsHistoryLimit": _leaf(3),
+                "failedJobsHistoryLimit": _leaf(1),
+                "jobTemplate": {"spec": _job_spec()},
+            }
+        },
+    }
+    return index
+
+
+class DefaultsIndex:
+    """Per-kind defaults tries plus a digest identifying their content."""
+
+    def __init__(self, roots: dict[str, Node]) -> None:
+        self.roots = roots
+        self.digest = hashlib.sha256(
+            json.dumps(roots, sort_keys=True, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()
+
+    @classmethod
+    def builtin(cls) -> DefaultsIndex:
+        return cls(_builtin_index())
+
+    def merged(self, roots: dict[str, Node]) -> DefaultsIndex:
+        """Return a new index where kinds in roots replace this index's entries."""
+        return DefaultsIndex({**self.roots, **roots})
+
+
+# --- compiling OpenAPI -------------------------------------------------------------
+
+
+def _ref_name(ref: str) -> str:
+    return ref.rsplit("/", 1)[-1]
+
+
+class _Compiler:
+    """Walk OpenAPI schemas into defaults tries; shared definitions compile once."""
+
+    def __init__(self, definitions: dict[str, Any]) -> None:
+        self.definitions = definitions
+        self.compiled: dict[str, Node] = {}
+        self.visiting: set[str] = set()
+
+    def schema(self, schema: Any) -> Node:
+        if not isinstance(schema, dict):
+            return {}
+        ref = schema.get("$ref")
+        if ref is None:
+            # OpenAPI v3 wraps references as allOf: [{$ref: ...}].
+            all_of = schema.get("allOf")
+            if isinstance(all_of, list) and len(all_of) == 1:
+                ref = all_of[0].get("$ref") if isinstance(all_of[0], dict) else None
+        node = self.definition(_ref_name(ref)) if ref else {}
+        node = dict(node)
+        for name, prop in (schema.get("properties") or {}).items():
+            child = self.schema(prop)
+            if isinstance(prop, dict) and "default" in prop:
+                child = {**child, DEFAULT_KEY: prop["default"]}
+            if child:
+                node[name] = child
+        items = self.schema(schema.get("items"))
+        if items:
+            node[ITEMS_KEY] = items
+        return node
+
+    def definition(self, name: str) -> Node:
+        if name in self.compiled:
+            return self.compiled[name]
+        if name in self.visiting:
+            # Recursive schemas (e.g. JSONSchemaProps) have no defaults worth following.
+            return {}
+        self.visiting.add(name)
+        node = self.schema(self.definitions.get(name))
+        self.visiting.discard(name)
+        self.compiled[name] = node
+        return node
+
+
+def _gvk_key(group: str, version: str, kind: str) -> str:
+    return f"{group}/{version}/{kind}" if group else f"{version}/{kind}"
+
+
+def compile_openapi(document: dict[str, Any]) -> dict[str, Node]:
+    """
+    Compile an OpenAPI v2 (definitions) or v3 (components.schemas) document, or a
+    CustomResourceDefinition, into defaults tries keyed by "apiVersion/kind".
+    """
+    roots: dict[str, Node] = {}
+    if document.get("kind") == "CustomResourceDefinition":
+        spec = document.get("spec") or {}
+        kind = (spec.get("names") or {}).get("kind", "")
+        for version in spec.get("versions") or []:
+            schema = (version.get("schema") or {}).get("openAPIV3Schema")
+            node = _Compiler({}).schema(schema)
+            if node:
+                roots[
+                    _gvk_key(spec.get("group", ""), version.get("name", ""), kind)
+                ] = node
+        return roots
+    definitions = document.get("definitions")
+    if definitions is None:
+        definitions = (document.get("components") or {}).get("schemas") or {}
+    compiler = _Compiler(definitions)
+    for name, schema in definitions.items():
+        gvks = (
+            schema.get("x-kubernetes-group-version-kind")
+            if isinstance(schema, dict)
+            else None
+        )
+        for gvk in gvks or []:
+            node = compiler.definition(name)
+            if node:
+                roots[
+                    _gvk_key(
+                        gvk.get("group", ""),
+                        gvk.get("version", ""),
+                        gvk.get("kind", ""),
+                    )
+                ] = node
+    return roots
+
+
+def _default_cache_dir() -> Path:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base) / "kubectl-manifest-clean"
+
+
+def _load_schema_document(data: bytes) -> dict[str, Any]:
+    try:
+        document = json.loads(data)
+    except ValueError:
+        from ruamel.yaml import YAML
+
+        document = YAML(typ="safe").load(data)
+    if isinstance(document, dict):
+        return document
+    raise ValueError("expected an OpenAPI document or CustomResourceDefinition")
+
+
+def load_defaults_index(
+    openapi: Path | None = None, cache_dir: Path | None = None
+) -> DefaultsIndex:
+    """
+    Return the builtin index, extended with the kinds compiled from openapi. The
+    compiled index is cached under cache_dir keyed by the file's sha256, so later runs
+    only read a small JSON file.
+    """
+    index = DefaultsIndex.builtin()
+    if openapi is None:
+        return index
+    data = openapi.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    cache = (cache_dir or _default_cache_dir()) / (
+        f"defaults-v{DEFAULTS_INDEX_VERSION}-{digest}.json"
+    )
+    try:
+        roots = json.loads(cache.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        roots = compile_openapi(_load_schema_document(data))
+        try:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            tmp = cache.with_name(cache.name + ".tmp")
+            tmp.write_text(json.dumps(roots, separators=(",", ":")), encoding="utf-8")
+            os.replace(tmp, cache)
+        except OSError:
+            pass  # A read-only cache only costs a recompile next time.
+    return index.merged(roots)
+
+
+# --- stripping -----------------------------------------------------------------------
+
+
+def _equals_default(value: Any, default: Any) -> bool:
+    # 1 == True and "1" != 1: compare bools and strings only with their own kind.
+    if isinstance(value, bool) != isinstance(default, bool):
+        return False
+    if isinstance(value, str) != isinstance(default, str):
+        return False
+    return value == default
+
+
+def _strip(obj: Any, node: Node) -> None:
+    if isinstance(obj, list):
+        items = node.get(ITEMS_KEY)
+        if items:
+            for item in obj:
+                _strip(item, items)
+        return
+    if not isinstance(obj, dict):
+        return
+    for name, child in node.items():
+        if name in (DEFAULT_KEY, ITEMS_KEY) or name not in obj:
+            continue
+        value = obj[name]
+        if DEFAULT_KEY in child and _equals_default(value, child[DEFAULT_KEY]):
+            del obj[name]
+        else:
+            _strip(value, child)
+
+
+def strip_defaults(obj: dict[str, Any], index: DefaultsIndex) -> None:
+    """Mutate obj in place, removing fields whose value equals their schema default."""
+    if not isinstance(obj, dict):
+        return
+    if obj.get("kind") == "List" and isinstance(obj.get("items"), list):
+        for item in obj["items"]:
+            strip_defaults(item, index)
+        return
+    node = index.roots.get(f"{obj.get('apiVersion')}/{obj.get('kind')}")
+    if node:
+        _strip(obj, node)
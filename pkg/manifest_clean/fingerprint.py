@@ -0,0 +1,71 @@
+"""Canonical content digests of normalized resources (--fingerprint, --compare)."""
+
+from __future__ import annotations
+
+import datetime
+import hashlib
+import json
+from typing import Any
+
+from .normalize import resource_identity
+
+
+def _encode_default(obj: Any) -> Any:
+    # YAML timestamps are tagged so they never collide with an equal-looking string.
+    if isinstance(obj, (datetime.date, datetime.datetime)):
+        return {"!!timestamp": obj.isoformat()}
+    return str(obj)
+
+
+def _stringify_keys(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {str(k): _stringify_keys(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_stringify_keys(v) for v in obj]
+    return obj
+
+
+def canonical_encoding(doc: Any) -> bytes:
+    """
+    Encode doc as compact JSON with sorted keys: equal content gives equal bytes
+    regardless of key order, quoting style or input format (YAML or JSON).
+    """
+    kw = {
+        "sort_keys": True,
+        "separators": (",", ":"),
+        "ensure_ascii": False,
+        "default": _encode_default,
+    }
+    try:
+        text = json.dumps(doc, **kw)
+    except TypeError:
+        # Non-string keys of mixed types cannot be sorted; compare them as strings.
+        text = json.dumps(_stringify_keys(doc), **kw)
+    return text.encode("utf-8")
+
+
+def canonical_digest(doc: Any) -> str:
+    """Return "sha256:<hex>" of the canonical encoding of doc. No YAML is emitted."""
+    return "sha256:" + hashlib.sha256(canonical_encoding(doc)).hexdigest()
+
+
+def format_fingerprint(doc: dict[str, Any], source: str, fmt: str) -> str:
+    """
+    Render one fingerprint line: TSV "apiVersion kind namespace name digest source"
+    or an NDJSON object with the same fields.
+    """
+    api_version, kind, namespace, name = resource_identity(doc)
+    digest = canonical_digest(doc)
+    if fmt == "ndjson":
+        record = {
+            "apiVersion": api_version,
+            "kind": kind,
+            "namespace": namespace,
+            "name": name,
+            "digest": digest,
+            "source": source,
+        }
+        return json.dumps(record, separators=(",", ":")) + "\n"
+    fields = (api_version, kind, namespace, name, digest, source)
+    # Tabs and newlines would break the columns.
+    return "\t".join(f.replace("\t", " ").replace("\n", " ") for f in fields) + "\n"
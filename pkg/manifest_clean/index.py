@@ -0,0 +1,188 @@
+"""Persistent on-disk index of resource identities for selective lookups."""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from ruamel.yaml.error import YAMLError
+
+from .io import (
+    SourceDocument,
+    is_ndjson_input,
+    new_yaml_loader,
+    parse_document,
+    peek_header,
+    split_documents,
+)
+from .normalize import resource_identity
+from .selector import ResourceFilter
+
+INDEX_VERSION = 2
+
+# Each document entry is [doc_index, byte_offset, byte_length, line, apiVersion, kind,
+# namespace, name], kept as a list so the index stays compact JSON.
+Entry = list
+
+
+def _index_key(path: Path) -> str:
+    return str(path.resolve())
+
+
+def _split_lines(f) -> Iterator[tuple[int, int, int, str]]:
+    offset = 0
+    for idx, line in enumerate(f):
+        if line.strip():
+            yield idx, offset, idx, line
+        offset += len(line.encode("utf-8"))
+
+
+def scan_file(path: Path, input_format: str = "auto") -> list[Entry]:
+    """
+    Return the index entries of every document in path. Identities come from the
+    header peek where possible; documents it cannot read are fully parsed.
+    """
+    yaml = new_yaml_loader()
+    entries: list[Entry] = []
+    is_ndjson = is_ndjson_input(path.name, input_format)
+    # newline="" keeps \r\n so offsets match the bytes on disk.
+    with open(path, encoding="utf-8", newline="") as f:
+        chunks = _split_lines(f) if is_ndjson else split_documents(f)
+        for idx, offset, line, text in chunks:
+            length = len(text.encode("utf-8"))
+            header = None if is_ndjson else peek_header(text)
+            if header is not None:
+                identity = (
+                    header.api_version,
+                    header.kind,
+                    header.namespace,
+                    header.name,
+                )
+                entries.append([idx, offset, length, line, *identity])
+                continue
+            if is_ndjson:
+                doc = json.loads(text)
+            else:
+                doc = parse_document(yaml, text, str(path), idx, line)
+            if not isinstance(doc, dict):
+                continue
+            entries.append([idx, offset, length, line, *resource_identity(doc)])
+    return entries
+
+
+class ManifestIndex:
+    """
+    Map of file -> (mtime, size, format, documents) stored as JSON. refresh() rescans
+    only files whose mtime, size or input format changed; load_documents() parses only
+    the selected documents. Files that fail to scan are left out of the index and
+    listed in errors.
+    """
+
+    def __init__(self, path: Path, files: dict[str, dict] | None = None) -> None:
+        self.path = path
+        self.files: dict[str, dict] = files or {}
+        self.dirty = False
+        self.errors: list[str] = []
+
+    @classmethod
+    def load(cls, path: Path) -> ManifestIndex:
+        """
+        Load the index at path; a missing, unreadable or outdated index starts empty.
+        """
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return cls(path)
+        return cls(path, data.get("files") or {})
+
+    def save(self) -> None:
+        """Write the index atomically if anything changed."""
+        if not self.dirty:
+            return
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": INDEX_VERSION, "files": self.files}),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def refresh(self, paths: Iterable[Path], input_format: str = "auto") -> int:
+        """
+        Rescan files that are new or changed, drop deleted ones. Returns files
+        rescanned. A file that cannot be read or parsed is dropped from the index and
+        its error added to errors; the other files are still scanned.
+        """
+        rescanned = 0
+        for key in [k for k in self.files if not os.path.exists(k)]:
+            del self.files[key]
+            self.dirty = True
+        for path in paths:
+            key = _index_key(path)
+            ndjson = is_ndjson_input(path.name, input_format)
+            try:
+                st = path.stat()
+                entry = self.files.get(key)
+                if (
+                    entry
+                    and entry["mtime_ns"] == st.st_mtime_ns
+                    and entry["size"] == st.st_size
+                    and entry.get("ndjson", False) == ndjson
+                ):
+                    continue
+                documents = scan_file(path, input_format)
+            except (OSError, ValueError, YAMLError) as e:
+                self.errors.append(str(e))
+                if self.files.pop(key, None) is not None:
+                    self.dirty = True
+                continue
+            self.files[key] = {
+                "mtime_ns": st.st_mtime_ns,
+                "size": st.st_size,
+                "ndjson": ndjson,
+                "documents": documents,
+            }
+            self.dirty = True
+            rescanned += 1
+        return rescanned
+
+    def resource_count(self) -> int:
+        return sum(len(entry["documents"]) for entry in self.files.values())
+
+    def lookup(self, path: Path, doc_filter: ResourceFilter) -> list[Entry] | None:
+        """
+        Return the entries of path whose identity matches doc_filter, or None if path is
+        not indexed. Labels are not indexed, so label requirements must be checked on
+        the loaded documents.
+        """
+        entry = self.files.get(_index_key(path))
+        if entry is None:
+            return None
+        # *List documents are kept: their items may match.
+        return [
+            e
+            for e in entry["documents"]
+            if e[5].endswith("List") or doc_filter.matches(tuple(e[4:8]))
+        ]
+
+    def load_documents(
+        self, path: Path, entries: list[Entry]
+    ) -> Iterator[SourceDocument]:
+        """Read and parse only the documents at the given entries' byte spans."""
+        yaml = new_yaml_loader()
+        entry = self.files.get(_index_key(path))
+        is_ndjson = bool(entry and entry.get("ndjson"))
+        with open(path, "rb") as f:
+            for idx, offset, length, line, *_identity in entries:
+                f.seek(offset)
+                text = f.read(length).decode("utf-8")
+                if is_ndjson:
+                    doc = json.loads(text)
+                else:
+                    doc = parse_document(yaml, text, str(path), idx, line)
+                if isinstance(doc, dict):
+                    yield SourceDocument(idx, doc, text, offset)
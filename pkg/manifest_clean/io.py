@@ -2,32 +2,410 @@
 
 from __future__ import annotations
 
+import codecs
+import json
+import re
 import sys
+import tarfile
+import zipfile
+from collections.abc import Callable, Iterator
 from pathlib import Path
-from typing import Iterator
+from typing import NamedTuple
 
 from ruamel.yaml import YAML
+from ruamel.yaml.error import MarkedYAMLError, YAMLError
 
+from .compress import (
+    COMPRESSION_SUFFIXES,
+    DECOMPRESSION_ERRORS,
+    compression_from_name,
+    decompressing_reader,
+    open_text,
+    strip_compression_suffix,
+    wrap_stdin,
+)
+from .limits import LimitedComposer, LimitError, Limits
+from .marker import strip_marker
+from .prune import PrunePath, prune_document_text
 
-def _load_yaml_stream(stream, filename: str = "<stdin>"):
-    """Load multi-document YAML from a stream. Yields (doc_index, doc_dict)."""
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+MANIFEST_SUFFIXES = (".yaml", ".yml", ".json", *NDJSON_SUFFIXES)
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".zip")
+
+# What reading and parsing one input can raise (LimitError and JSON errors are
+# ValueErrors). Runs report these per input and go on with the others.
+INPUT_ERRORS: tuple[type[Exception], ...] = (
+    OSError,
+    ValueError,
+    YAMLError,
+    tarfile.TarError,
+    zipfile.BadZipFile,
+    *DECOMPRESSION_ERRORS,
+)
+
+
+class SourceDocument(NamedTuple):
+    """
+    A loaded document with its raw source text and UTF-8 byte offset in the input.
+    pruned is True if doc was parsed without the subtrees cut by prune_document_text;
+    text is always the full source.
+    """
+
+    index: int
+    doc: dict
+    text: str
+    offset: int
+    pruned: bool = False
+
+
+def _is_document_marker(line: str) -> bool:
+    return line.startswith("---") and (len(line) == 3 or line[3] in " \t\r\n")
+
+
+def _is_blank_or_comment(line: str) -> bool:
+    stripped = line.strip()
+    return not stripped or stripped.startswith("#")
+
+
+def split_documents(
+    stream, limits: Limits | None = None, filename: str = "<stdin>"
+) -> Iterator[tuple[int, int, int, str]]:
+    """
+    Split a YAML stream into raw documents without parsing. Yields (doc_index, offset,
+    line, text): offset is the UTF-8 byte offset of text and line the 0-based line it
+    starts on. A bare leading "---" line is not part of text. Comments before the first
+    document belong to it; empty explicit documents are yielded (and counted) like
+    yaml.load_all would. With limits, a document fails as soon as it grows past
+    max_document_bytes.
+    """
+    max_bytes = limits.max_document_bytes if limits is not None else None
+    idx = 0
+    pos = 0
+    lines: list[str] = []
+    start = 0
+    start_line = 0
+    explicit = False
+    has_content = False
+    for line_no, line in enumerate(stream):
+        size = len(line.encode("utf-8"))
+        if _is_document_marker(line) or line.rstrip() == "...":
+            is_end = not _is_document_marker(line)
+            if explicit or has_content:
+                if is_end:
+                    lines.append(line)
+                yield idx, start, start_line, "".join(lines)
+                idx += 1
+                lines = []
+            pos += size
+            if is_end:
+                start, start_line = pos, line_no + 1
+                explicit, has_content = False, False
+                continue
+            explicit = True
+            if lines or line[3:].strip():
+                # Keep directives/comments before the marker, or "--- content", in text.
+                if not lines:
+                    start, start_line = pos - size, line_no
+                lines.append(line)
+                has_content = has_content or bool(line[3:].strip())
+            else:
+                start, start_line = pos, line_no + 1
+            continue
+        if not lines:
+            start, start_line = pos, line_no
+        lines.append(line)
+        pos += size
+        if max_bytes is not None and pos - start > max_bytes:
+            limits.check_document_size(pos - start, filename, idx)
+        if not has_content and not _is_blank_or_comment(line):
+            has_content = not line.startswith("%")
+    if explicit or has_content:
+        yield idx, start, start_line, "".join(lines)
+
+
+class DocumentHeader(NamedTuple):
+    """
+    apiVersion/kind/metadata fields read from a document's text without a full parse.
+    """
+
+    api_version: str
+    kind: str
+    namespace: str
+    name: str
+    labels: dict[str, str]
+
+
+_PLAIN_SCALAR = re.compile(r"[A-Za-z0-9][A-Za-z0-9._/-]*")
+_YAML_SPECIAL = re.compile(
+    r"(?i:true|false|yes|no|on|off|y|n|null|~)|[-+]?(\d[\d_]*)?(\.\d*)?([eE][-+]?\d+)?"
+    r"|0[xob][0-9a-fA-F_]+|[-+]?\.(inf|nan)"
+)
+_HEADER_LINE = re.compile(
+    r"( *)([A-Za-z0-9][A-Za-z0-9._/-]*):(?:[ \t]+(.*?))?[ \t]*\r?\n?$"
+)
+
+
+def _peek_scalar(raw: str | None) -> str | None:
+    """Return a simple one-line scalar's value, or None if it needs a real parser."""
+    if raw is None or raw == "" or raw.startswith("#"):
+        return None
+    if raw[0] in "'\"":
+        quote = raw[0]
+        end = raw.find(quote, 1)
+        rest = raw[end + 1 :].strip() if end > 0 else ""
+        value = raw[1:end] if end > 0 else ""
+        if end < 0 or (rest and not rest.startswith("#")) or "\\" in value:
+            return None
+        if quote == "'" and "''" in raw[1:]:
+            return None
+        return value
+    value = raw.split(" #", 1)[0].strip()
+    if not _PLAIN_SCALAR.fullmatch(value) or _YAML_SPECIAL.fullmatch(value):
+        return None
+    return value
+
+
+def peek_header(text: str) -> DocumentHeader | None:
+    """
+    Read apiVersion, kind, metadata.name/namespace/labels from a block-style YAML
+    document by scanning lines, without building a tree. Returns None whenever the
+    header is not plain enough to be read this way (flow style, anchors, tags,
+    multi-line scalars, ...); callers must then fall back to a full parse.
+    """
+    top: dict[str, str] = {}
+    meta: dict[str, str] = {}
+    labels: dict[str, str] = {}
+    # Where the previous key line left us: "scalar" (a value we read: deeper lines would
+    # continue it), "metadata", "labels", or "other" (a subtree we do not care about).
+    section = "other"
+    in_metadata = False
+    meta_indent = labels_indent = -1
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        indent = len(line) - len(line.lstrip(" "))
+        m = _HEADER_LINE.match(line)
+        if indent == 0:
+            if m is None:
+                return None
+            key, raw = m.group(2), m.group(3)
+            in_metadata, section = False, "other"
+            if key in ("apiVersion", "kind"):
+                value = _peek_scalar(raw)
+                if value is None:
+                    return None
+                top[key], section = value, "scalar"
+            elif key == "metadata":
+                if raw and not raw.startswith("#"):
+                    return None
+                in_metadata, section, meta_indent = True, "metadata", -1
+            continue
+        if section == "scalar" and (not in_metadata or indent > meta_indent):
+            return None
+        if not in_metadata:
+            continue
+        if meta_indent < 0:
+            meta_indent = indent
+        if indent < meta_indent:
+            return None
+        if indent == meta_indent:
+            if m is None:
+                return None
+            key, raw = m.group(2), m.group(3)
+            section = "other"
+            if key in ("name", "namespace"):
+                value = _peek_scalar(raw)
+                if value is None:
+                    return None
+                meta[key], section = value, "scalar"
+            elif key == "labels":
+                if raw and not raw.startswith("#"):
+                    return None
+                section, labels_indent = "labels", -1
+            continue
+        if section == "labels":
+            if labels_indent < 0:
+                labels_indent = indent
+            if indent != labels_indent or m is None:
+                return None
+            value = _peek_scalar(m.group(3))
+            if value is None:
+                return None
+            labels[m.group(2)] = value
+    if not top:
+        return None
+    return DocumentHeader(
+        top.get("apiVersion", ""),
+        top.get("kind", ""),
+        meta.get("namespace", ""),
+        meta.get("name", ""),
+        labels,
+    )
+
+
+def parse_document(
+    yaml: YAML, text: str, filename: str, idx: int, line: int = 0
+) -> dict | None:
+    """
+    Parse one raw document from split_documents(). Returns None for an empty document.
+    line is where text starts in filename; error positions are reported in the file.
+    """
+    yaml.manifest_first_line = line
+    try:
+        doc = yaml.load(text)
+    except MarkedYAMLError as e:
+        for mark in (e.context_mark, e.problem_mark):
+            if mark is not None:
+                mark.name = filename
+                mark.line += line
+        raise type(e)(f"{filename}: document {idx}: {e}") from e
+    except Exception as e:
+        raise type(e)(f"{filename}: document {idx}: {e}") from e
+    if doc is not None and not isinstance(doc, dict):
+        raise ValueError(
+            f"{filename}: document {idx}: expected mapping, got {type(doc).__name__}"
+        )
+    return doc
+
+
+def parse_pruned_document(
+    yaml: YAML,
+    text: str,
+    filename: str,
+    idx: int,
+    skip_paths: tuple[PrunePath, ...] = (),
+    line: int = 0,
+) -> tuple[dict | None, bool]:
+    """
+    Parse one raw document, skipping the subtrees at skip_paths when the text allows
+    it. Returns (doc, pruned). Errors are always reported against the full text.
+    """
+    cut = prune_document_text(text, skip_paths)
+    if cut is not None:
+        try:
+            return parse_document(yaml, cut, filename, idx, line), True
+        except LimitError:
+            raise  # The full text is at least as large.
+        except (ValueError, YAMLError, RecursionError):
+            pass
+    return parse_document(yaml, text, filename, idx, line), False
+
+
+def new_yaml_loader(limits: Limits | None = None) -> YAML:
+    """
+    Return the round-trip loader used for all YAML input. With limits, nesting depth
+    and alias expansion are checked while each document is composed.
+    """
     yaml = YAML()
     yaml.preserve_quotes = True
-    try:
-        for idx, doc in enumerate(yaml.load_all(stream)):
-            if doc is None:
-                continue
-            if not isinstance(doc, dict):
-                raise ValueError(
-                    f"{filename}: document {idx}: expected mapping, got {type(doc).__name__}"
-                )
+    if limits is not None and limits.limits_parsing:
+        yaml.Composer = LimitedComposer
+        yaml.manifest_limits = limits
+    return yaml
+
+
+def _load_yaml_stream(
+    stream,
+    filename: str = "<stdin>",
+    with_source: bool = False,
+    accept: Callable[[str], bool] | None = None,
+    skip_paths: tuple[PrunePath, ...] = (),
+    limits: Limits | None = None,
+):
+    """
+    Load multi-document YAML from a stream. Yields (doc_index, doc_dict), or
+    SourceDocument when with_source is True. Documents whose raw text is rejected
+    by accept are skipped without being parsed; subtrees at skip_paths are skipped
+    at parse time (see prune_paths). limits are enforced while reading and parsing.
+    """
+    yaml = new_yaml_loader(limits)
+    for idx, offset, line, text in split_documents(stream, limits, filename):
+        # A --marker comment describes the file, not the document it trails.
+        text = strip_marker(text)
+        if accept is not None and not accept(text):
+            continue
+        doc, pruned = parse_pruned_document(yaml, text, filename, idx, skip_paths, line)
+        if doc is None:
+            continue
+        if with_source:
+            yield SourceDocument(idx, doc, text, offset, pruned)
+        else:
             yield idx, doc
-    except Exception as e:
-        raise type(e)(f"{filename}: {e}") from e
+
+
+def parse_ndjson_line(line: str, filename: str, idx: int) -> dict | None:
+    """Parse line idx (0-based) of an NDJSON stream. Returns None for a blank line."""
+    if not line.strip():
+        return None
+    try:
+        doc = json.loads(line)
+    except (ValueError, RecursionError) as e:
+        raise ValueError(f"{filename}: line {idx + 1}: {e}") from e
+    if not isinstance(doc, dict):
+        raise ValueError(
+            f"{filename}: line {idx + 1}: expected object, got {type(doc).__name__}"
+        )
+    return doc
+
+
+def _load_ndjson_stream(
+    stream,
+    filename: str = "<stdin>",
+    with_source: bool = False,
+    limits: Limits | None = None,
+):
+    """
+    Load newline-delimited JSON (one object per line). Yields (line_index, doc_dict),
+    or SourceDocument when with_source is True. With limits, each decoded line is
+    checked against max_depth.
+    """
+    offset = 0
+    for idx, line in enumerate(stream):
+        line_offset = offset
+        if with_source:
+            offset += len(line.encode("utf-8"))
+        doc = parse_ndjson_line(line, filename, idx)
+        if doc is None:
+            continue
+        if limits is not None:
+            limits.check_depth(doc, filename, f"line {idx + 1}")
+        yield SourceDocument(idx, doc, line, line_offset) if with_source else (idx, doc)
+
+
+def is_ndjson_input(filename: str, input_format: str = "auto") -> bool:
+    """Return True if filename is read as NDJSON ("auto": *.ndjson/*.jsonl)."""
+    if input_format != "auto":
+        return input_format == "ndjson"
+    return strip_compression_suffix(filename).lower().endswith(NDJSON_SUFFIXES)
+
+
+def _load_stream(
+    stream,
+    filename: str,
+    input_format: str = "auto",
+    with_source: bool = False,
+    accept: Callable[[str], bool] | None = None,
+    skip_paths: tuple[PrunePath, ...] = (),
+    limits: Limits | None = None,
+):
+    """
+    Dispatch to the NDJSON or YAML loader. "auto" picks NDJSON for *.ndjson/*.jsonl.
+    accept and skip_paths only apply to YAML; NDJSON lines are always decoded in full.
+    With limits, the raw stream is read through Limits.lines.
+    """
+    if limits is not None:
+        stream = limits.lines(stream, filename)
+    if is_ndjson_input(filename, input_format):
+        return _load_ndjson_stream(stream, filename, with_source, limits)
+    return _load_yaml_stream(stream, filename, with_source, accept, skip_paths, limits)
 
 
 def iter_paths(path_arg: str | None) -> Iterator[Path]:
-    """Yield single path for file, or all *.yaml, *.yml, *.json under directory."""
+    """
+    Yield single path for file, or all *.yaml, *.yml, *.json, *.ndjson, *.jsonl under
+    directory, including their .gz/.zst compressed variants.
+    """
     if path_arg is None or path_arg == "-":
         return
     p = Path(path_arg)
@@ -36,23 +414,135 @@ def iter_paths(path_arg: str | None) -> Iterator[Path]:
     if p.is_file():
         yield p
         return
-    for ext in ("*.yaml", "*.yml", "*.json"):
-        yield from sorted(p.rglob(ext))
+    for suffix in MANIFEST_SUFFIXES:
+        for compressed in ("", *COMPRESSION_SUFFIXES):
+            yield from sorted(p.rglob(f"*{suffix}{compressed}"))
+
+
+def read_path_list(stream, null_separated: bool = False) -> list[str]:
+    """Read paths from --files-from: one per line, or NUL-separated (find -print0)."""
+    data = stream.read()
+    items = data.split("\0") if null_separated else data.splitlines()
+    return [item for item in items if item]
 
 
 def load_documents_from_path(
     path: Path,
+    input_format: str = "auto",
+    with_source: bool = False,
+    accept: Callable[[str], bool] | None = None,
+    skip_paths: tuple[PrunePath, ...] = (),
+    limits: Limits | None = None,
 ) -> Iterator[tuple[int, dict]]:
-    """Yield (doc_index, doc) for each document in path (file). path must be a file."""
-    suffix = path.suffix.lower()
-    if suffix not in (".yaml", ".yml", ".json"):
+    """
+    Yield (doc_index, doc) for each document in path (file). path must be a file.
+    With with_source=True, yield SourceDocument (index, doc, text, offset) instead.
+    accept(text) may reject YAML documents before they are parsed; subtrees at
+    skip_paths are not parsed; limits are enforced as the file is read.
+    gzip/zstd files (by suffix or magic bytes) are decompressed as they are read.
+    """
+    if not is_manifest_name(path.name):
         return
-    with open(path, "r", encoding="utf-8") as f:
-        for item in _load_yaml_stream(f, str(path)):
+    with open_text(path) as f:
+        for item in _load_stream(
+            f, str(path), input_format, with_source, accept, skip_paths, limits
+        ):
             yield item
 
 
-def load_documents_from_stdin() -> Iterator[tuple[int, dict]]:
-    """Yield (doc_index, doc) for each document from stdin."""
-    for item in _load_yaml_stream(sys.stdin, "<stdin>"):
+def load_documents_from_stdin(
+    input_format: str = "auto",
+    with_source: bool = False,
+    accept: Callable[[str], bool] | None = None,
+    skip_paths: tuple[PrunePath, ...] = (),
+    limits: Limits | None = None,
+) -> Iterator[tuple[int, dict]]:
+    """Yield (doc_index, doc) for each document from stdin (NDJSON with "ndjson")."""
+    stdin = wrap_stdin(sys.stdin)
+    for item in _load_stream(
+        stdin, "<stdin>", input_format, with_source, accept, skip_paths, limits
+    ):
         yield item
+
+
+def is_archive(path: Path) -> bool:
+    """Return True if path names a tar, tar.gz/tgz, or zip archive."""
+    return path.name.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def load_documents_from_archive(
+    path: Path,
+    input_format: str = "auto",
+    with_source: bool = False,
+    accept: Callable[[str], bool] | None = None,
+    skip_paths: tuple[PrunePath, ...] = (),
+    limits: Limits | None = None,
+) -> Iterator[tuple[str, Iterator[tuple[int, dict]]]]:
+    """
+    Yield (name, doc_iter) for each manifest member (see MANIFEST_SUFFIXES) of a tar or
+    zip archive. name is "archive!member". Members are streamed, never extracted;
+    consume doc_iter before advancing to the next member.
+    """
+    if path.name.lower().endswith(".zip"):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or not is_manifest_name(info.filename):
+                    continue
+                name = f"{path}!{info.filename}"
+                with zf.open(info) as raw:
+                    yield (
+                        name,
+                        _load_archive_member(
+                            raw,
+                            name,
+                            input_format,
+                            with_source,
+                            accept,
+                            skip_paths,
+                            limits,
+                        ),
+                    )
+        return
+    # "r|*" reads the archive as a forward-only stream (plain or compressed).
+    with tarfile.open(path, mode="r|*") as tf:
+        for member in tf:
+            if not member.isfile() or not is_manifest_name(member.name):
+                continue
+            name = f"{path}!{member.name}"
+            raw = tf.extractfile(member)
+            if raw is None:
+                continue
+            yield (
+                name,
+                _load_archive_member(
+                    raw,
+                    name,
+                    input_format,
+                    with_source,
+                    accept,
+                    skip_paths,
+                    limits,
+                ),
+            )
+
+
+def is_manifest_name(name: str) -> bool:
+    """Return True if name has a manifest suffix, optionally followed by .gz/.zst."""
+    return Path(strip_compression_suffix(name)).suffix.lower() in MANIFEST_SUFFIXES
+
+
+def _load_archive_member(
+    raw,
+    name: str,
+    input_format: str,
+    with_source: bool,
+    accept: Callable[[str], bool] | None,
+    skip_paths: tuple[PrunePath, ...],
+    limits: Limits | None,
+) -> Iterator[tuple[int, dict]]:
+    raw = decompressing_reader(raw, compression_from_name(name))
+    # codecs reader only needs read(); tar stream members are not seekable.
+    text = codecs.getreader("utf-8")(raw)
+    yield from _load_stream(
+        text, name, input_format, with_source, accept, skip_paths, limits
+    )
@@ -0,0 +1,124 @@
+"""Checkpoint journal for resumable --write/--check runs (--journal FILE, --resume)."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from . import __version__
+from .fingerprint import canonical_digest
+
+JOURNAL_VERSION = 1
+
+
+class JournalEntry(NamedTuple):
+    """A completed input: its content hash when done and the changes it contributed."""
+
+    sha256: str
+    files_changed: int
+    docs_changed: int
+
+
+def file_sha256(path: Path) -> str:
+    """Return the hex sha256 of the file's bytes (as stored, i.e. still compressed)."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def options_fingerprint(options: dict[str, Any]) -> str:
+    """
+    Digest of the options that affect output; a journal is only reused if they match.
+    """
+    return canonical_digest({"version": __version__, **options})
+
+
+class Journal:
+    """
+    Append-only JSON-lines file: a header line with the options fingerprint, then one
+    line per completed input path. Lines are flushed as they are written, so an
+    interrupted run keeps everything finished before the interruption.
+    """
+
+    def __init__(self, path: Path, options: str, entries: dict[str, JournalEntry]):
+        self.path = path
+        self.options = options
+        self.entries = entries
+        self._f = None
+
+    @classmethod
+    def open(cls, path: Path, options: str, *, resume: bool) -> Journal:
+        """
+        Open the journal for appending. With resume, entries of an existing journal
+        written with the same options are kept; otherwise the journal starts empty.
+        """
+        entries: dict[str, JournalEntry] = {}
+        if resume:
+            entries = cls._read(path, options)
+        journal = cls(path, options, entries)
+        with contextlib.ExitStack() as stack:
+            mode = "a" if entries else "w"
+            journal._f = stack.enter_context(open(path, mode, encoding="utf-8"))
+            if not entries:
+                journal._append({"version": JOURNAL_VERSION, "options": options})
+            stack.pop_all()  # Closed by Journal.close().
+        return journal
+
+    @staticmethod
+    def _read(path: Path, options: str) -> dict[str, JournalEntry]:
+        try:
+            lines = path.read_text(encoding="utf-8").splitlines()
+        except OSError:
+            return {}
+        try:
+            header = json.loads(lines[0]) if lines else None
+        except ValueError:
+            return {}
+        if not isinstance(header, dict) or header != {
+            "version": JOURNAL_VERSION,
+            "options": options,
+        }:
+            return {}
+        entries: dict[str, JournalEntry] = {}
+        for line in lines[1:]:
+            try:
+                item = json.loads(line)
+                entries[item["path"]] = JournalEntry(
+                    item["sha256"], item["files_changed"], item["docs_changed"]
+                )
+            except (ValueError, KeyError, TypeError):
+                # A line cut short by an interruption; that file is simply redone.
+                continue
+        return entries
+
+    def _append(self, record: dict[str, Any]) -> None:
+        self._f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._f.flush()
+
+    def completed(self, key: str, sha256: str) -> JournalEntry | None:
+        """Return the entry for key if it was completed with the same content hash."""
+        entry = self.entries.get(key)
+        if entry is not None and entry.sha256 == sha256:
+            return entry
+        return None
+
+    def record(
+        self, key: str, sha256: str, files_changed: int, docs_changed: int
+    ) -> None:
+        """Record key as completed; sha256 is the content hash after any rewrite."""
+        self.entries[key] = JournalEntry(sha256, files_changed, docs_changed)
+        self._append(
+            {
+                "path": key,
+                "sha256": sha256,
+                "files_changed": files_changed,
+                "docs_changed": docs_changed,
+            }
+        )
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
@@ -0,0 +1,206 @@
+"""
+Resource limits for hostile or pathological input (--max-document-bytes, --max-depth,
+--max-alias-nodes, --max-input-bytes), enforced while documents are read and parsed.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from ruamel.yaml.composer import Composer
+from ruamel.yaml.events import AliasEvent
+from ruamel.yaml.nodes import MappingNode, SequenceNode
+
+_SIZE = re.compile(r"(\d+)\s*([KMG]i?B?|B)?", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3}
+
+# Raw input is read in chunks of this many characters when line length is limited.
+READ_CHUNK = 64 * 1024
+
+
+class LimitError(ValueError):
+    """An input exceeded one of the configured limits."""
+
+
+def parse_size(text: str) -> int:
+    """Parse a byte count with an optional K/M/G suffix (powers of 1024), e.g. "64M"."""
+    match = _SIZE.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(
+            f"invalid size {text!r}; expected a number with optional K/M/G"
+        )
+    unit = (match[2] or "").upper().rstrip("B").rstrip("I")
+    return int(match[1]) * _SIZE_UNITS[unit]
+
+
+class Limits:
+    """
+    Optional caps on the input; None means unlimited. input_bytes counts what has been
+    read so far across all inputs of a run. Instances are picklable (worker processes
+    get a copy, so there the total only counts what that worker read).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_document_bytes: int | None = None,
+        max_depth: int | None = None,
+        max_alias_nodes: int | None = None,
+        max_input_bytes: int | None = None,
+    ) -> None:
+        self.max_document_bytes = max_document_bytes
+        self.max_depth = max_depth
+        self.max_alias_nodes = max_alias_nodes
+        self.max_input_bytes = max_input_bytes
+        self.input_bytes = 0
+
+    @property
+    def limits_reading(self) -> bool:
+        return self.max_document_bytes is not None or self.max_input_bytes is not None
+
+    @property
+    def limits_parsing(self) -> bool:
+        return self.max_depth is not None or self.max_alias_nodes is not None
+
+    @property
+    def exhausted(self) -> bool:
+        """True once the run has read more than max_input_bytes."""
+        return (
+            self.max_input_bytes is not None and self.input_bytes > self.max_input_bytes
+        )
+
+    def lines(self, stream: Iterable[str], filename: str) -> Iterator[str]:
+        """
+        Yield the lines of stream, failing as soon as the run's total input passes
+        max_input_bytes or a line grows past max_document_bytes. Lines are cut from
+        fixed-size reads, so an endless line is never held in memory whole.
+        """
+        if not self.limits_reading:
+            yield from stream
+            return
+        read = getattr(stream, "read", None)
+        chunks = iter(lambda: read(READ_CHUNK), "") if read is not None else stream
+        line_no = 1
+        pending = ""
+        for chunk in chunks:
+            self._count(len(chunk.encode("utf-8")), filename)
+            parts = (pending + chunk).split("\n")
+            pending = parts.pop()
+            for part in parts:
+                self._check_line(len(part.encode("utf-8")) + 1, filename, line_no)
+                yield part + "\n"
+                line_no += 1
+            self._check_line(len(pending), filename, line_no)
+        if pending:
+            self._check_line(len(pending.encode("utf-8")), filename, line_no)
+            yield pending
+
+    def _count(self, size: int, filename: str) -> None:
+        self.input_bytes += size
+        if self.exhausted:
+            raise LimitError(
+                f"{filename}: input exceeds --max-input-bytes "
+                f"({self.max_input_bytes} bytes in total)"
+            )
+
+    def _check_line(self, size: int, filename: str, line_no: int) -> None:
+        if self.max_document_bytes is not None and size > self.max_document_bytes:
+            raise LimitError(
+                f"{filename}: line {line_no}: longer than --max-document-bytes "
+                f"({self.max_document_bytes} bytes)"
+            )
+
+    def check_document_size(self, size: int, filename: str, idx: int) -> None:
+        """Fail if a document read so far (size bytes) is over max_document_bytes."""
+        if self.max_document_bytes is not None and size > self.max_document_bytes:
+            raise LimitError(
+                f"{filename}: document {idx}: larger than --max-document-bytes "
+                f"({self.max_document_bytes} bytes)"
+            )
+
+    def check_depth(self, obj: Any, filename: str, where: str) -> None:
+        """Fail if obj (e.g. a decoded JSON line) nests deeper than max_depth."""
+        if self.max_depth is None:
+            return
+        stack = [(obj, 1)]
+        while stack:
+            node, depth = stack.pop()
+            if depth > self.max_depth:
+                raise LimitError(
+                    f"{filename}: {where}: nesting deeper than --max-depth "
+                    f"({self.max_depth})"
+                )
+            if isinstance(node, dict):
+                stack.extend((value, depth + 1) for value in node.values())
+            elif isinstance(node, list):
+                stack.extend((item, depth + 1) for item in node)
+
+
+def _node_children(node: Any) -> list[Any]:
+    if isinstance(node, MappingNode):
+        return [child for pair in node.value for child in pair]
+    if isinstance(node, SequenceNode):
+        return list(node.value)
+    return []
+
+
+def expanded_size(node: Any, memo: dict[int, int]) -> int:
+    """
+    Return how many nodes node stands for once every alias inside it is expanded.
+    memo maps id(node) to its size and is shared across calls for one document, so
+    each node is sized once; a node that contains itself counts once.
+    """
+    stack = [(node, False)]
+    while stack:
+        current, done = stack.pop()
+        children = _node_children(current)
+        if done:
+            memo[id(current)] = 1 + sum(memo.get(id(c), 1) for c in children)
+        elif id(current) not in memo:
+            memo[id(current)] = 1  # Provisional, for self-references.
+            stack.append((current, True))
+            stack.extend((c, False) for c in children if id(c) not in memo)
+    return memo[id(node)]
+
+
+class LimitedComposer(Composer):
+    """
+    Composer that enforces the Limits set on its loader as manifest_limits: nesting is
+    checked as each node opens, and every alias adds the size of its anchored node to
+    the document's expansion count, so "billion laughs" input fails while composing.
+    Reported lines are shifted by the loader's manifest_first_line, if set.
+    """
+
+    def compose_document(self) -> Any:
+        self._nesting = 0
+        self._alias_nodes = 0
+        self._sizes: dict[int, int] = {}
+        return super().compose_document()
+
+    def compose_node(self, parent: Any, index: Any) -> Any:
+        limits: Limits = self.loader.manifest_limits
+        event = self.parser.peek_event()
+        line = event.start_mark.line + getattr(self.loader, "manifest_first_line", 0)
+        if isinstance(event, AliasEvent):
+            target = self.anchors.get(event.anchor)
+            if target is not None and limits.max_alias_nodes is not None:
+                self._alias_nodes += expanded_size(target, self._sizes)
+                if self._alias_nodes > limits.max_alias_nodes:
+                    raise LimitError(
+                        f"aliases expand to more than --max-alias-nodes "
+                        f"({limits.max_alias_nodes}) nodes, at line "
+                        f"{line + 1}"
+                    )
+            return super().compose_node(parent, index)
+        self._nesting += 1
+        try:
+            if limits.max_depth is not None and self._nesting > limits.max_depth:
+                raise LimitError(
+                    f"nesting deeper than --max-depth ({limits.max_depth}), at line "
+                    f"{line + 1}"
+                )
+            return super().compose_node(parent, index)
+        finally:
+            self._nesting -= 1
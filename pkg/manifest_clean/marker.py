@@ -0,0 +1,61 @@
+"""
+Canonical markers (--marker): a trailing comment that lets later runs skip parsing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+from . import __version__
+
+MARKER_PREFIX = "# manifest-clean: "
+MARKER_SUFFIXES = (".yaml", ".yml")
+
+
+def format_marker(content: bytes, options: str) -> str:
+    """Return the marker line for content (the file's bytes before the marker)."""
+    digest = hashlib.sha256(content).hexdigest()
+    return f"{MARKER_PREFIX}sha256={digest} options={options} version={__version__}\n"
+
+
+def strip_marker(text: str) -> str:
+    """Return text without a trailing marker line, if it has one."""
+    if MARKER_PREFIX not in text[-512:]:
+        return text
+    body = text.rstrip("\n")
+    start = body.rfind("\n") + 1
+    if body.startswith(MARKER_PREFIX, start):
+        return text[:start]
+    return text
+
+
+def add_marker(text: str, options: str) -> str:
+    """Return text (any old marker removed) followed by a marker for it."""
+    text = strip_marker(text)
+    if text and not text.endswith("\n"):
+        text += "\n"
+    return text + format_marker(text.encode("utf-8"), options)
+
+
+def verify_marker(data: bytes, options: str) -> bool:
+    """
+    Return True if data ends with a marker written with options by this version whose
+    digest matches the bytes before it. Nothing is parsed.
+    """
+    body = data.rstrip(b"\n")
+    start = body.rfind(b"\n") + 1
+    if not body.startswith(MARKER_PREFIX.encode("utf-8"), start):
+        return False
+    content = data[:start]
+    return data[start:] == format_marker(content, options).encode("utf-8")
+
+
+def has_valid_marker(path: Path, options: str) -> bool:
+    """Return True if path is a plain YAML file carrying a valid marker for options."""
+    if not path.name.lower().endswith(MARKER_SUFFIXES):
+        return False
+    try:
+        return verify_marker(path.read_bytes(), options)
+    except OSError:
+        return False
@@ -2,8 +2,12 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
+from operator import itemgetter
 from typing import Any
 
+from .defaults import DefaultsIndex, strip_defaults
+
 LAST_APPLIED_KEY = "kubectl.kubernetes.io/last-applied-configuration"
 
 
@@ -12,6 +16,23 @@ def is_kubernetes_like(obj: dict[str, Any]) -> bool:
     return isinstance(obj, dict) and "apiVersion" in obj and "kind" in obj
 
 
+def resource_identity(obj: dict[str, Any]) -> tuple[str, str, str, str]:
+    """
+    Return (apiVersion, kind, namespace, name) for obj; missing parts are empty strings.
+    """
+    if not isinstance(obj, dict):
+        return ("", "", "", "")
+    metadata = obj.get("metadata")
+    if not isinstance(metadata, dict):
+        metadata = {}
+    return (
+        str(obj.get("apiVersion") or ""),
+        str(obj.get("kind") or ""),
+        str(metadata.get("namespace") or ""),
+        str(metadata.get("name") or ""),
+    )
+
+
 def prune_noisy_fields(
     obj: dict[str, Any],
     *,
@@ -85,62 +106,138 @@ def prune_noisy_fields(
                         c.pop("terminationMessagePolicy", None)
 
 
+def _is_empty_container(value: Any) -> bool:
+    return isinstance(value, (dict, list)) and len(value) == 0
+
+
+def _rebuild(obj: Any, make_dict: Callable[[list[tuple[Any, Any]]], dict]) -> Any:
+    """
+    Copy the dict/list structure of obj with an explicit stack, so nesting depth is not
+    bounded by the recursion limit; scalars are shared. make_dict builds each dict from
+    its (key, copied value) pairs in source order. Objects reached through several
+    aliases are copied at each place; a dict or list that contains itself raises
+    ValueError.
+    """
+    if not isinstance(obj, (dict, list)):
+        return obj
+    # Frames: [source, iterator over its (key, value) pairs, copied pairs, parent key].
+    stack = [
+        [obj, iter(obj.items() if isinstance(obj, dict) else enumerate(obj)), [], None]
+    ]
+    active = {id(obj)}
+    while True:
+        frame = stack[-1]
+        for key, value in frame[1]:
+            if isinstance(value, (dict, list)):
+                if id(value) in active:
+                    raise ValueError("recursive structure (an alias inside its anchor)")
+                active.add(id(value))
+                items = value.items() if isinstance(value, dict) else enumerate(value)
+                stack.append([value, iter(items), [], key])
+                break
+            frame[2].append((key, value))
+        else:
+            stack.pop()
+            source, _items, pairs, key = frame
+            active.discard(id(source))
+            if isinstance(source, dict):
+                result: Any = make_dict(pairs)
+            else:
+                result = [value for _, value in pairs]
+            if not stack:
+                return result
+            stack[-1][2].append((key, result))
+
+
+def copy_tree(obj: Any) -> Any:
+    """Return a copy of obj's dict/list structure as plain dicts and lists."""
+    return _rebuild(obj, dict)
+
+
 def drop_empty_recursive(obj: Any) -> Any:
     """
     Return a copy of obj with empty dict/list values removed.
     Do NOT remove 0, False, or empty strings.
     """
-    if isinstance(obj, dict):
-        result = {}
-        for k, v in obj.items():
-            v_clean = drop_empty_recursive(v)
-            if (isinstance(v_clean, dict) and len(v_clean) == 0) or (
-                isinstance(v_clean, list) and len(v_clean) == 0
-            ):
-                continue
-            result[k] = v_clean
-        return result
-    if isinstance(obj, list):
-        return [drop_empty_recursive(item) for item in obj]
-    return obj
-
-
-def _drop_empty_in_place(obj: Any) -> bool:
+    return _rebuild(
+        obj, lambda pairs: {k: v for k, v in pairs if not _is_empty_container(v)}
+    )
+
+
+def _drop_empty_pass(obj: Any) -> bool:
     """
-    Mutate obj in place, removing keys whose value is {} or [].
-    Returns True if something was removed (caller may want to re-run on dicts).
+    One top-down pass removing empty dict/list values in place; list items are kept.
+    Returns True if obj itself lost a key (caller re-runs the pass).
     """
-    if isinstance(obj, dict):
-        to_del = [
-            k
-            for k, v in obj.items()
-            if (isinstance(v, dict) and len(v) == 0)
-            or (isinstance(v, list) and len(v) == 0)
-        ]
-        for k in to_del:
-            del obj[k]
-        for v in obj.values():
-            _drop_empty_in_place(v)
-        return len(to_del) > 0
-    if isinstance(obj, list):
-        for item in obj:
-            _drop_empty_in_place(item)
-    return False
-
-
-def drop_empty_in_place(obj: Any) -> None:
-    """Recursively remove empty dict/list values in place. Run until no change."""
-    while _drop_empty_in_place(obj):
-        pass
+    removed = False
+    stack: list[Any] = [obj]
+    seen: set[int] = set()
+    while stack:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, dict):
+            empty = [k for k, v in node.items() if _is_empty_container(v)]
+            for k in empty:
+                del node[k]
+            removed = removed or (node is obj and bool(empty))
+            stack.extend(v for v in node.values() if isinstance(v, (dict, list)))
+        elif isinstance(node, list):
+            stack.extend(v for v in node if isinstance(v, (dict, list)))
+    return removed
+
+
+def drop_empty_in_place(obj: Any, *, cascade: bool = False) -> None:
+    """
+    Remove empty dict/list values in place, re-running while top-level keys go. With
+    cascade, children are cleaned before their parents, so a dict emptied by the
+    removal is removed too at any depth. List items are kept either way.
+    """
+    if not cascade:
+        while _drop_empty_pass(obj):
+            pass
+        return
+    # (node, children done); iterative so depth is not bounded by the recursion limit.
+    stack: list[tuple[Any, bool]] = [(obj, False)]
+    seen: set[int] = set()
+    while stack:
+        node, done = stack.pop()
+        if done:
+            empty = [k for k, v in node.items() if _is_empty_container(v)]
+            for k in empty:
+                del node[k]
+            continue
+        if not isinstance(node, (dict, list)) or id(node) in seen:
+            continue
+        seen.add(id(node))
+        if isinstance(node, dict):
+            stack.append((node, True))
+            stack.extend((v, False) for v in node.values())
+        else:
+            stack.extend((item, False) for item in node)
 
 
 def sort_dict_keys(obj: Any) -> Any:
     """Return a new structure with all dict keys sorted lexicographically. Arrays unchanged."""
-    if isinstance(obj, dict):
-        return {k: sort_dict_keys(obj[k]) for k in sorted(obj.keys())}
-    if isinstance(obj, list):
-        return [sort_dict_keys(item) for item in obj]
-    return obj
+    return _rebuild(obj, lambda pairs: dict(sorted(pairs, key=itemgetter(0))))
+
+
+def same_tree(a: Any, b: Any) -> bool:
+    """Return True if a and b are equal including dict key order and scalar types."""
+    if isinstance(a, dict):
+        return (
+            isinstance(b, dict)
+            and list(a.keys()) == list(b.keys())
+            and all(same_tree(a[k], b[k]) for k in a)
+        )
+    if isinstance(a, list):
+        return (
+            isinstance(b, list)
+            and len(a) == len(b)
+            and all(same_tree(x, y) for x, y in zip(a, b, strict=True))
+        )
+    return type(a) is type(b) and a == b
 
 
 def sort_labels_and_annotations(obj: dict[str, Any]) -> None:
@@ -178,14 +275,14 @@ def normalize_document(
     drop_empty: bool = True,
     sort_labels: bool = False,
     sort_annotations: bool = False,
+    defaults_index: DefaultsIndex | None = None,
 ) -> dict[str, Any]:
     """
     Normalize a single document: prune fields, optionally drop empty, then sort keys.
+    With defaults_index, fields equal to their server-applied default are dropped too.
     Returns a new dict; does not mutate doc.
     """
-    import copy
-
-    obj = copy.deepcopy(doc)
+    obj = copy_tree(doc)
 
     prune_noisy_fields(
         obj,
@@ -207,8 +304,14 @@ def normalize_document(
         drop_termination_message=drop_termination_message,
     )
 
+    if defaults_index is not None:
+        # Before drop_empty, so blocks left empty (e.g. strategy) disappear too.
+        strip_defaults(obj, defaults_index)
+
     if drop_empty:
-        drop_empty_in_place(obj)
+        # Stripped defaults can empty blocks at any depth; only then cascade, so
+        # output without --drop-defaults stays as it was.
+        drop_empty_in_place(obj, cascade=defaults_index is not None)
 
     if sort_labels or sort_annotations:
         sort_labels_and_annotations(obj)
@@ -0,0 +1,312 @@
+"""
+Order-preserving parallel normalization of a single document stream (stdin with --jobs).
+"""
+
+from __future__ import annotations
+
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any
+
+from .io import (
+    INPUT_ERRORS,
+    SourceDocument,
+    new_yaml_loader,
+    parse_document,
+    parse_ndjson_line,
+    parse_pruned_document,
+    split_documents,
+)
+from .limits import Limits
+from .normalize import normalize_document
+from .prune import PrunePath
+from .selector import ResourceFilter, select_documents
+from .sort import document_sort_key
+
+# (doc_index, byte offset, line, raw text) as produced by split_documents().
+RawDocument = tuple[int, int, int, str]
+
+# The first batch is small so output starts quickly; later batches grow up to the
+# maximum to amortize the cost of sending them to a worker.
+FIRST_BATCH_BYTES = 16 * 1024
+MAX_BATCH_BYTES = 1024 * 1024
+
+# Stands in for the items of a split *List while its wrapper is laid out.
+_ITEMS_TOKEN = "manifest-clean-items-placeholder"
+_ITEMS_KEY_LINES = ("items:\n", "items:")
+# An anchor or alias; items that may refer to each other are not split apart.
+_ANCHOR_OR_ALIAS = re.compile(r"(?:^|[\s\[{,])[&*][^\s\[\]{},]")
+
+
+def _split_lines(stream: Iterable[str]) -> Iterator[RawDocument]:
+    offset = 0
+    for idx, line in enumerate(stream):
+        yield idx, offset, idx, line
+        offset += len(line.encode("utf-8"))
+
+
+def split_list_items(text: str) -> tuple[str, str, list[tuple[int, str]]] | None:
+    """
+    Split the raw text of a block-style *List document (kubectl get -o yaml) at its
+    top-level items. Returns (head, tail, items): head ends with the "items:" line,
+    tail holds the keys after the sequence, and each item is (its first line within
+    text, its raw text); head + item + tail is a valid one-item List. Returns None if
+    the layout is not plain enough to split by lines or there are fewer than 2 items.
+    """
+    if not text.startswith("items:") and "\nitems:" not in text:
+        return None
+    if _ANCHOR_OR_ALIAS.search(text):
+        return None
+    lines = text.splitlines(keepends=True)
+    start = next((i for i, line in enumerate(lines) if line in _ITEMS_KEY_LINES), None)
+    if start is None:
+        return None
+    end = start + 1
+    while end < len(lines) and (lines[end][0] in " -" or not lines[end].strip()):
+        end += 1
+    if any(line.startswith("-") for line in lines[end:]):
+        return None  # The sequence went on after a comment at column 0.
+    body = lines[start + 1 : end]
+    column = len(body[0]) - len(body[0].lstrip(" ")) if body else 0
+    items: list[tuple[int, list[str]]] = []
+    for pos, line in enumerate(body, start + 1):
+        if line[:column].strip() == "" and line[column : column + 2] in ("- ", "-\n"):
+            items.append((pos, [line]))
+        elif items and (line.startswith(" " * (column + 1)) or not line.strip()):
+            items[-1][1].append(line)
+        else:
+            return None
+    if len(items) < 2:
+        return None
+    head, tail = "".join(lines[: start + 1]), "".join(lines[end:])
+    return head, tail, [(pos, "".join(item)) for pos, item in items]
+
+
+def iter_batches(
+    stream: Iterable[str],
+    *,
+    ndjson: bool = False,
+    first_bytes: int = FIRST_BATCH_BYTES,
+    max_bytes: int = MAX_BATCH_BYTES,
+    limits: Limits | None = None,
+    filename: str = "<stdin>",
+    split: Callable[[RawDocument], list[RawDocument] | None] | None = None,
+) -> Iterator[list[RawDocument]]:
+    """
+    Split stream into raw documents as it is read (one per line for NDJSON) and group
+    them into batches. Batch size starts at first_bytes and doubles up to max_bytes.
+    Size limits are enforced here, before anything is sent to a worker. split may
+    replace a raw document by several (the items of a large *List), which can then
+    go to different workers.
+    """
+    if limits is not None:
+        stream = limits.lines(stream, filename)
+    limit = first_bytes
+    batch: list[RawDocument] = []
+    size = 0
+    raws = _split_lines(stream) if ndjson else split_documents(stream, limits, filename)
+    for raw in raws:
+        for part in (split(raw) if split is not None else None) or [raw]:
+            batch.append(part)
+            size += len(part[3])
+            if size >= limit:
+                yield batch
+                batch, size = [], 0
+                limit = min(limit * 2, max_bytes)
+    if batch:
+        yield batch
+
+
+def normalize_batch(
+    batch: list[RawDocument],
+    *,
+    ndjson: bool,
+    normalize_kw: dict[str, Any],
+    render: Callable[[dict[str, Any]], str],
+    passthrough: Callable[[SourceDocument, dict[str, Any]], str | None] | None = None,
+    doc_filter: ResourceFilter | None = None,
+    skip_paths: tuple[PrunePath, ...] = (),
+    limits: Limits | None = None,
+    filename: str = "<stdin>",
+) -> list[list[tuple[tuple[str, ...], str]]]:
+    """
+    Parse, filter, normalize and serialize one batch in a worker process. Returns the
+    (sort key, text) of each kept document, grouped per raw document of the batch.
+    render and passthrough must be picklable (module-level functions or
+    functools.partial of them).
+    """
+    yaml = None if ndjson else new_yaml_loader(limits)
+    results: list[list[tuple[tuple[str, ...], str]]] = []
+    for idx, offset, line, text in batch:
+        out: list[tuple[tuple[str, ...], str]] = []
+        results.append(out)
+        pruned = False
+        if ndjson:
+            doc = parse_ndjson_line(text, filename, idx)
+            if doc is not None and limits is not None:
+                limits.check_depth(doc, filename, f"line {idx + 1}")
+        elif doc_filter is not None and not doc_filter.accepts_text(text):
+            continue
+        else:
+            doc, pruned = parse_pruned_document(
+                yaml, text, filename, idx, skip_paths, line
+            )
+        if doc is None:
+            continue
+        sources: Iterable[SourceDocument] = [
+            SourceDocument(idx, doc, text, offset, pruned)
+        ]
+        if doc_filter is not None:
+            sources = select_documents(sources, doc_filter)
+        for source in sources:
+            norm = normalize_document(source.doc, **normalize_kw)
+            rendered = None
+            if passthrough is not None:
+                rendered = passthrough(source, norm)
+            if rendered is None:
+                rendered = render(norm)
+            out.append((document_sort_key(norm), rendered))
+    return results
+
+
+class _ListLayout:
+    """
+    Output of a *List whose items are normalized separately: each item's output is
+    that of a one-item List, so it is cut down to its lines between prefix and suffix
+    and the List is written once all of its items are back.
+    """
+
+    def __init__(self, key: tuple[str, ...], prefix: str, suffix: str, count: int):
+        self.key = key
+        self.prefix = prefix
+        self.suffix = suffix
+        self.count = count
+        self.items: list[str] = []
+
+    def add(self, text: str) -> None:
+        if not (text.startswith(self.prefix) and text.endswith(self.suffix)):
+            raise RuntimeError("List item output does not fit the List's layout")
+        self.items.append(text[len(self.prefix) : len(text) - len(self.suffix)])
+
+    def done(self) -> bool:
+        return len(self.items) == self.count
+
+    def text(self) -> str:
+        return self.prefix + "".join(self.items) + self.suffix
+
+
+def _list_layout(
+    wrapper: dict[str, Any],
+    normalize_kw: dict[str, Any],
+    render: Callable[[dict[str, Any]], str],
+    count: int,
+) -> _ListLayout | None:
+    """
+    Lay out a *List whose items were replaced by _ITEMS_TOKEN. Returns None unless
+    each item is written on lines of its own and items simply follow each other (as in
+    YAML; JSON needs separators), so item outputs can be joined without re-rendering.
+    """
+    norm = normalize_document(wrapper, **normalize_kw)
+    if norm.get("items") != [_ITEMS_TOKEN]:
+        return None
+    text = render(norm)
+    pos = text.find(_ITEMS_TOKEN)
+    start, end = text.rfind("\n", 0, pos) + 1, text.find("\n", pos) + 1
+    if end == 0 or text.count(_ITEMS_TOKEN) != 1:
+        return None
+    prefix, line, suffix = text[:start], text[start:end], text[end:]
+    if render({**norm, "items": [_ITEMS_TOKEN] * 2}) != prefix + line * 2 + suffix:
+        return None
+    return _ListLayout(document_sort_key(norm), prefix, suffix, count)
+
+
+def parallel_normalized_stream(
+    stream: Iterable[str], *, jobs: int, ndjson: bool = False, **batch_kw: Any
+) -> Iterator[tuple[tuple[str, ...], str]]:
+    """
+    Yield (sort key, text) for every document of stream, in input order, normalizing
+    batches in jobs worker processes. Finished batches wait in a reorder buffer until
+    all earlier ones are written; at most 2 * jobs batches are in flight, which bounds
+    memory and how far reading runs ahead of writing. batch_kw goes to normalize_batch.
+    """
+    limits = batch_kw.get("limits")
+    filename = batch_kw.get("filename", "<stdin>")
+    # Split *Lists by their document index; without a filter, their output is put
+    # back together in a _ListLayout (with one, matching items are documents).
+    layouts: dict[int, _ListLayout] = {}
+
+    def split(raw: RawDocument) -> list[RawDocument] | None:
+        idx, offset, line, text = raw
+        if len(text) < FIRST_BATCH_BYTES:
+            return None
+        parts = split_list_items(text)
+        if parts is None:
+            return None
+        head, tail, items = parts
+        try:
+            wrapper = parse_document(
+                new_yaml_loader(limits),
+                f"{head}- {_ITEMS_TOKEN}\n{tail}",
+                filename,
+                idx,
+                line,
+            )
+        except INPUT_ERRORS:
+            return None  # Parsed whole in a worker, which reports the error.
+        kind = wrapper.get("kind") if wrapper is not None else None
+        if not (isinstance(kind, str) and kind.endswith("List")):
+            return None
+        if batch_kw.get("doc_filter") is None:
+            layout = _list_layout(
+                wrapper, batch_kw["normalize_kw"], batch_kw["render"], len(items)
+            )
+            if layout is None:
+                return None
+            layouts[idx] = layout
+        # Each item is parsed as a one-item List; line maps its lines into the input.
+        head_lines = head.count("\n")
+        return [
+            (idx, offset, line + pos - head_lines, head + item + tail)
+            for pos, item in items
+        ]
+
+    def results(
+        batch: list[RawDocument],
+        future: Future[list[list[tuple[tuple[str, ...], str]]]],
+    ) -> Iterator[tuple[tuple[str, ...], str]]:
+        for raw, out in zip(batch, future.result(), strict=True):
+            layout = layouts.get(raw[0])
+            if layout is None:
+                yield from out
+                continue
+            for _key, text in out:
+                layout.add(text)
+            if layout.done():
+                del layouts[raw[0]]
+                yield layout.key, layout.text()
+
+    pending: deque[
+        tuple[list[RawDocument], Future[list[list[tuple[tuple[str, ...], str]]]]]
+    ] = deque()
+    pool = ProcessPoolExecutor(max_workers=jobs)
+    try:
+        batches = iter_batches(
+            stream,
+            ndjson=ndjson,
+            limits=limits,
+            filename=filename,
+            split=None if ndjson else split,
+        )
+        for batch in batches:
+            future = pool.submit(normalize_batch, batch, ndjson=ndjson, **batch_kw)
+            pending.append((batch, future))
+            if len(pending) >= 2 * jobs:
+                yield from results(*pending.popleft())
+            while pending and pending[0][1].done():
+                yield from results(*pending.popleft())
+        while pending:
+            yield from results(*pending.popleft())
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,182 @@
+"""
+Parse-time skipping of dropped subtrees (status, metadata.managedFields, the
+last-applied annotation): their lines are cut from a document's raw text before
+it reaches the YAML scanner, so no events, nodes or Python objects are built for them.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any
+
+from .normalize import LAST_APPLIED_KEY
+
+PrunePath = tuple[str, ...]
+
+_KEY_LINE = re.compile(
+    r"(?P<dash>-[ ]+)?(?P<key>[A-Za-z0-9_][A-Za-z0-9_.\-/]*|\"[^\"\\]*\"|'[^']*')"
+    r":(?:[ ]+(?P<value>.*?))?\s*$"
+)
+_SEQUENCE = "[]"
+
+
+def prune_paths(normalize_kw: dict[str, Any]) -> tuple[PrunePath, ...]:
+    """Return the subtrees normalize_document would drop whole with these options."""
+    paths: list[PrunePath] = []
+    if normalize_kw.get("drop_status"):
+        paths.append(("status",))
+    if normalize_kw.get("drop_managed_fields"):
+        paths.append(("metadata", "managedFields"))
+    if normalize_kw.get("drop_last_applied"):
+        paths.append(("metadata", "annotations", LAST_APPLIED_KEY))
+    return tuple(paths)
+
+
+def _indent(line: str) -> int:
+    return len(line) - len(line.lstrip(" "))
+
+
+def _is_blank_or_comment(line: str) -> bool:
+    stripped = line.strip()
+    return not stripped or stripped.startswith("#")
+
+
+def _value_is_safe(value: str) -> bool:
+    """False for values that may continue on lines indented less than their key."""
+    if value[0] in "\"'":
+        quote = value[0]
+        body = (
+            value[1:].replace("\\\\", "").replace('\\"', "")
+            if quote == '"'
+            else value[1:].replace("''", "")
+        )
+        return quote in body
+    if value[0] in "[{":
+        return value.count("[") + value.count("{") == value.count("]") + value.count(
+            "}"
+        )
+    return value[0] not in "&*!%@`"
+
+
+def _block_end(lines: list[str], start: int, indent: int, sequence: bool) -> int:
+    """
+    Return the index after the value that starts on line start: following lines
+    indented deeper than indent, plus "- " items at indent when sequence is True.
+    Trailing blank and comment lines are left outside.
+    """
+    end = start + 1
+    pos = end
+    while pos < len(lines):
+        line = lines[pos]
+        if _is_blank_or_comment(line):
+            pos += 1
+            continue
+        ind = _indent(line)
+        if ind > indent or (
+            sequence and ind == indent and line[ind:].startswith(("- ", "-\n", "-\r"))
+        ):
+            pos += 1
+            end = pos
+            continue
+        break
+    return end
+
+
+def _has_children(
+    lines: list[str], removed: list[bool], start: int, indent: int
+) -> bool:
+    for pos in range(start + 1, _block_end(lines, start, indent, False)):
+        if not removed[pos] and not _is_blank_or_comment(lines[pos]):
+            return True
+    return False
+
+
+def prune_document_text(text: str, paths: tuple[PrunePath, ...]) -> str | None:
+    """
+    Return text without the lines of the subtrees at paths, or None if nothing was cut
+    or the layout is not plain block YAML that can be cut safely (flow or multi-line
+    quoted values, anchors, tabs, directives, a root that is not a resource mapping);
+    the caller then parses the full text. Applies only to documents with top-level
+    apiVersion and kind, like normalize_document. A mapping emptied by the cut is
+    written as {} so it is dropped (or kept) exactly as it would be after parsing.
+    """
+    if not paths:
+        return None
+    lines = text.splitlines(keepends=True)
+    removed = [False] * len(lines)
+    # (indent, key) per open block; key is "[]" for a sequence item, None if unknown.
+    stack: list[tuple[int, str | None]] = []
+    parents = {path[:i] for path in paths for i in range(1, len(path))}
+    parent_lines: list[tuple[int, int]] = []
+    root_keys: set[str] = set()
+    cut_anchor = False
+    pos = 0
+    while pos < len(lines):
+        line = lines[pos]
+        if _is_blank_or_comment(line):
+            pos += 1
+            continue
+        if line.startswith(("%", "---", "...")) or line.lstrip(" ").startswith("\t"):
+            return None
+        indent = _indent(line)
+        match = _KEY_LINE.match(line, indent)
+        if match is None:
+            if not stack and not root_keys:
+                return None  # The root is not a block mapping.
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+            stack.append((indent, None))
+            pos += 1
+            continue
+        if match["dash"]:
+            if not stack:
+                return None
+            while stack and (
+                stack[-1][0] > indent
+                or (stack[-1][0] == indent and stack[-1][1] == _SEQUENCE)
+            ):
+                stack.pop()
+            stack.append((indent, _SEQUENCE))
+            indent += len(match["dash"])
+        else:
+            while stack and stack[-1][0] >= indent:
+                stack.pop()
+        key = match["key"]
+        if key[0] in "\"'":
+            key = key[1:-1]
+        if not stack:
+            if indent != 0:
+                return None
+            root_keys.add(key)
+        value = (match["value"] or "").split(" #", 1)[0].strip()
+        if value and not _value_is_safe(value):
+            return None
+        path = tuple(k for _, k in stack) + (key,)
+        if path in paths:
+            end = _block_end(lines, pos, indent, not value)
+            for i in range(pos, end):
+                removed[i] = True
+                cut_anchor = cut_anchor or "&" in lines[i]
+            pos = end
+            continue
+        if value.startswith(("|", ">")):
+            # Block scalar: its lines are content, not structure.
+            pos = _block_end(lines, pos, indent, False)
+            continue
+        stack.append((indent, key))
+        if not value and path in parents:
+            parent_lines.append((pos, indent))
+        pos += 1
+    if not any(removed) or not {"apiVersion", "kind"} <= root_keys:
+        return None
+    kept = [line for line, cut in zip(lines, removed, strict=True) if not cut]
+    if cut_anchor and any("*" in line for line in kept):
+        return None  # An alias may refer to an anchor that was cut.
+    for pos, indent in parent_lines:
+        if not _has_children(lines, removed, pos, indent):
+            line = lines[pos]
+            body = line.rstrip("\r\n")
+            if "#" in body:
+                return None
+            lines[pos] = body + " {}" + line[len(body) :]
+    return "".join(line for line, cut in zip(lines, removed, strict=True) if not cut)
@@ -0,0 +1,192 @@
+"""
+Resource selection: identity (--select kind=Deployment,namespace=prod,name=payments),
+--kind, --namespace and kubectl-style label selectors (-l app=web,tier!=db).
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from .io import SourceDocument, peek_header
+from .normalize import resource_identity
+from .split import expand_list_items
+
+SELECT_FIELDS = ("apiVersion", "kind", "namespace", "name")
+
+
+def parse_select(spec: str) -> dict[str, str]:
+    """
+    Parse "field=value,..." into a dict. Fields: apiVersion, kind, namespace, name.
+    """
+    select: dict[str, str] = {}
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        field, sep, value = part.partition("=")
+        field = field.strip()
+        if not sep or field not in SELECT_FIELDS:
+            raise ValueError(
+                f"invalid --select term {part!r}; expected one of "
+                f"{', '.join(SELECT_FIELDS)} as field=value"
+            )
+        select[field] = value.strip()
+    return select
+
+
+def identity_matches(
+    identity: tuple[str, str, str, str], select: dict[str, str]
+) -> bool:
+    """Return True if every selected field equals the identity's value."""
+    values = dict(zip(SELECT_FIELDS, identity, strict=True))
+    return all(values[field] == value for field, value in select.items())
+
+
+_SET_REQUIREMENT = re.compile(r"^\s*([^\s!=]+)\s+(in|notin)\s+\((.*)\)\s*$")
+_VALUE_REQUIREMENT = re.compile(r"^\s*([^\s!=]+)\s*(==|!=|=)\s*(\S*)\s*$")
+_EXISTS_REQUIREMENT = re.compile(r"^\s*(!?)\s*([^\s!=(),]+)\s*$")
+
+
+def _split_outside_parens(spec: str) -> list[str]:
+    parts: list[str] = []
+    depth = 0
+    current = ""
+    for ch in spec:
+        if ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += ch
+    parts.append(current)
+    return [p for p in parts if p.strip()]
+
+
+def parse_label_selector(spec: str) -> list[tuple[str, str, frozenset[str]]]:
+    """
+    Parse a kubectl label selector into (key, op, values) requirements. op is one of
+    "in", "notin", "exists", "!exists"; "a=b"/"a==b" is "in", "a!=b" is "notin".
+    """
+    requirements: list[tuple[str, str, frozenset[str]]] = []
+    for part in _split_outside_parens(spec):
+        m = _SET_REQUIREMENT.match(part)
+        if m:
+            values = frozenset(v.strip() for v in m.group(3).split(",") if v.strip())
+            requirements.append((m.group(1), m.group(2), values))
+            continue
+        m = _VALUE_REQUIREMENT.match(part)
+        if m:
+            op = "notin" if m.group(2) == "!=" else "in"
+            requirements.append((m.group(1), op, frozenset([m.group(3)])))
+            continue
+        m = _EXISTS_REQUIREMENT.match(part)
+        if m:
+            requirements.append(
+                (m.group(2), "!exists" if m.group(1) else "exists", frozenset())
+            )
+            continue
+        raise ValueError(f"invalid label selector term {part.strip()!r}")
+    return requirements
+
+
+def labels_match(
+    labels: dict[str, Any], requirements: list[tuple[str, str, frozenset[str]]]
+) -> bool:
+    """Return True if labels satisfy every requirement (kubectl semantics)."""
+    for key, op, values in requirements:
+        present = key in labels
+        if op == "exists" and not present:
+            return False
+        if op == "!exists" and present:
+            return False
+        if op == "in" and (not present or str(labels[key]) not in values):
+            return False
+        if op == "notin" and present and str(labels[key]) in values:
+            return False
+    return True
+
+
+def _split_values(values: Iterable[str] | None) -> frozenset[str]:
+    return frozenset(
+        v.strip() for item in values or () for v in item.split(",") if v.strip()
+    )
+
+
+class ResourceFilter:
+    """
+    Combined --select, --kind, --namespace and label selector filter. Can decide from
+    a document's raw text (via peek_header) before it is parsed.
+    """
+
+    def __init__(
+        self,
+        *,
+        select: dict[str, str] | None = None,
+        kinds: Iterable[str] | None = None,
+        namespaces: Iterable[str] | None = None,
+        label_selector: str | None = None,
+    ) -> None:
+        self.select = select or {}
+        self.kinds = frozenset(k.lower() for k in _split_values(kinds))
+        self.namespaces = _split_values(namespaces)
+        self.labels = parse_label_selector(label_selector) if label_selector else []
+
+    def matches(
+        self,
+        identity: tuple[str, str, str, str],
+        labels: dict[str, Any] | None = None,
+    ) -> bool:
+        """
+        Match an identity; labels=None means unknown (label requirements not checked).
+        """
+        if not identity_matches(identity, self.select):
+            return False
+        if self.kinds and identity[1].lower() not in self.kinds:
+            return False
+        if self.namespaces and identity[2] not in self.namespaces:
+            return False
+        return labels is None or labels_match(labels, self.labels)
+
+    def matches_document(self, doc: dict[str, Any]) -> bool:
+        metadata = doc.get("metadata")
+        labels = metadata.get("labels") if isinstance(metadata, dict) else None
+        return self.matches(
+            resource_identity(doc), labels if isinstance(labels, dict) else {}
+        )
+
+    def accepts_text(self, text: str) -> bool:
+        """
+        Decide from raw document text whether the document may match. False means it
+        certainly does not and can be skipped unparsed; True means parse and check.
+        *List documents are always accepted: their items may match.
+        """
+        header = peek_header(text)
+        if header is None or header.kind.endswith("List"):
+            return True
+        identity = (header.api_version, header.kind, header.namespace, header.name)
+        return self.matches(identity, header.labels)
+
+
+def select_documents(
+    doc_iter: Iterable[SourceDocument], doc_filter: ResourceFilter
+) -> Iterator[SourceDocument]:
+    """
+    Yield the documents that match doc_filter. *List documents are matched per item
+    and each matching item is yielded as a document of its own, with empty text so it
+    is always serialized. Items are complete even if the List was pruned: pruning
+    only cuts subtrees of the List itself.
+    """
+    for source in doc_iter:
+        items = expand_list_items(source.doc)
+        if len(items) == 1 and items[0] is source.doc:
+            if doc_filter.matches_document(source.doc):
+                yield source
+            continue
+        for item in items:
+            if doc_filter.matches_document(item):
+                yield SourceDocument(source.index, item, "", source.offset)
@@ -0,0 +1,178 @@
+"""Several outputs from one normalization pass (--emit KIND:TARGET)."""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import sys
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any, TextIO
+
+from .compress import compression_from_name, open_output
+from .diff import text_to_lines, unified_diff
+from .io import NDJSON_SUFFIXES
+from .split import SplitWriter, expand_list_items
+
+EMIT_KINDS = ("yaml", "json", "ndjson", "diff", "summary")
+
+# render(doc, fmt) -> serialized document in "yaml", "json" or "ndjson".
+Render = Callable[[dict[str, Any], str], str]
+
+
+def parse_emit(spec: str) -> tuple[str, str]:
+    """Parse "KIND:TARGET" (e.g. "json:policy.ndjson", "yaml:out/")."""
+    kind, sep, target = spec.partition(":")
+    if not sep or kind not in EMIT_KINDS or not target:
+        raise ValueError(
+            f"invalid --emit {spec!r}; expected KIND:TARGET with KIND one of "
+            f"{', '.join(EMIT_KINDS)}"
+        )
+    return kind, target
+
+
+def _open_target(target: str) -> TextIO:
+    if target == "-":
+        return sys.stdout
+    with contextlib.ExitStack() as stack:
+        raw = stack.enter_context(open(target, "wb"))
+        stream = open_output(raw, compression_from_name(target))
+        stack.pop_all()  # The stream now owns the file.
+    return stream
+
+
+class _StreamSink:
+    """All normalized documents in one file (or stdout), as YAML, JSON or NDJSON."""
+
+    def __init__(self, fmt: str, target: str, render: Render) -> None:
+        if fmt == "json" and target.lower().endswith(NDJSON_SUFFIXES):
+            fmt = "ndjson"
+        self.fmt = fmt
+        self.render = render
+        self.out = _open_target(target)
+        self.first = True
+
+    def add(self, key: str, norms: list[dict], original: str, normalized: str) -> None:
+        for doc in norms:
+            if not self.first and self.fmt != "ndjson":
+                self.out.write("---\n")
+            self.out.write(self.render(doc, self.fmt))
+            self.first = False
+
+    def close(self, report: dict[str, Any]) -> None:
+        if self.out is not sys.stdout:
+            self.out.close()
+
+
+class _TreeSink:
+    """One file per resource under a directory, laid out like --split-output."""
+
+    def __init__(self, fmt: str, target: str, render: Render) -> None:
+        self.fmt = fmt
+        self.render = render
+        self.writer = SplitWriter(Path(target), "yaml" if fmt == "yaml" else "json")
+
+    def add(self, key: str, norms: list[dict], original: str, normalized: str) -> None:
+        for doc in norms:
+            for item in expand_list_items(doc):
+                self.writer.add(item, self.render(item, self.fmt))
+
+    def close(self, report: dict[str, Any]) -> None:
+        self.writer.close()
+
+
+class _DiffSink:
+    """Unified diff of every changed file, as --diff would print it."""
+
+    def __init__(self, target: str) -> None:
+        self.out = _open_target(target)
+
+    def add(self, key: str, norms: list[dict], original: str, normalized: str) -> None:
+        self.out.writelines(
+            unified_diff(
+                text_to_lines(original),
+                text_to_lines(normalized),
+                fromfile=key,
+                tofile=key,
+            )
+        )
+
+    def close(self, report: dict[str, Any]) -> None:
+        if self.out is not sys.stdout:
+            self.out.close()
+
+
+class _SummarySink:
+    """A JSON report of counts, changed files and errors, written when the run ends."""
+
+    def __init__(self, target: str) -> None:
+        self.target = target
+
+    def add(self, key: str, norms: list[dict], original: str, normalized: str) -> None:
+        pass
+
+    def close(self, report: dict[str, Any]) -> None:
+        out = _open_target(self.target)
+        out.write(json.dumps(report, indent=2) + "\n")
+        if out is not sys.stdout:
+            out.close()
+
+
+class EmitSinks:
+    """
+    Fan normalized files out to every --emit target. add() is called once per input
+    file with its normalized documents and the original/normalized texts used for diffs.
+    """
+
+    def __init__(self, specs: Sequence[str], render: Render) -> None:
+        parsed = [parse_emit(spec) for spec in specs]
+        if sum(target == "-" for _, target in parsed) > 1:
+            raise ValueError("only one --emit target can be - (stdout)")
+        self.sinks: list[Any] = []
+        self.files = 0
+        self.documents = 0
+        self.documents_changed = 0
+        self.changed_files: list[str] = []
+        try:
+            for kind, target in parsed:
+                if kind == "diff":
+                    self.sinks.append(_DiffSink(target))
+                elif kind == "summary":
+                    self.sinks.append(_SummarySink(target))
+                elif target.endswith(("/", "\\")) or Path(target).is_dir():
+                    self.sinks.append(_TreeSink(kind, target, render))
+                else:
+                    self.sinks.append(_StreamSink(kind, target, render))
+        except Exception:
+            self.close([])
+            raise
+
+    def add(
+        self,
+        key: str,
+        norms: list[dict],
+        original: str,
+        normalized: str,
+        docs_changed: int,
+    ) -> None:
+        self.files += 1
+        self.documents += len(norms)
+        self.documents_changed += docs_changed
+        if docs_changed:
+            self.changed_files.append(key)
+        for sink in self.sinks:
+            sink.add(key, norms, original, normalized)
+
+    def close(self, errors: list[str]) -> None:
+        """Flush every sink; the summary sink records errors."""
+        report = {
+            "files": self.files,
+            "files_changed": len(self.changed_files),
+            "documents": self.documents,
+            "documents_changed": self.documents_changed,
+            "changed_files": self.changed_files,
+            "errors": list(errors),
+        }
+        for sink in self.sinks:
+            sink.close(report)
+        self.sinks = []
@@ -0,0 +1,71 @@
+"""Deterministic document ordering, with an external merge sort for large streams."""
+
+from __future__ import annotations
+
+import contextlib
+import heapq
+import json
+import tempfile
+from collections.abc import Iterable, Iterator
+from typing import IO, Any
+
+from .normalize import resource_identity
+
+DEFAULT_SORT_BUFFER_BYTES = 64 * 1024 * 1024
+
+
+def document_sort_key(doc: dict[str, Any]) -> tuple[str, str, str, str]:
+    """Sort key for a document: (apiVersion, kind, namespace, name)."""
+    return resource_identity(doc)
+
+
+def _spill(run: list[tuple[Any, int, str]]) -> IO[str]:
+    """Write a sorted run to an anonymous temp file (one JSON array per line)."""
+    with contextlib.ExitStack() as stack:
+        f = stack.enter_context(tempfile.TemporaryFile(mode="w+", encoding="utf-8"))
+        for item in run:
+            f.write(json.dumps(item))
+            f.write("\n")
+        f.seek(0)
+        stack.pop_all()  # Closed by the caller once the run is merged.
+    return f
+
+
+def _read_run(f: IO[str]) -> Iterator[tuple[Any, int, str]]:
+    for line in f:
+        key, seq, text = json.loads(line)
+        yield tuple(key), seq, text
+
+
+def external_sort(
+    items: Iterable[tuple[tuple[str, ...], str]],
+    *,
+    buffer_bytes: int = DEFAULT_SORT_BUFFER_BYTES,
+) -> Iterator[tuple[tuple[str, ...], str]]:
+    """
+    Yield (key, text) items ordered by key; ties keep input order.
+    At most about buffer_bytes of text is held in memory: larger inputs are sorted in
+    runs that are spilled to temp files and merged.
+    """
+    buffer: list[tuple[Any, int, str]] = []
+    size = 0
+    runs: list[IO[str]] = []
+    try:
+        for seq, (key, text) in enumerate(items):
+            buffer.append((key, seq, text))
+            size += len(text)
+            if size >= buffer_bytes:
+                buffer.sort()
+                runs.append(_spill(buffer))
+                buffer, size = [], 0
+        buffer.sort()
+        if not runs:
+            for key, _seq, text in buffer:
+                yield key, text
+            return
+        merged = heapq.merge(*(_read_run(f) for f in runs), iter(buffer))
+        for key, _seq, text in merged:
+            yield key, text
+    finally:
+        for f in runs:
+            f.close()
@@ -0,0 +1,122 @@
+"""Write normalized resources to one file each (DIR/<namespace>/<kind>/<name>.<ext>)."""
+
+from __future__ import annotations
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from .normalize import resource_identity
+
+CLUSTER_SCOPED_DIR = "_cluster"
+
+
+def expand_list_items(doc: dict[str, Any]) -> list[dict[str, Any]]:
+    """
+    Return the items of a *List document (kubectl get -o yaml), or [doc] otherwise.
+    """
+    kind = doc.get("kind")
+    items = doc.get("items")
+    if isinstance(kind, str) and kind.endswith("List") and isinstance(items, list):
+        return [item for item in items if isinstance(item, dict)]
+    return [doc]
+
+
+def _safe_segment(value: str) -> str:
+    value = value.replace("/", "_").replace("\\", "_")
+    # "." and ".." would step out of the layout; no valid Kubernetes name is either.
+    if value in (".", ".."):
+        return "_" + value
+    return value
+
+
+def resource_relpath(doc: dict[str, Any], ext: str) -> Path:
+    """Return <namespace>/<kind>/<name>.<ext> for doc (_cluster if cluster-scoped)."""
+    _api_version, kind, namespace, name = resource_identity(doc)
+    if not kind or not name:
+        raise ValueError("cannot split document without kind and metadata.name")
+    return (
+        Path(_safe_segment(namespace or CLUSTER_SCOPED_DIR))
+        / _safe_segment(kind)
+        / f"{_safe_segment(name)}.{ext}"
+    )
+
+
+def write_if_changed(path: Path, text: str) -> bool:
+    """Write text to path unless it already has that content; True if written."""
+    data = text.encode("utf-8")
+    try:
+        if path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+
+class SplitWriter:
+    """
+    Collect (doc, text) pairs and write each to its own file under root using a thread
+    pool. Files whose content is unchanged are left untouched; close(prune=True) also
+    deletes other files with the same extension where this layout puts resources
+    (<namespace>/<kind>/<name>.<ext>), leaving anything else under root alone. Failed
+    writes are collected in errors as "path: reason" instead of being raised.
+    """
+
+    def __init__(self, root: Path, ext: str, *, jobs: int | None = None) -> None:
+        self.root = root
+        self.ext = ext
+        self._pool = ThreadPoolExecutor(max_workers=jobs)
+        self._futures: dict[Path, Future[bool]] = {}
+        self.errors: list[str] = []
+
+    def add(self, doc: dict[str, Any], text: str) -> None:
+        target = self.root / resource_relpath(doc, self.ext)
+        # Also catches symlinked directories under root that point elsewhere.
+        if not target.resolve().is_relative_to(self.root.resolve()):
+            raise ValueError(f"{target}: resource path escapes {self.root}")
+        previous = self._futures.get(target)
+        if previous is not None:
+            # Same identity seen twice: last one wins, after the earlier write finishes.
+            self._result(target, previous)
+        self._futures[target] = self._pool.submit(write_if_changed, target, text)
+
+    def close(self, *, prune: bool = False) -> tuple[int, int, int]:
+        """
+        Wait for pending writes. Returns (written, unchanged, pruned); nothing is pruned
+        if a write failed.
+        """
+        self._pool.shutdown(wait=True)
+        results = [self._result(path, f) for path, f in self._futures.items()]
+        written = results.count(True)
+        unchanged = results.count(False)
+        pruned = self._prune() if prune and not self.errors else 0
+        return (written, unchanged, pruned)
+
+    def _result(self, path: Path, future: Future[bool]) -> bool | None:
+        """Return whether the write to path changed it, or None if it failed."""
+        try:
+            return future.result()
+        except OSError as e:
+            self.errors.append(f"{path}: {e.strerror or e}")
+            return None
+
+    def _prune(self) -> int:
+        keep = set(self._futures)
+        pruned = 0
+        parents: set[Path] = set()
+        for path in sorted(self.root.glob(f"*/*/*.{self.ext}")):
+            # Hidden directories (.git, .github, ...) are never namespaces or kinds.
+            if path in keep or not path.is_file():
+                continue
+            if any(part.startswith(".") for part in path.relative_to(self.root).parts):
+                continue
+            path.unlink()
+            pruned += 1
+            parents.update((path.parent, path.parent.parent))
+        # Remove <kind> and <namespace> directories left empty, deepest first.
+        for d in sorted(parents, key=lambda p: len(p.parts), reverse=True):
+            if d.is_dir() and not any(d.iterdir()):
+                d.rmdir()
+        return pruned
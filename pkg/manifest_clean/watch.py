@@ -0,0 +1,220 @@
+"""
+File change detection for --watch: inotify via ctypes on Linux, mtime polling elsewhere.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from .io import is_manifest_name, iter_paths
+
+# inotify(7) event masks.
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+_WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+)
+_EVENT = struct.Struct("iIII")
+
+# Editors save in several steps; gather events arriving this close together.
+_SETTLE_SECONDS = 0.05
+
+
+class _Targets:
+    """Watched path arguments: files whatever their name, directories recursively."""
+
+    def __init__(self, path_args: Iterable[str]) -> None:
+        self.files: set[Path] = set()
+        self.dirs: list[Path] = []
+        for arg in path_args:
+            p = Path(arg).absolute()
+            if p.is_dir():
+                self.dirs.append(p)
+            else:
+                self.files.add(p)
+
+    def wanted(self, path: Path) -> bool:
+        if path in self.files:
+            return True
+        return is_manifest_name(path.name) and any(
+            path.is_relative_to(d) for d in self.dirs
+        )
+
+
+class PollingWatcher:
+    """
+    Detect changes by comparing (mtime_ns, size) of the watched files every interval.
+    """
+
+    def __init__(self, path_args: Iterable[str], interval: float = 0.5) -> None:
+        self.path_args = list(path_args)
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        snapshot: dict[Path, tuple[int, int]] = {}
+        for arg in self.path_args:
+            try:
+                for path in iter_paths(arg):
+                    st = path.stat()
+                    snapshot[path.absolute()] = (st.st_mtime_ns, st.st_size)
+            except FileNotFoundError:
+                continue
+        return snapshot
+
+    def poll(self) -> set[Path]:
+        """Return the files created, modified or removed since the last call."""
+        snapshot = self._scan()
+        changed = {
+            path
+            for path in snapshot.keys() | self.snapshot.keys()
+            if snapshot.get(path) != self.snapshot.get(path)
+        }
+        self.snapshot = snapshot
+        return changed
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        """Block until something changed (or timeout seconds passed) and return it."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = self.poll()
+            if changed:
+                return changed
+            if deadline is not None and time.monotonic() >= deadline:
+                return set()
+            time.sleep(self.interval)
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """
+    Linux inotify through libc (no third-party package). Every directory under the
+    watched paths gets a watch; new directories are added as they appear.
+    """
+
+    def __init__(self, path_args: Iterable[str]) -> None:
+        self.targets = _Targets(path_args)
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict[int, Path] = {}
+        try:
+            for d in self.targets.dirs:
+                self._watch_tree(d)
+            for f in self.targets.files:
+                self._watch_dir(f.parent)
+        except OSError:
+            self.close()
+            raise
+
+    def _watch_dir(self, path: Path) -> None:
+        wd = self._libc.inotify_add_watch(
+            self.fd, os.fsencode(str(path)), ctypes.c_uint32(_WATCH_MASK)
+        )
+        if wd < 0:
+            # ENOSPC here means fs.inotify.max_user_watches is exhausted.
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.dirs[wd] = path
+
+    def _watch_tree(self, root: Path) -> None:
+        self._watch_dir(root)
+        for dirpath, dirnames, _ in os.walk(root):
+            for name in dirnames:
+                self._watch_dir(Path(dirpath) / name)
+
+    def _read_events(self) -> tuple[set[Path], bool]:
+        changed: set[Path] = set()
+        overflow = False
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return changed, overflow
+            pos = 0
+            while pos < len(data):
+                wd, mask, _cookie, length = _EVENT.unpack_from(data, pos)
+                pos += _EVENT.size
+                name = data[pos : pos + length].rstrip(b"\0")
+                pos += length
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                parent = self.dirs.get(wd)
+                if parent is None or not name:
+                    continue
+                path = parent / os.fsdecode(name)
+                if mask & IN_ISDIR:
+                    if mask & (IN_CREATE | IN_MOVED_TO):
+                        # Files may land in the new directory before its watch exists.
+                        self._watch_tree(path)
+                        changed.update(p.absolute() for p in iter_paths(str(path)))
+                    continue
+                changed.add(path)
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        """
+        Block until a watched manifest changed (or timeout seconds passed) and return
+        the changed paths. After an event-queue overflow every watched file is returned.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return set()
+            time.sleep(_SETTLE_SECONDS)
+            changed, overflow = self._read_events()
+            if overflow:
+                changed = {
+                    p.absolute()
+                    for arg in [
+                        *map(str, self.targets.dirs),
+                        *map(str, self.targets.files),
+                    ]
+                    if Path(arg).exists()
+                    for p in iter_paths(arg)
+                }
+            changed = {p for p in changed if self.targets.wanted(p)}
+            if changed:
+                return changed
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def open_watcher(
+    path_args: Iterable[str], interval: float = 0.5
+) -> InotifyWatcher | PollingWatcher:
+    """Return an inotify watcher where available, otherwise an mtime-polling watcher."""
+    path_args = list(path_args)
+    try:
+        return InotifyWatcher(path_args)
+    except (OSError, AttributeError):
+        # Not Linux, no libc inotify symbols, or out of watches.
+        return PollingWatcher(path_args, interval)
@@ -0,0 +1,69 @@
+"""Tests for manifest_clean.canonical."""
+
+import pytest
+
+from pkg.manifest_clean.canonical import is_canonical_layout
+from pkg.manifest_clean.cli import serialize
+from pkg.manifest_clean.io import new_yaml_loader
+from pkg.manifest_clean.normalize import copy_tree
+
+SAMPLES = [
+    "apiVersion: v1\nkind: Pod\nmetadata:\n  name: a\n  labels: {}\n",
+    (
+        "kind: Deployment\nspec:\n  replicas: 3\n  template:\n    spec:\n"
+        "      containers:\n      - name: c\n        image: nginx:1.25\n"
+        "        args: [--port=80, -v, x y]\n      - name: d\n"
+        "        ports:\n        - containerPort: 80\n        env: []\n"
+    ),
+    "data:\n  script: |\n    echo a\n\n    echo b\n  tail: |-\n    no newline\n",
+    "a:\n- [1, 2]\n- [[3, {k: true}]]\n- {m: [[1]], n: null}\n",
+    "'a b': '1'\nx: 'true'\ny: ''\nz: '2024-01-01'\nw: '0x1f'\n",
+]
+
+
+@pytest.mark.parametrize("indent", [2, 4])
+@pytest.mark.parametrize("source", SAMPLES)
+def test_canonical_layout_matches_emitter(source, indent):
+    text = serialize(copy_tree(new_yaml_loader().load(source)), "yaml", indent)
+    assert is_canonical_layout(text, indent)
+    variants = [
+        source,
+        serialize(copy_tree(new_yaml_loader().load(source)), "yaml", 6 - indent),
+        text + "# trailing\n",
+        text.replace("\n", "  # c\n", 1),
+        text.replace("\n", "\n\n", 1),
+        text.replace(": ", ":  ", 1),
+        text.replace("'", '"'),
+    ]
+    for variant in variants:
+        if is_canonical_layout(variant, indent):
+            loaded = new_yaml_loader().load(variant)
+            assert serialize(copy_tree(loaded), "yaml", indent) == variant
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "metadata: {name: a}\n",
+        "items: [a, b]\n",
+        "a: 1  # c\n",
+        "# c\na: 1\n",
+        "a:\n    b: 1\n",
+        "a:\n  - 1\n",
+        "a: ~\n",
+        "a: True\n",
+        "a: 0x1f\n",
+        "a: 1.5\n",
+        "a: &x 1\nb: *x\n",
+        "a: !!str 1\n",
+        "a: >\n  folded\n",
+        "a: |2\n    lit\n",
+        "a: |\n  lit\n\nb: 1\n",
+        "a: 1 \n",
+        "a: 1",
+        "a:\n- - {}\n",
+        '{"a": 1}\n',
+    ],
+)
+def test_non_canonical_layout_is_rejected(text):
+    assert not is_canonical_layout(text, 2)
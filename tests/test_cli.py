@@ -1,6 +1,7 @@
 """Tests for manifest_clean.cli (run() and integration)."""
 
 from pkg.manifest_clean.cli import run
+from pkg.manifest_clean.fingerprint import canonical_digest
 
 
 def test_run_missing_path_returns_2(capsys):
@@ -84,7 +85,522 @@ def test_run_write_rejected_for_stdin(capsys):
     assert "stdin" in err or "write" in err.lower()
 
 
+def test_run_archive_diff_uses_member_names(capsys, tmp_path):
+    import zipfile
+
+    archive = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("pod.yaml", "kind: Pod\napiVersion: v1\n")
+    code, fc, _ = run(str(archive), diff=True)
+    assert code == 0
+    assert fc == 1
+    out, _ = capsys.readouterr()
+    assert f"{archive}!pod.yaml" in out
+
+
+def test_run_write_rejected_for_archive(capsys, tmp_path):
+    import tarfile
+
+    archive = tmp_path / "bundle.tar"
+    with tarfile.open(archive, "w"):
+        pass
+    code, _, _ = run(str(archive), write=True)
+    assert code == 2
+    _, err = capsys.readouterr()
+    assert "archive" in err
+
+
+def test_run_split_output(capsys, tmp_path):
+    f = tmp_path / "in.yaml"
+    f.write_text(
+        "kind: List\napiVersion: v1\nitems:\n"
+        "- {apiVersion: v1, kind: Pod, metadata: {name: a, namespace: prod},"
+        " status: {}}\n"
+        "---\n"
+        "apiVersion: v1\nkind: Namespace\nmetadata:\n  name: prod\n"
+    )
+    out_dir = tmp_path / "out"
+    code, fc, dc = run(str(f), split_output=str(out_dir), summary=True)
+    assert code == 0
+    assert (fc, dc) == (2, 2)
+    assert "status" not in (out_dir / "prod" / "Pod" / "a.yaml").read_text()
+    assert (out_dir / "_cluster" / "Namespace" / "prod.yaml").exists()
+    _, err = capsys.readouterr()
+    assert "Resources written: 2" in err
+
+    code, fc, dc = run(str(f), split_output=str(out_dir))
+    assert (code, fc, dc) == (0, 0, 0)
+
+
+def test_run_split_output_reports_write_errors(capsys, tmp_path):
+    f = tmp_path / "in.yaml"
+    f.write_text("apiVersion: v1\nkind: Pod\nmetadata:\n  name: a\n  namespace: prod\n")
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    (out_dir / "prod").write_text("")
+    code, _, _ = run(str(f), split_output=str(out_dir))
+    assert code == 2
+    _, err = capsys.readouterr()
+    assert err.startswith("error: ") and "Pod/a.yaml" in err
+
+
+def test_run_prune_requires_split_output(capsys, tmp_path):
+    f = tmp_path / "pod.yaml"
+    f.write_text("apiVersion: v1\nkind: Pod\n")
+    code, _, _ = run(str(f), prune=True)
+    assert code == 2
+
+
+def test_run_stdin_ndjson_roundtrip(capsys, monkeypatch):
+    from io import StringIO
+
+    stdin = StringIO(
+        '{"kind": "Pod", "apiVersion": "v1", "status": {"phase": "Running"}}\n'
+        '{"kind": "Service", "apiVersion": "v1"}\n'
+    )
+    monkeypatch.setattr("sys.stdin", stdin)
+    code, _, _ = run("-", input_format="ndjson", fmt="ndjson")
+    assert code == 0
+    out, _ = capsys.readouterr()
+    assert out == (
+        '{"apiVersion":"v1","kind":"Pod"}\n{"apiVersion":"v1","kind":"Service"}\n'
+    )
+
+
+def test_run_verbatim_copies_unchanged_documents(capsys, tmp_path, monkeypatch):
+    from pkg.manifest_clean import cli
+
+    f = tmp_path / "cm.yaml"
+    clean = "apiVersion: v1\ndata:\n  big: |\n    line\nkind: ConfigMap\n"
+    f.write_text(clean + "---\nkind: Pod\napiVersion: v1\n")
+    dumped = []
+    dump = cli._dump_yaml
+    monkeypatch.setattr(
+        cli, "_dump_yaml", lambda doc, indent=2: dumped.append(doc) or dump(doc, indent)
+    )
+    code, _, dc = run(str(f), verbatim=True)
+    assert code == 0
+    out, _ = capsys.readouterr()
+    assert out.startswith(clean) and out.endswith("\napiVersion: v1\nkind: Pod\n")
+    assert all(doc["kind"] == "Pod" for doc in dumped)
+
+    f.write_text(clean)
+    code, _, dc = run(str(f), verbatim=True, check=True)
+    assert (code, dc) == (0, 0)
+
+
+def test_run_verbatim_does_not_change_check_result(capsys, tmp_path):
+    f = tmp_path / "a.yaml"
+    # Sorted keys, but 4-space indent, a flow mapping and a comment.
+    f.write_text(
+        "apiVersion: v1\nkind: Pod\nmetadata: {name: a}\nspec:\n"
+        "    containers:\n    -   name: c  # main\n"
+    )
+    assert run(str(f), check=True)[0] == 1
+    assert run(str(f), check=True, verbatim=True)[0] == 1
+    run(str(f), verbatim=True)
+    out, _ = capsys.readouterr()
+    assert out == (
+        "apiVersion: v1\nkind: Pod\nmetadata:\n  name: a\nspec:\n"
+        "  containers:\n  - name: c\n"
+    )
+    for name, text in (
+        ("b.json", '{"apiVersion": "v1", "kind": "Pod"}\n'),
+        ("c.ndjson", '{"apiVersion":"v1","kind":"Pod"}\n'),
+    ):
+        g = tmp_path / name
+        g.write_text(text)
+        run(str(g))
+        emitted, _ = capsys.readouterr()
+        run(str(g), verbatim=True)
+        out, _ = capsys.readouterr()
+        assert out == emitted and out != text
+
+
+def test_run_multiple_paths_combined_check(capsys, tmp_path):
+    clean = tmp_path / "clean.yaml"
+    clean.write_text("apiVersion: v1\nkind: Pod\n")
+    sub = tmp_path / "sub"
+    sub.mkdir()
+    dirty = sub / "dirty.yaml"
+    dirty.write_text("kind: Pod\napiVersion: v1\n")
+    code, fc, dc = run([str(clean), str(sub), str(dirty)], check=True, summary=True)
+    assert (code, fc, dc) == (1, 1, 1)
+    _, err = capsys.readouterr()
+    assert "Files that would change: 1" in err
+
+
+def test_run_stdin_with_other_paths_rejected(capsys, tmp_path):
+    f = tmp_path / "pod.yaml"
+    f.write_text("apiVersion: v1\nkind: Pod\n")
+    code, _, _ = run(["-", str(f)])
+    assert code == 2
+
+
+def test_run_sort_documents_stdin(capsys, monkeypatch):
+    from io import StringIO
+
+    stdin = StringIO(
+        "apiVersion: v1\nkind: Service\nmetadata:\n  name: b\n---\n"
+        "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: a\n"
+    )
+    monkeypatch.setattr("sys.stdin", stdin)
+    code, _, _ = run("-", sort_documents=True, sort_buffer_bytes=1)
+    assert code == 0
+    out, _ = capsys.readouterr()
+    assert out.index("ConfigMap") < out.index("Service")
+
+
+def test_run_sort_documents_check_detects_reorder(tmp_path):
+    f = tmp_path / "multi.yaml"
+    f.write_text(
+        "apiVersion: v1\nkind: Service\n---\napiVersion: v1\nkind: ConfigMap\n"
+    )
+    code, fc, _ = run(str(f), check=True, sort_documents=True)
+    assert (code, fc) == (1, 1)
+    run(str(f), write=True, sort_documents=True)
+    code, _, _ = run(str(f), check=True, sort_documents=True)
+    assert code == 0
+
+
+def test_run_select_with_index(capsys, tmp_path):
+    (tmp_path / "a.yaml").write_text(
+        "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: payments\n"
+        "  namespace: prod\n---\n"
+        "apiVersion: v1\nkind: Service\nmetadata:\n  name: payments\n"
+    )
+    (tmp_path / "b.yaml").write_text("apiVersion: v1\nkind: ConfigMap\n")
+    index_file = str(tmp_path / "index.json")
+    code, _, _ = run(str(tmp_path), index_file=index_file)
+    assert code == 0
+    _, err = capsys.readouterr()
+    assert "Indexed 2 files" in err
+
+    select = "kind=Deployment,namespace=prod,name=payments"
+    for kw in ({"index_file": index_file}, {}):
+        code, _, _ = run(str(tmp_path), select=select, **kw)
+        assert code == 0
+        out, _ = capsys.readouterr()
+        assert "Deployment" in out
+        assert "Service" not in out and "ConfigMap" not in out
+
+
+def test_run_index_reports_bad_files_and_keeps_going(capsys, tmp_path):
+    (tmp_path / "a.yaml").write_text(
+        "apiVersion: v1\nkind: Service\nmetadata:\n  name: web\n"
+    )
+    (tmp_path / "b.yaml").write_text("kind: [\n")
+    index_file = tmp_path / "index.json"
+    code, _, _ = run(str(tmp_path), index_file=str(index_file))
+    assert code == 2
+    _, err = capsys.readouterr()
+    assert "error: " in err and "b.yaml" in err and "Indexed 1 files" in err
+    assert index_file.exists()
+
+    # The bad file is read in full and reported as without --index.
+    results = []
+    for kw in ({"index_file": str(index_file)}, {}):
+        results.append(
+            (run(str(tmp_path), kinds=["Service"], **kw), capsys.readouterr())
+        )
+    assert results[0] == results[1]
+    assert results[0][0][0] == 2 and "b.yaml" in results[0][1][1]
+
+
+def test_run_kind_namespace_and_label_filters(capsys, tmp_path):
+    (tmp_path / "a.yaml").write_text(
+        "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: web\n"
+        "  namespace: prod\n  labels:\n    app: web\n---\n"
+        "apiVersion: v1\nkind: Service\nmetadata:\n  name: web\n  namespace: prod\n"
+        "  labels:\n    app: web\n---\n"
+        "apiVersion: apps/v1\nkind: Deployment\nmetadata: {name: db, namespace: prod,"
+        " labels: {app: db}}\n"
+    )
+    code, _, _ = run(
+        str(tmp_path),
+        kinds=["deployment"],
+        namespaces=["prod"],
+        label_selector="app=web",
+    )
+    assert code == 0
+    out, _ = capsys.readouterr()
+    assert "name: web" in out
+    assert "Service" not in out and "db" not in out
+
+
+def test_run_select_rejects_write(capsys, tmp_path):
+    f = tmp_path / "pod.yaml"
+    f.write_text("apiVersion: v1\nkind: Pod\n")
+    code, _, _ = run(str(f), select="kind=Pod", write=True)
+    assert code == 2
+
+
+def test_run_compare(capsys, tmp_path, monkeypatch):
+    from pkg.manifest_clean import cli
+
+    same_cm = "---\napiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: same\n"
+    (tmp_path / "a.yaml").write_text(
+        "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: c\ndata:\n  k: a\n"
+        + same_cm
+    )
+    (tmp_path / "b.yaml").write_text(
+        "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: c\n  uid: u\n"
+        "data:\n  k: b\n" + same_cm
+    )
+    dumped = []
+    dump = cli._dump_yaml
+    monkeypatch.setattr(
+        cli, "_dump_yaml", lambda doc, indent=2: dumped.append(doc) or dump(doc, indent)
+    )
+    code, _, drift = run(
+        None, compare=(str(tmp_path / "a.yaml"), str(tmp_path / "b.yaml"))
+    )
+    assert (code, drift) == (1, 1)
+    out, _ = capsys.readouterr()
+    assert "-  k: a" in out and "+  k: b" in out
+    # Only the differing pair is serialized.
+    assert [doc["metadata"]["name"] for doc in dumped] == ["c", "c"]
+    same = str(tmp_path / "a.yaml")
+    assert run(None, compare=(same, same))[0] == 0
+    assert run([same], compare=(same, same))[0] == 2
+
+
+def test_run_write_keeps_compression(tmp_path):
+    import gzip
+
+    f = tmp_path / "pod.yaml.gz"
+    f.write_bytes(
+        gzip.compress(b"apiVersion: v1\nkind: Pod\nmetadata:\n  uid: x\n  name: a\n")
+    )
+    code, files_changed, _ = run(str(f), write=True)
+    assert (code, files_changed) == (0, 1)
+    assert (
+        gzip.decompress(f.read_bytes())
+        == b"apiVersion: v1\nkind: Pod\nmetadata:\n  name: a\n"
+    )
+    assert run(str(f), check=True)[0] == 0
+
+
+def test_run_fingerprint(capsys, tmp_path):
+    (tmp_path / "a.yaml").write_text(
+        "apiVersion: v1\nkind: List\nitems:\n"
+        "- {apiVersion: v1, kind: Pod, metadata: {name: a, uid: x}}\n"
+        "- {apiVersion: v1, kind: Pod, metadata: {name: b}}\n"
+    )
+    code, _, _ = run(str(tmp_path), fingerprint=True)
+    assert code == 0
+    out, _ = capsys.readouterr()
+    rows = [line.split("\t") for line in out.splitlines()]
+    assert [row[3] for row in rows] == ["a", "b"]
+    # uid is dropped before hashing: the digest covers the normalized content.
+    assert rows[0][4] == canonical_digest(
+        {"apiVersion": "v1", "kind": "Pod", "metadata": {"name": "a"}}
+    )
+    assert run(str(tmp_path), fingerprint=True, check=True)[0] == 2
+
+
+def test_run_write_journal_resume(capsys, tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    for name in ("a", "b"):
+        (src / f"{name}.yaml").write_text(
+            f"apiVersion: v1\nkind: Pod\nmetadata:\n  uid: x\n  name: {name}\n"
+        )
+    journal = str(tmp_path / "journal.jsonl")
+    code, files_changed, _ = run(str(src), write=True, journal_file=journal)
+    assert (code, files_changed) == (0, 2)
+    assert "uid" not in (src / "a.yaml").read_text()
+
+    # Simulate a file left dirty by someone else after its journal entry: only
+    # files changed since the journal are redone on resume.
+    (src / "b.yaml").write_text(
+        "apiVersion: v1\nkind: Pod\nmetadata:\n  uid: y\n  name: b\n"
+    )
+    code, files_changed, _ = run(
+        str(src), write=True, journal_file=journal, resume=True, summary=True
+    )
+    assert (code, files_changed) == (0, 2)
+    assert "uid" not in (src / "b.yaml").read_text()
+    _, err = capsys.readouterr()
+    assert "Resumed: 1 files" in err
+
+    assert run(str(src), journal_file=journal)[0] == 2
+    assert run(str(src), resume=True, check=True)[0] == 2
+
+
 def test_run_version_in_help():
     from pkg.manifest_clean import __version__
 
     assert __version__ == "1.0.0"
+
+
+def test_run_emit_several_sinks_with_check(capsys, tmp_path):
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.yaml").write_text(
+        "apiVersion: v1\nkind: Pod\nmetadata:\n  uid: x\n  name: a\n"
+    )
+    out = tmp_path / "out"
+    code, files_changed, _ = run(
+        str(src),
+        check=True,
+        emit=[
+            f"yaml:{out}/",
+            f"ndjson:{tmp_path / 'all.ndjson'}",
+            f"summary:{tmp_path / 'report.json'}",
+        ],
+    )
+    assert (code, files_changed) == (1, 1)
+    assert capsys.readouterr().out == ""
+    assert "uid" not in (out / "_cluster" / "Pod" / "a.yaml").read_text()
+    assert (tmp_path / "all.ndjson").read_text().startswith('{"apiVersion":"v1"')
+    assert '"files_changed": 1' in (tmp_path / "report.json").read_text()
+
+    assert run(str(src), fingerprint=True, emit=["diff:-"])[0] == 2
+
+
+def test_run_stdin_jobs_matches_serial(capsys, monkeypatch):
+    from io import StringIO
+
+    text = "".join(
+        f"apiVersion: v1\nkind: Pod\nmetadata:\n  name: p{i}\n  uid: x\n---\n"
+        for i in range(100)
+    )
+    monkeypatch.setattr("sys.stdin", StringIO(text))
+    assert run("-")[0] == 0
+    serial, _ = capsys.readouterr()
+    monkeypatch.setattr("sys.stdin", StringIO(text))
+    assert run("-", jobs=2)[0] == 0
+    out, _ = capsys.readouterr()
+    assert out == serial
+    assert "uid" not in out
+
+
+def test_run_skipped_subtrees_still_diff_and_count(capsys, tmp_path):
+    f = tmp_path / "a.yaml"
+    f.write_text(
+        "apiVersion: v1\nkind: Pod\nmetadata:\n  managedFields:\n  - manager: x\n"
+        "  name: a\nstatus:\n  phase: Running\n"
+    )
+    assert run(str(f), check=True) == (1, 1, 1)
+    code, _, _ = run(str(f), diff=True)
+    assert code == 0
+    out, _ = capsys.readouterr()
+    assert "-  - manager: x\n" in out and "-  phase: Running\n" in out
+    run(str(f), drop_status=False, verbatim=True)
+    out, _ = capsys.readouterr()
+    assert "phase: Running" in out and "managedFields" not in out
+
+
+def test_run_marker_skips_verified_files(capsys, tmp_path, monkeypatch):
+    f = tmp_path / "a.yaml"
+    f.write_text("apiVersion: v1\nkind: Pod\nmetadata:\n  uid: x\n  name: a\n")
+    assert run(str(f), write=True, marker=True)[0] == 0
+    assert "# manifest-clean: sha256=" in f.read_text()
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("verified file was parsed")
+
+    with monkeypatch.context() as m:
+        m.setattr("pkg.manifest_clean.cli._iter_sources", no_parse)
+        assert run(str(f), check=True, marker=True, summary=True)[0] == 0
+    assert "Verified by marker: 1 files" in capsys.readouterr().err
+
+    # Different options: the marker is stale, the file is parsed and still clean.
+    assert run(str(f), check=True, marker=True, drop_uid=False)[0] == 0
+    assert run(str(f), marker=True, fmt="json", check=True)[0] == 2
+
+
+def test_run_limits_fail_only_the_offending_file(capsys, tmp_path):
+    (tmp_path / "a.yaml").write_text("apiVersion: v1\nkind: Pod\nmetadata:\n  uid: x\n")
+    deep = "[" * 200 + "]" * 200
+    (tmp_path / "b.yaml").write_text(f"apiVersion: v1\nkind: Pod\nspec: {deep}\n")
+    (tmp_path / "c.yaml").write_text("apiVersion: v1\nkind: Pod\n")
+    code, files, docs = run(str(tmp_path), check=True, max_depth=50)
+    err = capsys.readouterr().err
+    assert code == 2 and (files, docs) == (1, 1)  # a.yaml was still checked.
+    assert "b.yaml: document 0: nesting deeper than --max-depth (50)" in err
+
+    # Past the total input limit the remaining files are not read at all.
+    code, files, docs = run(str(tmp_path), check=True, max_input_bytes=40)
+    err = capsys.readouterr().err
+    assert code == 2 and (files, docs) == (0, 0)
+    assert err.count("error:") == 1 and "a.yaml: input exceeds" in err
+
+    assert run(str(tmp_path), max_depth=0)[0] == 2
+    assert "--max-depth must be at least 1" in capsys.readouterr().err
+
+
+def test_run_filters_select_items_of_list_documents(capsys, tmp_path):
+    f = tmp_path / "get.yaml"
+    f.write_text(
+        "apiVersion: v1\nkind: List\nitems:\n"
+        "  - apiVersion: apps/v1\n    kind: Deployment\n"
+        "    metadata:\n      name: web\n      namespace: prod\n"
+        "  - apiVersion: v1\n    kind: Service\n"
+        "    metadata:\n      name: web\n      namespace: prod\n"
+        "metadata:\n  resourceVersion: ''\n"
+    )
+    out_dir = tmp_path / "out"
+    assert run(str(f), split_output=str(out_dir), kinds=["Deployment"])[0] == 0
+    assert (out_dir / "prod" / "Deployment" / "web.yaml").exists()
+    assert not (out_dir / "prod" / "Service").exists()
+
+    capsys.readouterr()
+    assert run(str(f), fingerprint=True, kinds=["Deployment"])[0] == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1 and "\tDeployment\t" in lines[0]
+
+    code, _, _ = run(
+        str(f), split_output=str(out_dir), kinds=["Deployment"], prune=True
+    )
+    assert code == 2
+    assert "--prune" in capsys.readouterr().err
+
+
+def test_run_filters_select_list_items_in_output_check_and_stdin(
+    capsys, tmp_path, monkeypatch
+):
+    from io import StringIO
+
+    text = (
+        "apiVersion: v1\nkind: List\nitems:\n"
+        "  - apiVersion: apps/v1\n    kind: Deployment\n"
+        "    metadata:\n      name: web\n    status:\n      replicas: 1\n"
+        "  - apiVersion: v1\n    kind: Service\n    metadata:\n      name: web\n"
+    )
+    f = tmp_path / "get.yaml"
+    f.write_text(text)
+    expected = "apiVersion: apps/v1\nkind: Deployment\nmetadata:\n  name: web\n"
+
+    assert run(str(f), kinds=["Deployment"])[0] == 0
+    assert capsys.readouterr().out == expected
+
+    assert run(str(f), kinds=["Deployment"], check=True)[:3] == (1, 1, 1)
+    capsys.readouterr()
+    assert run(str(f), kinds=["Deployment"], diff=True)[0] == 0
+    out = capsys.readouterr().out
+    assert "-status:" in out and "Service" not in out
+
+    index_file = str(tmp_path / "index.json")
+    assert run(str(f), kinds=["Deployment"], index_file=index_file)[0] == 0
+    assert capsys.readouterr().out == expected
+
+    for jobs in (None, 2):
+        monkeypatch.setattr("sys.stdin", StringIO(text))
+        assert run("-", kinds=["Deployment"], jobs=jobs)[0] == 0
+        assert capsys.readouterr().out == expected
+
+
+def test_run_journal_check_or_diff_with_write_does_not_write(capsys, tmp_path):
+    f = tmp_path / "a.yaml"
+    original = "apiVersion: v1\nkind: Pod\nmetadata:\n  uid: x\n  name: a\n"
+    f.write_text(original)
+    journal = str(tmp_path / "j.jsonl")
+    assert run(str(f), check=True, write=True, journal_file=journal)[0] == 1
+    assert f.read_text() == original
+
+    capsys.readouterr()
+    assert run(str(f), diff=True, write=True, journal_file=journal)[0] == 0
+    assert "-  uid: x" in capsys.readouterr().out
+    assert f.read_text() == original
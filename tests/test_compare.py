@@ -0,0 +1,72 @@
+"""Tests for manifest_clean.compare."""
+
+from pkg.manifest_clean.compare import compare_trees, format_identity
+from pkg.manifest_clean.selector import ResourceFilter
+
+NORMALIZE_KW = {"drop_status": True, "drop_uid": True}
+
+SVC = "apiVersion: v1\nkind: Service\nmetadata:\n  name: web\n  namespace: prod\n"
+CM = "apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: {name}\n  namespace: prod\n"
+
+
+def _compare(a, b, **kw):
+    a_paths = sorted(p for p in a.iterdir())
+    b_paths = sorted(p for p in b.iterdir())
+    return compare_trees(a_paths, b_paths, normalize_kw=NORMALIZE_KW, **kw)
+
+
+def test_format_identity():
+    assert format_identity(("v1", "Service", "prod", "web")) == "v1 Service prod/web"
+    assert format_identity(("v1", "Namespace", "", "prod")) == "v1 Namespace prod"
+
+
+def test_compare_matches_by_identity_across_files(tmp_path):
+    a, b = tmp_path / "a", tmp_path / "b"
+    a.mkdir()
+    b.mkdir()
+    (a / "all.yaml").write_text(
+        SVC
+        + "spec:\n  port: 80\n---\n"
+        + CM.format(name="same")
+        + "---\n"
+        + CM.format(name="gone")
+    )
+    # Reordered, split across files, with server-side fields that get dropped.
+    (b / "cm.yaml").write_text(CM.format(name="same") + "  uid: abc\nstatus: {}\n")
+    (b / "svc.yaml").write_text(
+        SVC + "spec:\n  port: 8080\n---\n" + CM.format(name="new")
+    )
+    result = _compare(a, b)
+    assert result.identical == 1
+    assert [i for i, _, _ in result.different] == [("v1", "Service", "prod", "web")]
+    _, a_record, b_record = result.different[0]
+    assert (a_record.doc["spec"], b_record.doc["spec"]) == (
+        {"port": 80},
+        {"port": 8080},
+    )
+    assert [i[3] for i, _ in result.only_a] == ["gone"]
+    assert [i[3] for i, _ in result.only_b] == ["new"]
+    assert result.errors == [] and result.duplicates == []
+
+
+def test_compare_parallel_matches_serial(tmp_path):
+    a, b = tmp_path / "a", tmp_path / "b"
+    a.mkdir()
+    b.mkdir()
+    for i in range(4):
+        (a / f"{i}.yaml").write_text(CM.format(name=f"cm{i}") + f"data:\n  k: '{i}'\n")
+        (b / f"{i}.yaml").write_text(CM.format(name=f"cm{i}") + "data:\n  k: '0'\n")
+    assert _compare(a, b, jobs=2) == _compare(a, b)
+
+
+def test_compare_reports_duplicates_errors_and_filters(tmp_path):
+    a, b = tmp_path / "a", tmp_path / "b"
+    a.mkdir()
+    b.mkdir()
+    (a / "1.yaml").write_text(SVC)
+    (a / "2.yaml").write_text(SVC + "---\n" + CM.format(name="x"))
+    (b / "bad.yaml").write_text("kind: [\n")
+    result = _compare(a, b, doc_filter=ResourceFilter(kinds=["Service"]))
+    assert len(result.duplicates) == 1 and "2.yaml" in result.duplicates[0]
+    assert len(result.errors) == 1 and "bad.yaml" in result.errors[0]
+    assert [i[1] for i, _ in result.only_a] == ["Service"]
@@ -0,0 +1,64 @@
+"""Tests for manifest_clean.compress."""
+
+import gzip
+import io
+
+import pytest
+
+from pkg.manifest_clean.compress import (
+    compression_from_magic,
+    compression_from_name,
+    detect_compression,
+    open_output,
+    open_text,
+    resolve_compression,
+    strip_compression_suffix,
+    write_text,
+)
+
+TEXT = "apiVersion: v1\nkind: Pod\n"
+
+
+def test_names_and_magic():
+    assert strip_compression_suffix("app.YAML.gz") == "app.YAML"
+    assert strip_compression_suffix("app.yaml") == "app.yaml"
+    assert compression_from_name("a.json.zst") == "zstd"
+    assert compression_from_name("a.json") is None
+    assert compression_from_magic(gzip.compress(b"x")) == "gzip"
+    assert compression_from_magic(b"\x28\xb5\x2f\xfd....") == "zstd"
+    assert compression_from_magic(b"kind") is None
+    assert resolve_compression("auto") in ("gzip", "zstd")
+    assert resolve_compression(None) is None
+
+
+def test_open_text_detects_gzip_by_magic(tmp_path):
+    f = tmp_path / "snapshot.yaml"
+    f.write_bytes(gzip.compress(TEXT.encode()))
+    assert detect_compression(f) == "gzip"
+    with open_text(f) as stream:
+        assert stream.read() == TEXT
+
+
+def test_write_text_gzip_roundtrip_is_deterministic(tmp_path):
+    a, b = tmp_path / "a.yaml.gz", tmp_path / "b.yaml.gz"
+    write_text(a, TEXT, "gzip")
+    write_text(b, TEXT, "gzip")
+    assert a.read_bytes() == b.read_bytes()
+    assert gzip.decompress(a.read_bytes()).decode() == TEXT
+
+
+def test_open_output_gzip():
+    raw = io.BytesIO()
+    out = open_output(raw, "gzip")
+    out.write(TEXT)
+    out.close()
+    assert gzip.decompress(raw.getvalue()).decode() == TEXT
+
+
+def test_zstd_roundtrip(tmp_path):
+    pytest.importorskip("zstandard")
+    f = tmp_path / "a.yaml.zst"
+    write_text(f, TEXT, "zstd")
+    assert detect_compression(f) == "zstd"
+    with open_text(f) as stream:
+        assert stream.read() == TEXT
@@ -0,0 +1,141 @@
+"""Tests for manifest_clean.defaults."""
+
+import json
+
+from pkg.manifest_clean.defaults import (
+    DefaultsIndex,
+    compile_openapi,
+    load_defaults_index,
+    strip_defaults,
+)
+from pkg.manifest_clean.normalize import normalize_document
+
+OPENAPI_V2 = {
+    "swagger": "2.0",
+    "definitions": {
+        "io.example.v1.Widget": {
+            "x-kubernetes-group-version-kind": [
+                {"group": "example.io", "version": "v1", "kind": "Widget"}
+            ],
+            "properties": {
+                "spec": {"$ref": "#/definitions/io.example.v1.WidgetSpec"},
+            },
+        },
+        "io.example.v1.WidgetSpec": {
+            "properties": {
+                "size": {"type": "integer", "default": 3},
+                "parts": {
+                    "type": "array",
+                    "items": {"properties": {"color": {"default": "red"}}},
+                },
+                "child": {"$ref": "#/definitions/io.example.v1.WidgetSpec"},
+            }
+        },
+    },
+}
+
+
+def test_strip_builtin_defaults():
+    doc = {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "spec": {
+            "replicas": 3,
+            "strategy": {
+                "type": "RollingUpdate",
+                "rollingUpdate": {"maxSurge": "25%", "maxUnavailable": "25%"},
+            },
+            "template": {
+                "spec": {
+                    "restartPolicy": "Always",
+                    "enableServiceLinks": 1,
+                    "containers": [
+                        {"name": "a", "ports": [{"port": 1, "protocol": "TCP"}]},
+                        {"name": "b", "ports": [{"port": 2, "protocol": "UDP"}]},
+                    ],
+                }
+            },
+        },
+    }
+    out = normalize_document(doc, defaults_index=DefaultsIndex.builtin())
+    assert out == {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "spec": {
+            "replicas": 3,
+            "template": {
+                "spec": {
+                    # 1 is not the boolean default true.
+                    "enableServiceLinks": 1,
+                    "containers": [
+                        {"name": "a", "ports": [{"port": 1}]},
+                        {"name": "b", "ports": [{"port": 2, "protocol": "UDP"}]},
+                    ],
+                }
+            },
+        },
+    }
+
+
+def test_strip_defaults_ignores_unknown_kinds():
+    doc = {
+        "apiVersion": "example.io/v1",
+        "kind": "Widget",
+        "spec": {"type": "ClusterIP"},
+    }
+    strip_defaults(doc, DefaultsIndex.builtin())
+    assert doc["spec"] == {"type": "ClusterIP"}
+
+
+def test_compile_openapi_v2_with_recursion():
+    roots = compile_openapi(OPENAPI_V2)
+    node = roots["example.io/v1/Widget"]
+    assert node["spec"]["size"] == {"=": 3}
+    assert node["spec"]["parts"] == {"[]": {"color": {"=": "red"}}}
+    doc = {
+        "apiVersion": "example.io/v1",
+        "kind": "Widget",
+        "spec": {"size": 3, "parts": [{"color": "red"}, {"color": "blue"}]},
+    }
+    strip_defaults(doc, DefaultsIndex(roots))
+    assert doc["spec"] == {"parts": [{}, {"color": "blue"}]}
+
+
+def test_compile_crd():
+    crd = {
+        "kind": "CustomResourceDefinition",
+        "spec": {
+            "group": "example.io",
+            "names": {"kind": "Gadget"},
+            "versions": [
+                {
+                    "name": "v1",
+                    "schema": {
+                        "openAPIV3Schema": {
+                            "properties": {
+                                "spec": {"properties": {"mode": {"default": "auto"}}}
+                            }
+                        }
+                    },
+                }
+            ],
+        },
+    }
+    assert compile_openapi(crd) == {
+        "example.io/v1/Gadget": {"spec": {"mode": {"=": "auto"}}}
+    }
+
+
+def test_load_defaults_index_caches_compiled_index(tmp_path):
+    openapi = tmp_path / "openapi.json"
+    openapi.write_text(json.dumps(OPENAPI_V2))
+    cache_dir = tmp_path / "cache"
+    index = load_defaults_index(openapi, cache_dir)
+    assert "example.io/v1/Widget" in index.roots and "v1/Pod" in index.roots
+    (cached,) = cache_dir.iterdir()
+    assert json.loads(cached.read_text()) == compile_openapi(OPENAPI_V2)
+    # A second load reads the cache, not the OpenAPI document.
+    cached.write_text(json.dumps({"example.io/v1/Widget": {"x": {"=": 1}}}))
+    assert load_defaults_index(openapi, cache_dir).roots["example.io/v1/Widget"] == {
+        "x": {"=": 1}
+    }
@@ -0,0 +1,55 @@
+"""Tests for manifest_clean.fingerprint."""
+
+import json
+from io import StringIO
+
+from pkg.manifest_clean.fingerprint import (
+    canonical_digest,
+    canonical_encoding,
+    format_fingerprint,
+)
+from pkg.manifest_clean.io import new_yaml_loader
+
+
+def _load(text):
+    return new_yaml_loader().load(StringIO(text))
+
+
+def test_digest_ignores_key_order_quoting_and_input_format():
+    a = _load("kind: ConfigMap\ndata:\n  b: '1'\n  a: \"x\"\n")
+    b = json.loads('{"data": {"a": "x", "b": "1"}, "kind": "ConfigMap"}')
+    assert canonical_digest(a) == canonical_digest(b)
+    assert canonical_digest(a).startswith("sha256:")
+
+
+def test_digest_distinguishes_types():
+    assert canonical_digest(_load("v: 1\n")) != canonical_digest(_load("v: '1'\n"))
+    assert canonical_digest(_load("v: true\n")) != canonical_digest(_load("v: 1\n"))
+    assert canonical_digest(_load("v: 2020-01-01\n")) != canonical_digest(
+        _load("v: '2020-01-01'\n")
+    )
+
+
+def test_canonical_encoding_mixed_keys():
+    assert canonical_encoding({1: "a", "b": 2}) == b'{"1":"a","b":2}'
+
+
+def test_format_fingerprint_tsv_and_ndjson():
+    doc = {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "metadata": {"name": "p", "namespace": "x"},
+    }
+    digest = canonical_digest(doc)
+    assert (
+        format_fingerprint(doc, "a.yaml", "tsv") == f"v1\tPod\tx\tp\t{digest}\ta.yaml\n"
+    )
+    record = json.loads(format_fingerprint(doc, "a.yaml", "ndjson"))
+    assert record == {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "namespace": "x",
+        "name": "p",
+        "digest": digest,
+        "source": "a.yaml",
+    }
@@ -0,0 +1,89 @@
+"""Tests for manifest_clean.index."""
+
+import os
+
+from pkg.manifest_clean.index import ManifestIndex, scan_file
+from pkg.manifest_clean.selector import ResourceFilter
+
+MULTI = (
+    "apiVersion: apps/v1\r\nkind: Deployment\r\nmetadata:\r\n  name: payments\r\n"
+    "  namespace: prod\r\n---\r\n"
+    "apiVersion: v1\r\nkind: Service\r\nmetadata:\r\n  name: payments\r\n"
+    "  namespace: prod\r\n"
+)
+
+
+def test_scan_file_records_identity_and_spans(tmp_path):
+    f = tmp_path / "app.yaml"
+    f.write_bytes(MULTI.encode())
+    entries = scan_file(f)
+    assert [e[4:] for e in entries] == [
+        ["apps/v1", "Deployment", "prod", "payments"],
+        ["v1", "Service", "prod", "payments"],
+    ]
+    raw = f.read_bytes()
+    assert raw[entries[1][1] :].startswith(b"apiVersion: v1")
+    assert entries[1][1] + entries[1][2] == len(raw)
+
+
+def test_index_refresh_is_incremental_and_persistent(tmp_path):
+    f = tmp_path / "app.yaml"
+    f.write_bytes(MULTI.encode())
+    index_path = tmp_path / "index.json"
+    index = ManifestIndex.load(index_path)
+    assert index.refresh([f]) == 1
+    index.save()
+
+    index = ManifestIndex.load(index_path)
+    assert index.resource_count() == 2
+    assert index.refresh([f]) == 0
+
+    f.write_text("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: other-name\n")
+    os.utime(f, ns=(1, 1))
+    assert index.refresh([f]) == 1
+    assert index.resource_count() == 1
+
+
+def test_index_load_documents_parses_only_selected(tmp_path):
+    f = tmp_path / "app.yaml"
+    f.write_bytes(MULTI.encode())
+    index = ManifestIndex(tmp_path / "index.json")
+    index.refresh([f])
+    entries = index.lookup(f, ResourceFilter(kinds=["Service"]))
+    docs = list(index.load_documents(f, entries))
+    assert [(d.index, d.doc["kind"]) for d in docs] == [(1, "Service")]
+
+
+def test_index_load_ignores_corrupt_file(tmp_path):
+    index_path = tmp_path / "index.json"
+    index_path.write_text("{not json")
+    assert ManifestIndex.load(index_path).files == {}
+
+
+def test_index_refresh_skips_files_that_fail_to_scan(tmp_path):
+    good = tmp_path / "good.yaml"
+    good.write_bytes(MULTI.encode())
+    bad = tmp_path / "bad.yaml"
+    bad.write_text("kind: [\n")
+    index = ManifestIndex(tmp_path / "index.json")
+    assert index.refresh([bad, good, tmp_path / "missing.yaml"]) == 1
+    assert len(index.errors) == 2 and "bad.yaml" in index.errors[0]
+    assert index.lookup(bad, ResourceFilter(kinds=["Service"])) is None
+    assert len(index.lookup(good, ResourceFilter(kinds=["Service"]))) == 1
+
+
+def test_index_honours_input_format(tmp_path):
+    f = tmp_path / "export.json"
+    f.write_text(
+        '{"apiVersion": "v1", "kind": "Pod", "metadata": {"name": "a"}}\n'
+        '{"apiVersion": "v1", "kind": "Service", "metadata": {"name": "b"}}\n'
+    )
+    assert [e[5] for e in scan_file(f, "ndjson")] == ["Pod", "Service"]
+    index = ManifestIndex(tmp_path / "index.json")
+    index.refresh([f], "ndjson")
+    entries = index.lookup(f, ResourceFilter(kinds=["Service"]))
+    docs = list(index.load_documents(f, entries))
+    assert [d.doc["metadata"]["name"] for d in docs] == ["b"]
+    # Indexing the same file as YAML rescans it (and fails: it is not one document).
+    assert index.refresh([f], "yaml") == 0
+    assert index.errors and index.lookup(f, ResourceFilter(kinds=["Pod"])) is None
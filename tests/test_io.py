@@ -1,13 +1,22 @@
 """Tests for manifest_clean.io."""
 
+import gzip
+import io
+import tarfile
+import zipfile
 from io import StringIO
 
 import pytest  # used for pytest.raises
 
 from pkg.manifest_clean.io import (
+    is_archive,
     iter_paths,
+    load_documents_from_archive,
     load_documents_from_path,
     load_documents_from_stdin,
+    peek_header,
+    read_path_list,
+    split_documents,
 )
 
 
@@ -81,6 +90,74 @@ def test_load_documents_from_path_non_mapping_doc_raises(tmp_path):
         list(load_documents_from_path(f))
 
 
+def test_iter_paths_includes_ndjson(tmp_path):
+    (tmp_path / "a.ndjson").write_text("{}\n")
+    (tmp_path / "b.jsonl").write_text("{}\n")
+    names = {p.name for p in iter_paths(str(tmp_path))}
+    assert names == {"a.ndjson", "b.jsonl"}
+
+
+def test_load_documents_from_path_ndjson(tmp_path):
+    f = tmp_path / "objs.jsonl"
+    f.write_text('{"kind": "Pod"}\n\n{"kind": "Service"}\n')
+    docs = list(load_documents_from_path(f))
+    assert [(idx, doc["kind"]) for idx, doc in docs] == [(0, "Pod"), (2, "Service")]
+
+
+def test_load_documents_from_path_ndjson_bad_line(tmp_path):
+    f = tmp_path / "objs.ndjson"
+    f.write_text('{"kind": "Pod"}\n[1, 2]\n')
+    with pytest.raises(ValueError, match="line 2"):
+        list(load_documents_from_path(f))
+
+
+def test_load_documents_from_stdin_ndjson(monkeypatch):
+    monkeypatch.setattr("sys.stdin", StringIO('{"a": 1}\n{"b": 2}\n'))
+    docs = list(load_documents_from_stdin("ndjson"))
+    assert [doc for _, doc in docs] == [{"a": 1}, {"b": 2}]
+
+
+def test_split_documents_offsets_and_indices():
+    text = "# head\na: 1\n---\n---\nb: é\n...\n"
+    chunks = list(split_documents(StringIO(text)))
+    assert [(idx, line, body) for idx, _, line, body in chunks] == [
+        (0, 0, "# head\na: 1\n"),
+        (1, 3, ""),
+        (2, 4, "b: é\n...\n"),
+    ]
+    raw = text.encode("utf-8")
+    for _, offset, _, body in chunks:
+        assert raw[offset : offset + len(body.encode("utf-8"))].decode() == body
+    # A document that starts on its "---" line starts there.
+    assert list(split_documents(StringIO("a: 1\n--- b: 2\n")))[1] == (
+        1,
+        5,
+        1,
+        "--- b: 2\n",
+    )
+
+
+def test_parse_errors_report_file_lines(tmp_path):
+    f = tmp_path / "multi.yaml"
+    f.write_text("a: 1\n---\nb: 2\nc: 3\n---\nd: 4\ne: [\nf: 5\n")
+    with pytest.raises(Exception) as exc:
+        list(load_documents_from_path(f))
+    message = str(exc.value)
+    assert message.startswith(f"{f}: document 2: ")
+    assert f'in "{f}", line 9' in message and "<unicode string>" not in message
+
+
+def test_load_documents_with_source(tmp_path):
+    f = tmp_path / "multi.yaml"
+    f.write_text("a: 1\n---\nb: 2  # note\n")
+    sources = list(load_documents_from_path(f, with_source=True))
+    assert [(s.index, s.text, s.offset) for s in sources] == [
+        (0, "a: 1\n", 0),
+        (1, "b: 2  # note\n", 9),
+    ]
+    assert sources[1].doc["b"] == 2
+
+
 def test_load_documents_from_stdin(monkeypatch):
     stdin = StringIO("apiVersion: v1\nkind: Pod\nmetadata:\n  name: x\n")
     monkeypatch.setattr("sys.stdin", stdin)
@@ -98,3 +175,132 @@ def test_load_documents_from_path_skips_non_yaml_ext(tmp_path):
     # Direct call to load_documents_from_path with .txt path yields nothing
     docs = list(load_documents_from_path(f))
     assert len(docs) == 0
+
+
+def _add_tar_member(tf, name, text):
+    data = text.encode("utf-8")
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    tf.addfile(info, io.BytesIO(data))
+
+
+def test_is_archive():
+    from pathlib import Path
+
+    assert is_archive(Path("bundle.tgz"))
+    assert is_archive(Path("bundle.tar.gz"))
+    assert is_archive(Path("bundle.tar"))
+    assert is_archive(Path("bundle.ZIP"))
+    assert not is_archive(Path("app.yaml"))
+
+
+def test_load_documents_from_tar_gz(tmp_path):
+    archive = tmp_path / "bundle.tgz"
+    with tarfile.open(archive, "w:gz") as tf:
+        _add_tar_member(tf, "a/pod.yaml", "apiVersion: v1\nkind: Pod\n")
+        _add_tar_member(tf, "a/README.md", "not a manifest")
+        _add_tar_member(tf, "b/cm.yml", "kind: ConfigMap\n---\nkind: Secret\n")
+    members = [
+        (name, [doc["kind"] for _, doc in docs])
+        for name, docs in load_documents_from_archive(archive)
+    ]
+    assert members == [
+        (f"{archive}!a/pod.yaml", ["Pod"]),
+        (f"{archive}!b/cm.yml", ["ConfigMap", "Secret"]),
+    ]
+
+
+def test_load_documents_from_zip(tmp_path):
+    archive = tmp_path / "bundle.zip"
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("dir/", "")
+        zf.writestr("dir/svc.json", '{"kind": "Service"}')
+        zf.writestr("notes.txt", "skip me")
+    members = [
+        (name, [doc["kind"] for _, doc in docs])
+        for name, docs in load_documents_from_archive(archive)
+    ]
+    assert members == [(f"{archive}!dir/svc.json", ["Service"])]
+
+
+def test_read_path_list():
+    assert read_path_list(StringIO("a.yaml\n\nb dir/c.yml\n")) == [
+        "a.yaml",
+        "b dir/c.yml",
+    ]
+    assert read_path_list(StringIO("a.yaml\0b\nc.yaml\0"), null_separated=True) == [
+        "a.yaml",
+        "b\nc.yaml",
+    ]
+
+
+def test_peek_header_block_style():
+    header = peek_header(
+        "# comment\napiVersion: apps/v1\nkind: Deployment\nmetadata:\n"
+        "  name: web\n  namespace: 'prod'\n  labels:\n    app: web\n"
+        '    tier: "api"\nspec:\n  replicas: 2\n'
+    )
+    assert header is not None
+    assert (header.api_version, header.kind, header.namespace, header.name) == (
+        "apps/v1",
+        "Deployment",
+        "prod",
+        "web",
+    )
+    assert header.labels == {"app": "web", "tier": "api"}
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "{apiVersion: v1, kind: Pod}",
+        "apiVersion: v1\nkind: Pod\nmetadata: {name: a}\n",
+        "apiVersion: v1\nkind: &k Pod\n",
+        "apiVersion: v1\nkind: Pod\nmetadata:\n  labels:\n    version: 1.0\n",
+    ],
+)
+def test_peek_header_falls_back(text):
+    assert peek_header(text) is None
+
+
+def test_load_documents_accept_skips_before_parse(tmp_path):
+    f = tmp_path / "a.yaml"
+    # The second document is invalid YAML; rejecting it unparsed avoids the error.
+    f.write_text("kind: Pod\n---\nkind: Bad\nx: [\n---\nkind: Service\n")
+    docs = list(load_documents_from_path(f, accept=lambda text: "Bad" not in text))
+    assert [(idx, doc["kind"]) for idx, doc in docs] == [(0, "Pod"), (2, "Service")]
+
+
+def test_load_documents_skip_paths_marks_pruned(tmp_path):
+    f = tmp_path / "a.yaml"
+    f.write_text(
+        "apiVersion: v1\nkind: Pod\nmetadata:\n  name: a\nstatus:\n  phase: x\n"
+        "---\napiVersion: v1\nkind: Pod\nmetadata:\n  name: b\n"
+    )
+    docs = list(
+        load_documents_from_path(f, with_source=True, skip_paths=(("status",),))
+    )
+    assert [(s.doc.get("status"), s.pruned) for s in docs] == [
+        (None, True),
+        (None, False),
+    ]
+    # The source text is still the full document.
+    assert "phase: x" in docs[0].text
+
+
+def test_compressed_files_in_directory_and_archive(tmp_path):
+    (tmp_path / "pod.yaml.gz").write_bytes(gzip.compress(b"kind: Pod\n"))
+    (tmp_path / "svc.ndjson.gz").write_bytes(gzip.compress(b'{"kind": "Service"}\n'))
+    paths = list(iter_paths(str(tmp_path)))
+    assert [p.name for p in paths] == ["pod.yaml.gz", "svc.ndjson.gz"]
+    kinds = [doc["kind"] for p in paths for _, doc in load_documents_from_path(p)]
+    assert kinds == ["Pod", "Service"]
+
+    archive = tmp_path / "snap.tar"
+    with tarfile.open(archive, "w") as tf:
+        tf.add(tmp_path / "pod.yaml.gz", arcname="pod.yaml.gz")
+    members = [
+        (name, [doc["kind"] for _, doc in docs])
+        for name, docs in load_documents_from_archive(archive)
+    ]
+    assert members == [(f"{archive}!pod.yaml.gz", ["Pod"])]
@@ -0,0 +1,45 @@
+"""Tests for manifest_clean.journal."""
+
+from pkg.manifest_clean.journal import Journal, file_sha256, options_fingerprint
+
+
+def test_journal_resume_keeps_entries_for_same_options(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    options = options_fingerprint({"fmt": "yaml"})
+    journal = Journal.open(path, options, resume=False)
+    journal.record("a.yaml", "h1", 1, 2)
+    journal.close()
+
+    journal = Journal.open(path, options, resume=True)
+    assert journal.completed("a.yaml", "h1") == (("h1", 1, 2))
+    assert journal.completed("a.yaml", "other") is None
+    journal.record("b.yaml", "h2", 0, 0)
+    journal.close()
+    assert len(path.read_text().splitlines()) == 3
+
+    other = options_fingerprint({"fmt": "json"})
+    assert Journal.open(path, other, resume=True).entries == {}
+
+
+def test_journal_ignores_truncated_line(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    options = options_fingerprint({})
+    journal = Journal.open(path, options, resume=False)
+    journal.record("a.yaml", "h1", 0, 0)
+    journal.close()
+    with open(path, "a") as f:
+        f.write('{"path": "b.yaml", "sha2')
+    assert list(Journal.open(path, options, resume=True).entries) == ["a.yaml"]
+
+
+def test_journal_without_resume_starts_over(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    options = options_fingerprint({})
+    Journal.open(path, options, resume=False).record("a.yaml", "h1", 0, 0)
+    assert Journal.open(path, options, resume=False).entries == {}
+
+
+def test_file_sha256(tmp_path):
+    f = tmp_path / "a"
+    f.write_bytes(b"abc")
+    assert file_sha256(f).startswith("ba7816bf")
@@ -0,0 +1,79 @@
+"""Tests for manifest_clean.limits."""
+
+import io
+
+import pytest
+
+from pkg.manifest_clean.io import new_yaml_loader, parse_document, split_documents
+from pkg.manifest_clean.limits import LimitError, Limits, parse_size
+
+
+def _billion_laughs(levels: int) -> str:
+    lines = ["apiVersion: v1", "kind: X", "a0: &a0 [lol, lol, lol, lol]"]
+    for i in range(1, levels + 1):
+        lines.append(f"a{i}: &a{i} [" + ", ".join([f"*a{i - 1}"] * 4) + "]")
+    return "\n".join(lines) + "\n"
+
+
+def test_parse_size():
+    assert parse_size("512") == 512
+    assert parse_size("4K") == 4096
+    assert parse_size("2MiB") == 2 * 1024 * 1024
+    assert parse_size("1g") == 1024**3
+    with pytest.raises(ValueError):
+        parse_size("1X")
+
+
+def test_lines_fails_on_long_line_without_reading_it_whole():
+    limits = Limits(max_document_bytes=100)
+    stream = io.StringIO("a: 1\nb: " + "x" * 1_000_000)
+    lines = limits.lines(stream, "f.yaml")
+    assert next(lines) == "a: 1\n"
+    with pytest.raises(LimitError, match="f.yaml: line 2: longer than"):
+        next(lines)
+    assert limits.input_bytes < 1_000_000
+
+
+def test_lines_counts_total_input_across_streams():
+    limits = Limits(max_input_bytes=10)
+    assert list(limits.lines(io.StringIO("a: 1\nb: 2\n"), "a.yaml")) == [
+        "a: 1\n",
+        "b: 2\n",
+    ]
+    assert not limits.exhausted
+    with pytest.raises(LimitError, match="b.yaml: input exceeds --max-input-bytes"):
+        list(limits.lines(io.StringIO("c: 3\n"), "b.yaml"))
+    assert limits.exhausted
+
+
+def test_split_documents_fails_on_large_document():
+    limits = Limits(max_document_bytes=20)
+    stream = io.StringIO("a: 1\n---\n" + "b: 2\n" * 10)
+    docs = split_documents(stream, limits, "f.yaml")
+    assert next(docs)[3] == "a: 1\n"
+    with pytest.raises(LimitError, match="f.yaml: document 1: larger than"):
+        next(docs)
+
+
+def test_loader_fails_on_deep_nesting():
+    yaml = new_yaml_loader(Limits(max_depth=5))
+    assert parse_document(yaml, "a: {b: {c: [1]}}\n", "f.yaml", 0)
+    with pytest.raises(LimitError, match="f.yaml: document 0: nesting deeper"):
+        parse_document(yaml, "a: " + "[" * 10 + "]" * 10 + "\n", "f.yaml", 0)
+
+
+def test_loader_counts_alias_expansion():
+    # 4 aliases of a0 (5 nodes), 4 of a1 (21) and 4 of a2 (85): 444 nodes.
+    text = _billion_laughs(3)
+    assert parse_document(new_yaml_loader(Limits(max_alias_nodes=444)), text, "f", 0)
+    yaml = new_yaml_loader(Limits(max_alias_nodes=443))
+    with pytest.raises(LimitError, match="aliases expand to more than"):
+        parse_document(yaml, text, "f", 0)
+    # The count is per document: the loader is reusable afterwards.
+    assert parse_document(yaml, "a: &x [1]\nb: *x\n", "f", 1)
+
+
+def test_loader_fails_fast_on_billion_laughs():
+    yaml = new_yaml_loader(Limits(max_alias_nodes=10_000))
+    with pytest.raises(LimitError):
+        parse_document(yaml, _billion_laughs(12), "f", 0)
@@ -0,0 +1,33 @@
+"""Tests for manifest_clean.marker."""
+
+from pkg.manifest_clean.marker import (
+    add_marker,
+    has_valid_marker,
+    strip_marker,
+    verify_marker,
+)
+
+
+def test_marker_roundtrip():
+    text = add_marker("kind: Pod\n", "sha256:opts")
+    assert text.startswith("kind: Pod\n# manifest-clean: sha256=")
+    assert verify_marker(text.encode(), "sha256:opts")
+    assert not verify_marker(text.encode(), "sha256:other")
+    assert strip_marker(text) == "kind: Pod\n"
+    # Re-marking replaces the old marker instead of stacking another.
+    assert add_marker(text, "sha256:opts") == text
+
+
+def test_marker_detects_edits(tmp_path):
+    f = tmp_path / "a.yaml"
+    f.write_text(add_marker("kind: Pod\n", "o"))
+    assert has_valid_marker(f, "o")
+    f.write_text(f.read_text().replace("Pod", "Service"))
+    assert not has_valid_marker(f, "o")
+    g = tmp_path / "a.json"
+    g.write_text(add_marker("{}\n", "o"))
+    assert not has_valid_marker(g, "o")
+
+
+def test_strip_marker_leaves_other_comments():
+    assert strip_marker("kind: Pod\n# note\n") == "kind: Pod\n# note\n"
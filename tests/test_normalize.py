@@ -1,5 +1,6 @@
 """Tests for manifest_clean.normalize."""
 
+from pkg.manifest_clean.defaults import DefaultsIndex
 from pkg.manifest_clean.normalize import (
     LAST_APPLIED_KEY,
     drop_empty_in_place,
@@ -7,6 +8,7 @@ from pkg.manifest_clean.normalize import (
     is_kubernetes_like,
     normalize_document,
     prune_noisy_fields,
+    resource_identity,
     sort_dict_keys,
     sort_labels_and_annotations,
 )
@@ -127,3 +129,42 @@ def test_sort_labels_and_annotations_skips_non_k8s():
     assert list(doc["metadata"]["labels"].keys()) == [
         "z"
     ]  # unchanged order for non-k8s
+
+
+def test_resource_identity():
+    doc = {
+        "apiVersion": "apps/v1",
+        "kind": "Deployment",
+        "metadata": {"name": "web", "namespace": "prod"},
+    }
+    assert resource_identity(doc) == ("apps/v1", "Deployment", "prod", "web")
+    assert resource_identity({"kind": "Namespace"}) == ("", "Namespace", "", "")
+    assert resource_identity("not a dict") == ("", "", "", "")
+
+
+def test_drop_empty_in_place_nested_parent_becomes_empty():
+    obj = {"spec": {"strategy": {"rollingUpdate": {}}, "replicas": 1}}
+    drop_empty_in_place(obj, cascade=True)
+    assert obj == {"spec": {"replicas": 1}}
+
+
+def test_normalize_document_drop_empty_cascades_only_with_defaults():
+    doc = {"apiVersion": "v1", "kind": "X", "spec": {"a": {"b": {}}, "c": [{}]}}
+    # Without --drop-defaults, a parent emptied below the top level is kept.
+    assert normalize_document(doc)["spec"] == {"a": {}, "c": [{}]}
+    out = normalize_document(doc, defaults_index=DefaultsIndex.builtin())
+    assert out["spec"] == {"c": [{}]}
+    doc["spec"].pop("c")
+    assert "spec" not in normalize_document(doc, defaults_index=DefaultsIndex.builtin())
+
+
+def test_normalize_document_nesting_beyond_recursion_limit():
+    deep: dict = {"leaf": 1, "empty": {}}
+    for _ in range(5000):
+        deep = {"b": deep, "a": []}
+    norm = normalize_document({"apiVersion": "v1", "kind": "X", "spec": deep})
+    node = norm["spec"]
+    for _ in range(5000):
+        assert list(node) == ["b"]
+        node = node["b"]
+    assert node == {"leaf": 1}
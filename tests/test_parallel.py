@@ -0,0 +1,128 @@
+"""Tests for manifest_clean.parallel."""
+
+import functools
+import json
+
+import pytest
+
+from pkg.manifest_clean.cli import serialize
+from pkg.manifest_clean.io import new_yaml_loader
+from pkg.manifest_clean.normalize import normalize_document
+from pkg.manifest_clean.parallel import (
+    iter_batches,
+    parallel_normalized_stream,
+    split_list_items,
+)
+
+
+def _docs(n):
+    return "".join(
+        f"---\napiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: c{i}\n  uid: u{i}\n"
+        for i in range(n)
+    )
+
+
+def test_iter_batches_grow_and_keep_every_document():
+    text = _docs(50)
+    batches = list(
+        iter_batches(text.splitlines(keepends=True), first_bytes=100, max_bytes=400)
+    )
+    assert len(batches[0]) < len(batches[-2])
+    assert [idx for batch in batches for idx, _, _, _ in batch] == list(range(50))
+
+
+def test_iter_batches_split_spreads_parts_over_batches():
+    def split(raw):
+        idx, offset, line, text = raw
+        return [(idx, offset, line, part) for part in text.splitlines(keepends=True)]
+
+    batches = list(
+        iter_batches(_docs(1).splitlines(keepends=True), first_bytes=20, split=split)
+    )
+    assert len(batches) > 1
+    assert {idx for batch in batches for idx, _, _, _ in batch} == {0}
+
+
+def test_iter_batches_ndjson_one_document_per_line():
+    lines = ['{"a": 1}\n', "\n", '{"b": 2}\n']
+    [batch] = iter_batches(lines, ndjson=True)
+    assert batch == [(0, 0, 0, lines[0]), (1, 9, 1, "\n"), (2, 10, 2, lines[2])]
+
+
+def test_parallel_stream_keeps_input_order():
+    render = functools.partial(json.dumps, sort_keys=True)
+    items = list(
+        parallel_normalized_stream(
+            _docs(300).splitlines(keepends=True),
+            jobs=2,
+            normalize_kw={"drop_uid": True},
+            render=render,
+        )
+    )
+    names = [json.loads(text)["metadata"] for _, text in items]
+    assert names == [{"name": f"c{i}"} for i in range(300)]
+    assert items[0][0] == ("v1", "ConfigMap", "", "c0")
+
+
+def _list(n):
+    return (
+        "apiVersion: v1\nitems:\n"
+        + "".join(
+            f"- apiVersion: v1\n  kind: ConfigMap\n  metadata:\n    name: c{i}\n"
+            f"    uid: u{i}\n  data:\n    script: |\n      echo {i}\n\n      exit\n"
+            "    empty: {}\n"
+            for i in range(n)
+        )
+        + 'kind: List\nmetadata:\n  resourceVersion: ""\n'
+    )
+
+
+def test_split_list_items():
+    head, tail, items = split_list_items(_list(3))
+    assert head == "apiVersion: v1\nitems:\n"
+    assert tail == 'kind: List\nmetadata:\n  resourceVersion: ""\n'
+    assert [pos for pos, _ in items] == [2, 13, 24]
+    assert "".join(item for _, item in items) == _list(3)[len(head) : -len(tail)]
+
+    indented = "kind: List\nitems:\n  - a: 1\n    b: 2\n  - c: 3\n"
+    assert split_list_items(indented)[2] == [
+        (2, "  - a: 1\n    b: 2\n"),
+        (4, "  - c: 3\n"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "items:\n- a: &x 1\n- b: *x\nkind: List\n",
+        "items:\n- a: 1\n# note\n- b: 2\nkind: List\n",
+        "items: [{a: 1}, {b: 2}]\nkind: List\n",
+        "items:\n- a: 1\nkind: List\n",
+    ],
+)
+def test_split_list_items_refuses_layouts_it_cannot_cut(text):
+    assert split_list_items(text) is None
+
+
+# JSON output cannot be joined from item outputs; the List is then normalized whole.
+@pytest.mark.parametrize(
+    ("fmt", "normalize_kw"),
+    [("yaml", {"drop_uid": True}), ("yaml", {"drop_empty": False}), ("json", {})],
+)
+def test_parallel_stream_splits_large_list_and_keeps_its_output(fmt, normalize_kw):
+    text = _list(150) + "---\napiVersion: v1\nkind: ConfigMap\n"
+    render = functools.partial(serialize, fmt=fmt, indent=2)
+    expected = [
+        render(normalize_document(new_yaml_loader().load(doc), **normalize_kw))
+        for doc in text.split("---\n")
+    ]
+    items = list(
+        parallel_normalized_stream(
+            text.splitlines(keepends=True),
+            jobs=2,
+            normalize_kw=normalize_kw,
+            render=render,
+        )
+    )
+    assert [out for _, out in items] == expected
+    assert items[0][0] == ("v1", "List", "", "")
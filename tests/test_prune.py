@@ -0,0 +1,60 @@
+"""Tests for manifest_clean.prune."""
+
+import pytest
+
+from pkg.manifest_clean.prune import prune_document_text, prune_paths
+
+PATHS = prune_paths(
+    {"drop_status": True, "drop_managed_fields": True, "drop_last_applied": True}
+)
+
+
+def test_prune_paths_follow_drop_flags():
+    assert prune_paths({"drop_status": True}) == (("status",),)
+    assert prune_paths({"drop_status": False, "drop_uid": True}) == ()
+
+
+def test_prune_cuts_dropped_subtrees():
+    text = (
+        "apiVersion: v1\nkind: Pod\nmetadata:\n"
+        "  annotations:\n"
+        "    kubectl.kubernetes.io/last-applied-configuration: |\n"
+        '      {"kind":"Pod"}\n'
+        "  managedFields:\n"
+        "  - manager: kubectl\n"
+        "    fieldsV1:\n"
+        "      f:metadata: {}\n"
+        "  name: a\n"
+        "spec:\n"
+        "  script: |\n"
+        "    status:\n"
+        "status:\n"
+        "  phase: Running\n"
+    )
+    assert prune_document_text(text, PATHS) == (
+        "apiVersion: v1\nkind: Pod\nmetadata:\n"
+        "  annotations: {}\n"
+        "  name: a\n"
+        "spec:\n"
+        "  script: |\n"
+        "    status:\n"
+    )
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        # Not a resource: normalize_document would keep status.
+        "kind: Pod\nstatus: {}\n",
+        # Nothing to cut.
+        "apiVersion: v1\nkind: Pod\nmetadata:\n  name: a\n",
+        # A quoted value may continue on less-indented lines.
+        'apiVersion: v1\nkind: Pod\nmetadata:\n  name: "a\nstatus: b"\n',
+        # An alias may point into the cut subtree.
+        "apiVersion: v1\nkind: Pod\nstatus: &s {a: 1}\nspec: *s\n",
+        # Root is not a block mapping.
+        "{apiVersion: v1, kind: Pod, status: {}}\n",
+    ],
+)
+def test_prune_falls_back_to_full_parse(text):
+    assert prune_document_text(text, PATHS) is None
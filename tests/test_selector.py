@@ -0,0 +1,90 @@
+"""Tests for manifest_clean.selector."""
+
+import pytest
+
+from pkg.manifest_clean.selector import (
+    ResourceFilter,
+    identity_matches,
+    labels_match,
+    parse_label_selector,
+    parse_select,
+)
+
+
+def test_parse_select():
+    assert parse_select("kind=Deployment, namespace=prod,name=payments") == {
+        "kind": "Deployment",
+        "namespace": "prod",
+        "name": "payments",
+    }
+    assert parse_select("apiVersion=apps/v1") == {"apiVersion": "apps/v1"}
+
+
+@pytest.mark.parametrize("spec", ["kind", "color=red", "=x"])
+def test_parse_select_rejects_bad_terms(spec):
+    with pytest.raises(ValueError, match="--select"):
+        parse_select(spec)
+
+
+def test_identity_matches():
+    identity = ("apps/v1", "Deployment", "prod", "payments")
+    assert identity_matches(identity, {"kind": "Deployment", "namespace": "prod"})
+    assert not identity_matches(identity, {"namespace": "dev"})
+    assert identity_matches(identity, {})
+
+
+def test_filter_cluster_scoped_empty_namespace():
+    doc = {"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": "prod"}}
+    f = ResourceFilter(select={"kind": "Namespace", "namespace": ""})
+    assert f.matches_document(doc)
+
+
+def test_parse_label_selector():
+    assert parse_label_selector(
+        "app=web, tier!=db,env in (prod, staging),!legacy,x"
+    ) == [
+        ("app", "in", frozenset({"web"})),
+        ("tier", "notin", frozenset({"db"})),
+        ("env", "in", frozenset({"prod", "staging"})),
+        ("legacy", "!exists", frozenset()),
+        ("x", "exists", frozenset()),
+    ]
+    with pytest.raises(ValueError):
+        parse_label_selector("a b c")
+
+
+def test_labels_match():
+    reqs = parse_label_selector("app=web,tier!=db,env notin (dev)")
+    assert labels_match({"app": "web"}, reqs)
+    assert labels_match({"app": "web", "tier": "api", "env": "prod"}, reqs)
+    assert not labels_match({"app": "web", "tier": "db"}, reqs)
+    assert not labels_match({"app": "web", "env": "dev"}, reqs)
+    assert not labels_match({}, reqs)
+
+
+def test_filter_kinds_and_namespaces():
+    f = ResourceFilter(kinds=["deployment,Service"], namespaces=["prod", "staging"])
+    assert f.matches(("apps/v1", "Deployment", "prod", "a"))
+    assert f.matches(("v1", "Service", "staging", "a"))
+    assert not f.matches(("v1", "ConfigMap", "prod", "a"))
+    assert not f.matches(("v1", "Service", "dev", "a"))
+
+
+def test_filter_accepts_text_uses_header():
+    f = ResourceFilter(kinds=["Service"], label_selector="app=web")
+    assert f.accepts_text(
+        "apiVersion: v1\nkind: Service\nmetadata:\n  name: a\n  labels:\n    app: web\n"
+    )
+    assert not f.accepts_text("apiVersion: v1\nkind: ConfigMap\nmetadata:\n  name: a\n")
+    assert not f.accepts_text(
+        "apiVersion: v1\nkind: Service\nmetadata:\n  name: a\n  labels:\n    app: db\n"
+    )
+    # Headers the peek cannot read are left for the full parse to decide.
+    assert f.accepts_text("{apiVersion: v1, kind: ConfigMap}")
+
+
+def test_accepts_text_keeps_list_documents():
+    f = ResourceFilter(kinds=["Deployment"])
+    text = "apiVersion: v1\nkind: List\nitems:\n  - kind: Deployment\nmetadata: {}\n"
+    assert f.accepts_text(text)
+    assert not f.accepts_text("apiVersion: v1\nkind: Service\n")
@@ -0,0 +1,51 @@
+"""Tests for manifest_clean.sinks."""
+
+import json
+
+import pytest
+
+from pkg.manifest_clean.sinks import EmitSinks, parse_emit
+
+POD = {"apiVersion": "v1", "kind": "Pod", "metadata": {"name": "a", "namespace": "ns"}}
+
+
+def _render(doc, fmt):
+    return json.dumps(doc, sort_keys=True) + "\n"
+
+
+def test_parse_emit():
+    assert parse_emit("yaml:out/") == ("yaml", "out/")
+    assert parse_emit("summary:-") == ("summary", "-")
+    for bad in ("yaml", "xml:out", "diff:"):
+        with pytest.raises(ValueError):
+            parse_emit(bad)
+
+
+def test_emit_sinks_fan_out(tmp_path):
+    sinks = EmitSinks(
+        [
+            f"json:{tmp_path / 'all.ndjson'}",
+            f"yaml:{tmp_path / 'tree'}/",
+            f"diff:{tmp_path / 'changes.patch'}",
+            f"summary:{tmp_path / 'report.json'}",
+        ],
+        _render,
+    )
+    sinks.add("a.yaml", [POD], "old\n", "new\n", 1)
+    sinks.add("b.yaml", [POD], "same\n", "same\n", 0)
+    sinks.close(["c.yaml: bad"])
+
+    # json to a .ndjson target is NDJSON: no separators between documents.
+    assert (tmp_path / "all.ndjson").read_text().count("\n") == 2
+    assert (tmp_path / "tree" / "ns" / "Pod" / "a.yaml").is_file()
+    patch = (tmp_path / "changes.patch").read_text()
+    assert "-old\n+new\n" in patch and "b.yaml" not in patch
+    report = json.loads((tmp_path / "report.json").read_text())
+    assert report["files"] == 2 and report["documents_changed"] == 1
+    assert report["changed_files"] == ["a.yaml"]
+    assert report["errors"] == ["c.yaml: bad"]
+
+
+def test_emit_sinks_single_stdout_target():
+    with pytest.raises(ValueError, match="stdout"):
+        EmitSinks(["yaml:-", "diff:-"], _render)
@@ -0,0 +1,36 @@
+"""Tests for manifest_clean.sort."""
+
+from pkg.manifest_clean.sort import document_sort_key, external_sort
+
+
+def test_document_sort_key():
+    doc = {
+        "apiVersion": "v1",
+        "kind": "Pod",
+        "metadata": {"name": "a", "namespace": "x"},
+    }
+    assert document_sort_key(doc) == ("v1", "Pod", "x", "a")
+
+
+def _items():
+    return [
+        (("v1", "Service", "", "b"), "svc-b"),
+        (("apps/v1", "Deployment", "", "a"), "deploy-a"),
+        (("v1", "Service", "", "a"), "svc-a-first"),
+        (("v1", "ConfigMap", "", "z"), "cm-z"),
+        (("v1", "Service", "", "a"), "svc-a-second"),
+    ]
+
+
+def test_external_sort_in_memory_is_stable():
+    got = [text for _, text in external_sort(_items())]
+    assert got == ["deploy-a", "cm-z", "svc-a-first", "svc-a-second", "svc-b"]
+
+
+def test_external_sort_spills_runs():
+    # A tiny buffer spills every couple of items; order must match the in-memory sort.
+    expected = list(external_sort(_items()))
+    assert list(external_sort(_items(), buffer_bytes=10)) == expected
+    assert list(external_sort(iter(_items() * 50), buffer_bytes=30)) == sorted(
+        expected * 50, key=lambda item: item[0]
+    )
@@ -0,0 +1,111 @@
+"""Tests for manifest_clean.split."""
+
+import pytest
+
+from pkg.manifest_clean.split import (
+    SplitWriter,
+    expand_list_items,
+    resource_relpath,
+    write_if_changed,
+)
+
+
+def _cm(name, namespace=None):
+    meta = {"name": name}
+    if namespace:
+        meta["namespace"] = namespace
+    return {"apiVersion": "v1", "kind": "ConfigMap", "metadata": meta}
+
+
+def test_resource_relpath_namespaced_and_cluster_scoped():
+    assert str(resource_relpath(_cm("a", "prod"), "yaml")) == "prod/ConfigMap/a.yaml"
+    ns = {"apiVersion": "v1", "kind": "Namespace", "metadata": {"name": "prod"}}
+    assert str(resource_relpath(ns, "json")) == "_cluster/Namespace/prod.json"
+
+
+def test_resource_relpath_requires_name():
+    with pytest.raises(ValueError, match="metadata.name"):
+        resource_relpath({"apiVersion": "v1", "kind": "Pod"}, "yaml")
+
+
+def test_expand_list_items():
+    doc = {"apiVersion": "v1", "kind": "List", "items": [_cm("a"), _cm("b")]}
+    assert [i["metadata"]["name"] for i in expand_list_items(doc)] == ["a", "b"]
+    assert expand_list_items(_cm("a")) == [_cm("a")]
+
+
+def test_write_if_changed_skips_identical(tmp_path):
+    target = tmp_path / "ns" / "x.yaml"
+    assert write_if_changed(target, "a: 1\n") is True
+    mtime = target.stat().st_mtime_ns
+    assert write_if_changed(target, "a: 1\n") is False
+    assert target.stat().st_mtime_ns == mtime
+    assert write_if_changed(target, "a: 2\n") is True
+
+
+def test_split_writer_writes_and_prunes(tmp_path):
+    stale = tmp_path / "old" / "ConfigMap" / "gone.yaml"
+    stale.parent.mkdir(parents=True)
+    stale.write_text("x: 1\n")
+    (tmp_path / "keep.txt").write_text("not ours")
+    (tmp_path / "kustomization.yaml").write_text("resources: []\n")
+    workflow = tmp_path / ".github" / "workflows" / "ci.yaml"
+    workflow.parent.mkdir(parents=True)
+    workflow.write_text("on: push\n")
+    (tmp_path / "empty").mkdir()
+
+    writer = SplitWriter(tmp_path, "yaml", jobs=2)
+    writer.add(_cm("a", "prod"), "a\n")
+    writer.add(_cm("b"), "b\n")
+    assert writer.close(prune=True) == (2, 0, 1)
+    assert (tmp_path / "prod" / "ConfigMap" / "a.yaml").read_text() == "a\n"
+    assert (tmp_path / "_cluster" / "ConfigMap" / "b.yaml").read_text() == "b\n"
+    assert not (tmp_path / "old").exists()
+    assert (tmp_path / "keep.txt").exists()
+    assert (tmp_path / "kustomization.yaml").exists()
+    assert workflow.exists()
+    assert (tmp_path / "empty").is_dir()
+
+    writer = SplitWriter(tmp_path, "yaml")
+    writer.add(_cm("a", "prod"), "a\n")
+    assert writer.close() == (0, 1, 0)
+
+
+def test_split_writer_keeps_dot_segments_inside_root(tmp_path):
+    root = tmp_path / "out"
+    evil = {
+        "apiVersion": "v1",
+        "kind": "..",
+        "metadata": {"name": "..", "namespace": ".."},
+    }
+    assert str(resource_relpath(evil, "yaml")) == "_../_../_...yaml"
+    writer = SplitWriter(root, "yaml")
+    writer.add(evil, "x\n")
+    assert writer.close() == (1, 0, 0)
+    assert (root / "_.." / "_.." / "_...yaml").exists()
+    assert list(tmp_path.iterdir()) == [root]
+
+
+def test_split_writer_rejects_symlink_escape(tmp_path):
+    root = tmp_path / "out"
+    root.mkdir()
+    (root / "prod").symlink_to(tmp_path)
+    writer = SplitWriter(root, "yaml")
+    with pytest.raises(ValueError, match="escapes"):
+        writer.add(_cm("a", "prod"), "a\n")
+    writer.close()
+
+
+def test_split_writer_reports_failed_writes(tmp_path):
+    root = tmp_path / "out"
+    root.mkdir()
+    (root / "prod").write_text("not a directory\n")
+    (root / "dev" / "ConfigMap").mkdir(parents=True)
+    stale = root / "dev" / "ConfigMap" / "old.yaml"
+    stale.write_text("old\n")
+    writer = SplitWriter(root, "yaml")
+    writer.add(_cm("a", "prod"), "a\n")
+    writer.add(_cm("b", "dev"), "b\n")
+    assert writer.close(prune=True) == (1, 0, 0)
+    assert len(writer.errors) == 1 and "prod" in writer.errors[0]
+    assert stale.exists()
@@ -0,0 +1,54 @@
+"""Tests for manifest_clean.watch."""
+
+import os
+
+import pytest
+
+from pkg.manifest_clean.watch import InotifyWatcher, PollingWatcher, open_watcher
+
+
+def test_polling_watcher_reports_created_modified_removed(tmp_path):
+    a = tmp_path / "a.yaml"
+    a.write_text("kind: Pod\n")
+    watcher = PollingWatcher([str(tmp_path)], interval=0.01)
+    assert watcher.poll() == set()
+    a.write_text("kind: Service\n")
+    os.utime(a, ns=(1, 1))
+    b = tmp_path / "b.yml"
+    b.write_text("kind: Pod\n")
+    (tmp_path / "notes.txt").write_text("ignored")
+    assert watcher.poll() == {a.absolute(), b.absolute()}
+    a.unlink()
+    assert watcher.wait(timeout=1) == {a.absolute()}
+    assert watcher.wait(timeout=0) == set()
+
+
+def test_inotify_watcher_filters_and_follows_new_directories(tmp_path):
+    try:
+        watcher = InotifyWatcher([str(tmp_path)])
+    except (OSError, AttributeError):
+        pytest.skip("inotify not available")
+    try:
+        (tmp_path / "notes.txt").write_text("ignored")
+        assert watcher.wait(timeout=0.2) == set()
+        sub = tmp_path / "sub"
+        sub.mkdir()
+        (sub / "a.yaml").write_text("kind: Pod\n")
+        changed = watcher.wait(timeout=2)
+        changed |= watcher.wait(timeout=0.2)
+        assert changed == {(sub / "a.yaml").absolute()}
+    finally:
+        watcher.close()
+
+
+def test_open_watcher_watches_single_file(tmp_path):
+    f = tmp_path / "deploy.manifest"
+    f.write_text("kind: Pod\n")
+    watcher = open_watcher([str(f)], interval=0.01)
+    try:
+        (tmp_path / "other.yaml").write_text("kind: Pod\n")
+        f.write_text("kind: Service\n")
+        os.utime(f, ns=(1, 1))
+        assert watcher.wait(timeout=2) == {f.absolute()}
+    finally:
+        watcher.close()